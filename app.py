@@ -1,13 +1,25 @@
+import io
+import json
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.linear_model import LinearRegression
-from scipy.stats import norm
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+from inventory_core import (
+    ABCPredictor,
+    abc_criterion,
+    chart_json,
+    class_matrix,
+    classify,
+    IncrementalPipeline,
+    ModelRegistry,
+    load_catalog,
+    ResultCache,
+    ResultsIndex,
+    ResultsQuery,
+    tradeoff_curves,
+    xyz_criterion,
+)
+from inventory_core.classification import DEMAND_CV_COLUMN
+from inventory_core.ingest import detect_format
 
 # Page configuration
 st.set_page_config(
@@ -250,91 +262,43 @@ if 'model' not in st.session_state:
 if 'reg_model' not in st.session_state:
     st.session_state.reg_model = None
 
-def classify_abc(row):
-    """Classify items into ABC categories based on cumulative percentage"""
-    if row['Cumulative%'] <= 70:
-        return 'A'
-    elif row['Cumulative%'] <= 90:
-        return 'B'
-    else:
-        return 'C'
+# Upload preview size and the number of (highest-value) items offered for trade-off analysis
+CATALOG_PREVIEW_ROWS = 100
+MAX_PRODUCT_OPTIONS = 500
 
-def calculate_safety_stock(predicted_demand, lead_time, service_level):
-    """Calculate safety stock using Z-score and lead time
-    Formula: Safety stock = Z.σ√Lead Time where σ is 10% of predicted demand
-    """
-    z = norm.ppf(service_level)
-    std_dev = predicted_demand * 0.1  # σ is 10% of predicted demand
-    safety_stock = z * std_dev * np.sqrt(lead_time)
-    return safety_stock
+@st.cache_data(show_spinner="Loading catalog...")
+def load_uploaded_catalog(contents, file_name):
+    """Parse an uploaded catalog file into a compact DataFrame"""
+    return load_catalog(io.BytesIO(contents), detect_format(file_name))
 
-def calculate_holding_cost(safety_stock, unit_cost, holding_cost_rate=0.2):
-    """Calculate holding cost for safety stock
-    Formula: Holding Cost = Safety Stock × Unit Cost × Holding Cost Rate
-    """
-    return safety_stock * unit_cost * holding_cost_rate
+@st.cache_resource
+def get_model_registry():
+    """Fitted models shared across reruns, keyed by dataset fingerprint"""
+    return ModelRegistry()
 
-def process_all_calculations(df, service_level, holding_cost_rate):
-    """Process all calculations automatically: ABC Analysis, AI Classification, Demand Forecasting, Safety Stock"""
-    df = df.copy()
-    
-    # Step 1: ABC Analysis
-    # Calculate Annual Value = Annual Usage × Unit Cost
-    df['Annual_Value'] = df['Annual_Usage'] * df['Unit_Cost']
-    
-    # Sort by Annual Value (descending)
-    df = df.sort_values(by='Annual_Value', ascending=False).reset_index(drop=True)
-    
-    # Calculate Cumulative Percentage
-    df['Cumulative%'] = df['Annual_Value'].cumsum() / df['Annual_Value'].sum() * 100
-    
-    # Classify ABC: Top 70% → A, Next 20% → B, Remaining → C
-    df['ABC_Category'] = df.apply(classify_abc, axis=1)
-    
-    # Step 2: Train Decision Tree for ABC Prediction
-    if len(df) >= 3:  # Need at least 3 samples
-        features = df[['Annual_Usage', 'Unit_Cost', 'Lead_Time', 'Past_Demand']]
-        labels = df['ABC_Category']
-        
-        model = DecisionTreeClassifier(random_state=42)
-        model.fit(features, labels)
-        df['Predicted_ABC'] = model.predict(features)
-    else:
-        df['Predicted_ABC'] = df['ABC_Category']
-        model = None
-    
-    # Step 3: Demand Forecasting using Linear Regression
-    if len(df) >= 2:  # Need at least 2 samples for regression
-        X = np.array(df['Past_Demand']).reshape(-1, 1)
-        y = np.array(df['Annual_Usage'])
-        
-        reg = LinearRegression()
-        reg.fit(X, y)
-        df['Predicted_Demand'] = reg.predict(X).round()
-    else:
-        df['Predicted_Demand'] = df['Annual_Usage']
-        reg = None
-    
-    # Step 4: Safety Stock Calculation
-    # Formula: Safety stock = Z.σ√Lead Time where σ = 10% of predicted demand
-    df['Safety_Stock'] = df.apply(
-        lambda row: calculate_safety_stock(
-            row['Predicted_Demand'],
-            row['Lead_Time'],
-            service_level
-        ), axis=1
-    ).round()
-    
-    # Calculate Holding Cost
-    df['Holding_Cost'] = df.apply(
-        lambda row: calculate_holding_cost(
-            row['Safety_Stock'],
-            row['Unit_Cost'],
-            holding_cost_rate
-        ), axis=1
-    ).round(2)
-    
-    return df, model, reg
+@st.cache_resource
+def get_chart_cache():
+    """Serialized dashboard figures shared across reruns, keyed by data hash"""
+    return ResultCache(max_entries=32, ttl=None)
+
+# Per-session incremental engine: reruns only the stages whose inputs changed
+if 'pipeline' not in st.session_state:
+    st.session_state.pipeline = IncrementalPipeline(registry=get_model_registry(), abc_predictor=ABCPredictor())
+
+WHOLE_CATALOG = "Whole catalog"
+
+def parse_breakpoints(text):
+    """Comma-separated breakpoints from a sidebar text field"""
+    try:
+        return [float(value) for value in text.split(',') if value.strip()]
+    except ValueError:
+        raise ValueError(f"breakpoints must be numbers separated by commas, got {text!r}") from None
+
+ABC_MODEL_POLICIES = {
+    "Refit when the data drifts": 'drift',
+    "Always refit": 'always',
+    "Skip training (rule labels)": 'rule',
+}
 
 # Main title
 st.title("📊 Inventory Management & Optimization Dashboard")
@@ -346,15 +310,36 @@ with st.sidebar:
     st.markdown("### Data Input")
     
     num_items = st.number_input("Number of Items", min_value=3, max_value=20, value=7, step=1)
+    uploaded_file = st.file_uploader(
+        "Or upload a full catalog (CSV / Parquet / Arrow)",
+        type=['csv', 'parquet', 'arrow', 'feather']
+    )
     
     st.markdown("### Service Level Settings")
     service_level = st.slider("Service Level (%)", min_value=80, max_value=99, value=95, step=1) / 100
     holding_cost_rate = st.slider("Holding Cost Rate (%)", min_value=10, max_value=50, value=20, step=1) / 100
     
+    st.markdown("### Model Settings")
+    abc_policy = ABC_MODEL_POLICIES[st.selectbox("ABC Model Updates", list(ABC_MODEL_POLICIES))]
+    abc_predictor = st.session_state.pipeline.abc_predictor
+    if abc_policy != abc_predictor.policy:
+        # A fresh pipeline so the models stage reruns under the new policy
+        abc_predictor.policy = abc_policy
+        abc_predictor.reset()
+        st.session_state.pipeline = IncrementalPipeline(registry=get_model_registry(), abc_predictor=abc_predictor)
+    abc_model_status = st.empty()
+    
+    st.markdown("### Classification")
+    abc_breakpoints_text = st.text_input("ABC Breakpoints (cumulative value %)", value="70, 90")
+    xyz_breakpoints_text = st.text_input("XYZ Breakpoints (demand CV)", value="0.5, 1.0")
+    # Filled once the data is known: the grouping columns come from the catalog
+    classification_group = st.empty()
+    
     st.markdown("### Visualization Settings")
     show_abc_chart = st.checkbox("Show ABC Category Distribution", value=True)
     show_safety_stock_chart = st.checkbox("Show Safety Stock by Item", value=True)
     show_tradeoff_chart = st.checkbox("Show Service Level Trade-offs", value=True)
+    show_debug_panel = st.checkbox("Show Stage Timings (debug)", value=False)
 
 # Main Dashboard - Single Page Layout
 # Data Input Section
@@ -364,8 +349,19 @@ col_input1, col_input2 = st.columns([2, 1])
 with col_input1:
     st.subheader("Enter Inventory Data")
     
+    if uploaded_file is None and st.session_state.get('catalog_uploaded'):
+        # Upload removed: go back to the editable sample data
+        st.session_state.df = None
+        st.session_state.catalog_uploaded = False
+    
     # Create editable dataframe
-    if st.session_state.df is None:
+    if uploaded_file is not None:
+        # Bulk catalog: loaded with compact dtypes and analysed as-is, not edited in place
+        edited_df = load_uploaded_catalog(uploaded_file.getvalue(), uploaded_file.name)
+        st.session_state.catalog_uploaded = True
+        st.caption(f"Loaded {len(edited_df):,} items from {uploaded_file.name} (first {CATALOG_PREVIEW_ROWS} shown)")
+        st.dataframe(edited_df.head(CATALOG_PREVIEW_ROWS), use_container_width=True)
+    elif st.session_state.df is None:
         # Default sample data
         default_data = {
             'Item': [f'A{i+1}' for i in range(min(3, num_items))] + 
@@ -378,25 +374,26 @@ with col_input1:
         }
         st.session_state.df = pd.DataFrame(default_data)
     
-    # Editable dataframe - only show input columns
-    input_cols = ['Item', 'Annual_Usage', 'Unit_Cost', 'Lead_Time', 'Past_Demand']
-    if st.session_state.df is not None:
-        df_to_edit = st.session_state.df[input_cols].copy() if all(col in st.session_state.df.columns for col in input_cols) else st.session_state.df.copy()
-    else:
-        df_to_edit = pd.DataFrame(columns=input_cols)
-    
-    edited_df = st.data_editor(
-        df_to_edit,
-        num_rows="dynamic",
-        use_container_width=True,
-        column_config={
-            "Item": st.column_config.TextColumn("Item", required=True),
-            "Annual_Usage": st.column_config.NumberColumn("Annual Usage", min_value=1, required=True),
-            "Unit_Cost": st.column_config.NumberColumn("Unit Cost", min_value=0.01, format="%.2f", required=True),
-            "Lead_Time": st.column_config.NumberColumn("Lead Time", min_value=1, required=True),
-            "Past_Demand": st.column_config.NumberColumn("Past Demand", min_value=1, required=True)
-        }
-    )
+    if uploaded_file is None:
+        # Editable dataframe - only show input columns
+        input_cols = ['Item', 'Annual_Usage', 'Unit_Cost', 'Lead_Time', 'Past_Demand']
+        if st.session_state.df is not None:
+            df_to_edit = st.session_state.df[input_cols].copy() if all(col in st.session_state.df.columns for col in input_cols) else st.session_state.df.copy()
+        else:
+            df_to_edit = pd.DataFrame(columns=input_cols)
+    
+        edited_df = st.data_editor(
+            df_to_edit,
+            num_rows="dynamic",
+            use_container_width=True,
+            column_config={
+                "Item": st.column_config.TextColumn("Item", required=True),
+                "Annual_Usage": st.column_config.NumberColumn("Annual Usage", min_value=1, required=True),
+                "Unit_Cost": st.column_config.NumberColumn("Unit Cost", min_value=0.01, format="%.2f", required=True),
+                "Lead_Time": st.column_config.NumberColumn("Lead Time", min_value=1, required=True),
+                "Past_Demand": st.column_config.NumberColumn("Past Demand", min_value=1, required=True)
+            }
+        )
 
 with col_input2:
     st.subheader("Service Level Settings")
@@ -415,7 +412,7 @@ with col_input2:
     if st.session_state.df is not None and len(st.session_state.df) > 0:
         selected_products = st.multiselect(
             "Select Products for Trade-off Analysis",
-            options=st.session_state.df['Item'].tolist(),
+            options=st.session_state.df['Item'].head(MAX_PRODUCT_OPTIONS).tolist(),
             default=st.session_state.df['Item'].head(min(3, len(st.session_state.df))).tolist()
         )
     else:
@@ -423,11 +420,18 @@ with col_input2:
 
 # Automatically process all calculations when data changes
 if len(edited_df) > 0:
-    # Always recalculate to ensure everything is up to date with current service level and holding cost rate
-    processed_df, model, reg = process_all_calculations(edited_df, service_level, holding_cost_rate)
-    st.session_state.df = processed_df
-    st.session_state.model = model
-    st.session_state.reg_model = reg
+    # Bring results up to date with the current data, service level and holding cost rate;
+    # only the stages affected by what changed since the last rerun are recomputed
+    result = st.session_state.pipeline.update(edited_df, service_level, holding_cost_rate)
+    st.session_state.df = result.frame
+    st.session_state.model = result.classifier
+    st.session_state.reg_model = result.regressor
+    abc_stats = st.session_state.pipeline.abc_predictor.stats
+    abc_model_status.caption(
+        f"ABC model: {abc_stats.fits} fits ({abc_stats.fit_seconds * 1000:.0f} ms total), "
+        f"{abc_stats.skipped} skipped"
+        + (f" · last: {abc_stats.last_action}, {abc_stats.last_seconds * 1000:.1f} ms" if abc_stats.last_action else "")
+    )
 
 # Key Metrics Section
 if st.session_state.df is not None and 'ABC_Category' in st.session_state.df.columns:
@@ -456,83 +460,29 @@ if st.session_state.df is not None and 'ABC_Category' in st.session_state.df.col
 
 # Visualization Section
 if st.session_state.df is not None and 'ABC_Category' in st.session_state.df.columns:
+    # Plotly is imported here rather than at the top so the inputs and KPIs render before it loads
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
     df = st.session_state.df.copy()
     
     st.markdown("---")
     st.header("📈 Model Predictions & Analysis")
     
+    # Figures come pre-aggregated and downsampled, so their size does not grow with the catalog
+    figures = json.loads(chart_json(df, cache=get_chart_cache()))
+    
     # Row 1: ABC Analysis Charts
     col_chart1, col_chart2 = st.columns(2)
     
     with col_chart1:
         st.subheader("ABC Category Distribution")
-        abc_counts = df['ABC_Category'].value_counts().sort_index()
-        fig_abc = px.bar(
-            x=abc_counts.index,
-            y=abc_counts.values,
-            color=abc_counts.index,
-            color_discrete_map={'A': '#2563eb', 'B': '#64748b', 'C': '#94a3b8'},
-            labels={'x': 'Category', 'y': 'Number of Items'},
-            title="ABC Category Distribution"
-        )
-        fig_abc.update_layout(
-            showlegend=False,
-            height=350,
-            plot_bgcolor='#ffffff',
-            paper_bgcolor='#ffffff',
-            font=dict(family='Inter', size=12, color='#374151'),
-            title_font=dict(size=16, color='#1a2332'),
-            xaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db'),
-            yaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db')
-        )
-        st.plotly_chart(fig_abc, use_container_width=True)
+        st.plotly_chart(figures['abc_distribution'], use_container_width=True)
     
     with col_chart2:
         st.subheader("ABC vs Predicted ABC Comparison")
-        if 'Predicted_ABC' in df.columns:
-            comparison_data = pd.DataFrame({
-                'Item': df['Item'],
-                'Actual': df['ABC_Category'],
-                'Predicted': df['Predicted_ABC']
-            })
-            
-            # Create comparison chart
-            fig_comp = go.Figure()
-            fig_comp.add_trace(go.Bar(
-                name='Actual ABC',
-                x=comparison_data['Item'],
-                y=[1 if cat == 'A' else (2 if cat == 'B' else 3) for cat in comparison_data['Actual']],
-                marker_color='#2563eb',
-                text=comparison_data['Actual'],
-                textposition='outside'
-            ))
-            fig_comp.add_trace(go.Bar(
-                name='Predicted ABC',
-                x=comparison_data['Item'],
-                y=[1 if cat == 'A' else (2 if cat == 'B' else 3) for cat in comparison_data['Predicted']],
-                marker_color='#10b981',
-                text=comparison_data['Predicted'],
-                textposition='outside'
-            ))
-            fig_comp.update_layout(
-                height=350,
-                plot_bgcolor='#ffffff',
-                paper_bgcolor='#ffffff',
-                font=dict(family='Inter', size=12, color='#374151'),
-                title="Actual vs Predicted ABC Categories",
-                title_font=dict(size=16, color='#1a2332'),
-                xaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db'),
-                yaxis=dict(
-                    gridcolor='#e5e7eb',
-                    linecolor='#d1d5db',
-                    tickmode='array',
-                    tickvals=[1, 2, 3],
-                    ticktext=['A', 'B', 'C'],
-                    title='Category'
-                ),
-                barmode='group'
-            )
-            st.plotly_chart(fig_comp, use_container_width=True)
+        if 'abc_comparison' in figures:
+            st.plotly_chart(figures['abc_comparison'], use_container_width=True)
             
             # Show accuracy
             accuracy = (df['ABC_Category'] == df['Predicted_ABC']).mean() * 100
@@ -541,121 +491,63 @@ if st.session_state.df is not None and 'ABC_Category' in st.session_state.df.col
             st.info("Predicted ABC categories will appear after calculations")
     
     # Row 2: Demand Forecasting Charts
-    if 'Predicted_Demand' in df.columns:
+    if 'demand' in figures:
         col_chart3, col_chart4 = st.columns(2)
         
         with col_chart3:
             st.subheader("Demand Forecasting: Actual vs Predicted")
-            fig_demand = go.Figure()
-            fig_demand.add_trace(go.Scatter(
-                x=df['Item'],
-                y=df['Annual_Usage'],
-                mode='lines+markers',
-                name='Actual Annual Usage',
-                line=dict(color='#2563eb', width=3),
-                marker=dict(size=8)
-            ))
-            fig_demand.add_trace(go.Scatter(
-                x=df['Item'],
-                y=df['Predicted_Demand'],
-                mode='lines+markers',
-                name='Predicted Demand',
-                line=dict(color='#10b981', width=3, dash='dash'),
-                marker=dict(size=8)
-            ))
-            fig_demand.update_layout(
-                height=350,
-                plot_bgcolor='#ffffff',
-                paper_bgcolor='#ffffff',
-                font=dict(family='Inter', size=12, color='#374151'),
-                title="Demand Forecasting Comparison",
-                title_font=dict(size=16, color='#1a2332'),
-                xaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db', title='Item'),
-                yaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db', title='Demand'),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            st.plotly_chart(fig_demand, use_container_width=True)
+            st.plotly_chart(figures['demand'], use_container_width=True)
         
         with col_chart4:
             st.subheader("Past Demand vs Predicted Demand Scatter")
-            fig_scatter = px.scatter(
-                df,
-                x='Past_Demand',
-                y='Predicted_Demand',
-                color='ABC_Category',
-                size='Annual_Usage',
-                hover_data=['Item'],
-                labels={'Past_Demand': 'Past Demand', 'Predicted_Demand': 'Predicted Demand'},
-                title="Demand Prediction Scatter Plot",
-                color_discrete_map={'A': '#2563eb', 'B': '#64748b', 'C': '#94a3b8'}
-            )
-            # Add diagonal line
-            max_val = max(df['Past_Demand'].max(), df['Predicted_Demand'].max())
-            fig_scatter.add_trace(go.Scatter(
-                x=[0, max_val],
-                y=[0, max_val],
-                mode='lines',
-                name='Perfect Prediction',
-                line=dict(color='#dc2626', width=2, dash='dot'),
-                showlegend=True
-            ))
-            fig_scatter.update_layout(
-                height=350,
-                plot_bgcolor='#ffffff',
-                paper_bgcolor='#ffffff',
-                font=dict(family='Inter', size=12, color='#374151'),
-                title_font=dict(size=16, color='#1a2332'),
-                xaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db'),
-                yaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db')
-            )
-            st.plotly_chart(fig_scatter, use_container_width=True)
+            st.plotly_chart(figures['demand_scatter'], use_container_width=True)
     
     # Row 3: Safety Stock Analysis
-    if 'Safety_Stock' in df.columns:
+    if 'safety_stock' in figures:
         col_chart5, col_chart6 = st.columns(2)
         
         with col_chart5:
             st.subheader("Safety Stock by Item")
-            fig_safety = px.bar(
-                x=df['Item'],
-                y=df['Safety_Stock'],
-                color=df['Safety_Stock'],
-                color_continuous_scale='Blues',
-                labels={'x': 'Item', 'y': 'Safety Stock Units'},
-                title="Safety Stock Levels (AI-Predicted)"
-            )
-            fig_safety.update_layout(
-                showlegend=False,
-                height=350,
-                plot_bgcolor='#ffffff',
-                paper_bgcolor='#ffffff',
-                font=dict(family='Inter', size=12, color='#374151'),
-                title_font=dict(size=16, color='#1a2332'),
-                xaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db'),
-                yaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db')
-            )
-            st.plotly_chart(fig_safety, use_container_width=True)
+            st.plotly_chart(figures['safety_stock'], use_container_width=True)
         
         with col_chart6:
             st.subheader("Holding Cost Analysis")
-            fig_cost = px.bar(
-                x=df['Item'],
-                y=df['Holding_Cost'],
-                color=df['ABC_Category'],
-                color_discrete_map={'A': '#2563eb', 'B': '#64748b', 'C': '#94a3b8'},
-                labels={'x': 'Item', 'y': 'Holding Cost ($)'},
-                title="Holding Cost by Item and Category"
-            )
-            fig_cost.update_layout(
-                height=350,
-                plot_bgcolor='#ffffff',
-                paper_bgcolor='#ffffff',
-                font=dict(family='Inter', size=12, color='#374151'),
-                title_font=dict(size=16, color='#1a2332'),
-                xaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db'),
-                yaxis=dict(gridcolor='#e5e7eb', linecolor='#d1d5db')
-            )
-            st.plotly_chart(fig_cost, use_container_width=True)
+            st.plotly_chart(figures['holding_cost'], use_container_width=True)
+    
+    # Multi-criteria classification: configurable ABC, XYZ on demand CV (when the catalog has it) and their matrix
+    group_columns = [col for col in df.columns if col != 'Item' and not pd.api.types.is_numeric_dtype(df[col])
+                     and col not in ('ABC_Category', 'Predicted_ABC')]
+    group_by = classification_group.selectbox("Classify Within", [WHOLE_CATALOG] + group_columns)
+    try:
+        criteria = [abc_criterion(parse_breakpoints(abc_breakpoints_text))]
+        if DEMAND_CV_COLUMN in df.columns:
+            criteria.append(xyz_criterion(parse_breakpoints(xyz_breakpoints_text)))
+        class_labels = classify(df, criteria, None if group_by == WHOLE_CATALOG else group_by)
+    except ValueError as e:
+        st.sidebar.error(f"Classification: {e}")
+        class_labels = None
+    
+    if class_labels is not None:
+        st.markdown("---")
+        st.header("🧮 Multi-Criteria Classification")
+        count_columns = st.columns(len(criteria))
+        for criterion, count_column in zip(criteria, count_columns):
+            with count_column:
+                st.subheader(f"{criterion.name} Classes")
+                counts = class_labels[criterion.output_column].value_counts(sort=False)
+                st.dataframe(counts.rename('Items').to_frame(), use_container_width=True)
+        if len(criteria) > 1:
+            col_matrix1, col_matrix2 = st.columns(2)
+            with col_matrix1:
+                st.subheader("ABC-XYZ Matrix (items)")
+                st.dataframe(class_matrix(class_labels, *criteria), use_container_width=True)
+            with col_matrix2:
+                st.subheader("ABC-XYZ Matrix (annual value %)")
+                value = class_matrix(class_labels, *criteria, weights=df['Annual_Value'].to_numpy(dtype=float))
+                st.dataframe((value / value.to_numpy().sum() * 100).round(1), use_container_width=True)
+        else:
+            st.caption(f"Add a {DEMAND_CV_COLUMN} column (demand σ / mean) to the catalog for XYZ classes.")
+        st.caption("Breakpoints here do not change ABC_Category in the model pipeline, which keeps 70% / 90%.")
     
     # Main Feature: Service Level Trade-offs (Full Width)
     st.markdown("---")
@@ -674,21 +566,12 @@ if st.session_state.df is not None and 'ABC_Category' in st.session_state.df.col
             horizontal_spacing=0.1
         )
         
-        # Calculate for each product
+        # Safety stock and holding cost for every product × service level in one pass
+        curves = tradeoff_curves(df, selected_products, service_levels, holding_cost_rate)
+        
         for idx, product in enumerate(selected_products):
-            product_data = df[df['Item'] == product].iloc[0]
-            predicted_demand = product_data['Predicted_Demand']
-            lead_time = product_data['Lead_Time']
-            unit_cost = product_data['Unit_Cost']
-            
-            safety_stocks = []
-            holding_costs = []
-            
-            for sl in service_levels:
-                ss = calculate_safety_stock(predicted_demand, lead_time, sl)
-                hc = calculate_holding_cost(ss, unit_cost, holding_cost_rate)
-                safety_stocks.append(ss)
-                holding_costs.append(hc)
+            safety_stocks = curves.safety_stocks[idx]
+            holding_costs = curves.holding_costs[idx]
             
             # Add safety stock line (blue)
             fig_tradeoff.add_trace(
@@ -779,11 +662,74 @@ if st.session_state.df is not None and 'ABC_Category' in st.session_state.df.col
     st.header("📋 Complete Results Summary")
     summary_cols = ['Item', 'ABC_Category', 'Predicted_ABC', 'Annual_Usage', 'Past_Demand', 'Predicted_Demand', 'Lead_Time', 'Safety_Stock', 'Holding_Cost']
     summary_cols = [col for col in summary_cols if col in df.columns]
-    st.dataframe(df[summary_cols], use_container_width=True)
+    
+    # Only the visible page is sent to the browser; the index is rebuilt when the results change
+    if st.session_state.get('results_source') is not st.session_state.df:
+        st.session_state.results_index = ResultsIndex(st.session_state.df)
+        st.session_state.results_source = st.session_state.df
+    results_index = st.session_state.results_index
+    
+    col_sort, col_order, col_cat, col_prefix = st.columns([2, 1, 2, 2])
+    with col_sort:
+        sort_label = st.selectbox("Sort by", ["ABC ranking"] + summary_cols)
+    with col_order:
+        descending = st.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Descending"
+    with col_cat:
+        categories = st.multiselect("ABC Category", ['A', 'B', 'C'])
+    with col_prefix:
+        prefix = st.text_input("Item starts with")
+    col_min, col_max, col_size, col_page = st.columns([2, 2, 1, 1])
+    with col_min:
+        min_value = st.number_input("Min Annual Value ($)", min_value=0.0, value=None, step=100.0)
+    with col_max:
+        max_value = st.number_input("Max Annual Value ($)", min_value=0.0, value=None, step=100.0)
+    with col_size:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=2)
+    
+    results_query = ResultsQuery(
+        sort=None if sort_label == "ABC ranking" else sort_label,
+        descending=descending,
+        categories=tuple(categories),
+        min_value=min_value,
+        max_value=max_value,
+        prefix=prefix or None,
+    )
+    matching = len(results_index.view(results_query))
+    # Back to the first page whenever the view changes
+    if st.session_state.get('results_view') != (results_query, page_size, id(results_index)):
+        st.session_state.results_view = (results_query, page_size, id(results_index))
+        st.session_state.results_page = 1
+    with col_page:
+        page_number = st.number_input("Page", min_value=1, max_value=max(1, -(-matching // page_size)), step=1,
+                                      key='results_page')
+    
+    results_page = results_index.page(results_query, (page_number - 1) * page_size, page_size)
+    st.dataframe(results_page.rows[summary_cols], use_container_width=True, hide_index=True)
+    if results_page.total:
+        st.caption(
+            f"Rows {results_page.offset + 1:,}–{results_page.offset + len(results_page.rows):,} "
+            f"of {results_page.total:,} matching ({len(results_index):,} items)"
+        )
+    else:
+        st.caption(f"No items match these filters ({len(results_index):,} items)")
 
 else:
     st.info("👆 Please enter inventory data above to see analysis results")
 
+# Debug panel: what the latest rerun recomputed and how long each stage took
+if show_debug_panel:
+    st.markdown("---")
+    with st.expander("🐞 Stage Timings (latest rerun)", expanded=True):
+        timings = st.session_state.pipeline.last_timings
+        if timings:
+            st.dataframe(pd.DataFrame({
+                'Stage': list(timings),
+                'Time (ms)': [round(seconds * 1000, 2) for seconds in timings.values()],
+            }), use_container_width=True, hide_index=True)
+            st.caption(f"Total: {sum(timings.values()) * 1000:.1f} ms for {len(st.session_state.df):,} rows")
+        else:
+            st.caption("Nothing was recomputed on the latest rerun")
+
 # Footer
 st.markdown("---")
 st.markdown("""
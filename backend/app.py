@@ -1,170 +1,924 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, g, request, jsonify
 from flask_cors import CORS
+import json
 import pandas as pd
-import numpy as np
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.linear_model import LinearRegression
-from scipy.stats import norm
-import pickle
 import os
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 
-app = Flask(__name__)
-CORS(app)
-
-# Global variables to store models
-decision_tree_model = None
-regression_model = None
-
-def classify_abc(row):
-    """Classify items into ABC categories based on cumulative percentage"""
-    if row['Cumulative%'] <= 70:
-        return 'A'
-    elif row['Cumulative%'] <= 90:
-        return 'B'
-    else:
-        return 'C'
-
-def calculate_safety_stock(predicted_demand, lead_time, service_level):
-    """Calculate safety stock using Z-score and lead time
-    Formula: Safety stock = Z.σ√Lead Time where σ is 10% of predicted demand
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_core import (
+    chart_json,
+    DemandHistoryStore,
+    FORECAST_METHODS,
+    forecast_items,
+    InventoryStore,
+    JobQueue,
+    ModelRegistry,
+    load_catalog,
+    OUTPUT_COLUMNS,
+    ResultCache,
+    payload_key,
+    process_all_calculations,
+    run_partitioned,
+    score_items,
+    service_level_grid,
+    SqliteJobStore,
+    tradeoff_curves,
+)
+from inventory_core.charts import DEFAULT_MAX_POINTS, DEFAULT_TOP_N
+from inventory_core.classification import DEMAND_CV_COLUMN, Criterion, class_matrix, classify
+from inventory_core.formats import (
+    FORMATS,
+    MEDIA_TYPE_ALIASES,
+    MEDIA_TYPES,
+    NDJSON,
+    RECORDS,
+    decode_frame,
+    encode_frame,
+    encode_tradeoff,
+    format_for_media_type,
+)
+from inventory_core.ingest import detect_format
+from inventory_core.jobs import DONE
+from inventory_core.metrics import PROFILE_MODES, MetricsRegistry, StageTimer, capture_profile
+from inventory_core.results import DEFAULT_DISK_DATASETS, DEFAULT_PAGE_SIZE, SORT_ORDERS, ResultsQuery, ResultsStore, decode_cursor
+from inventory_core.scenarios import Scenario, evaluate_scenarios, scenario_grid
+from inventory_core.streaming import DEFAULT_BATCH_ROWS, stream_calculations, stream_scores, stream_tradeoff
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+# Profiles kept for GET /api/profiles/<id>, newest last
+PROFILE_HISTORY = 20
+
+api = Blueprint('api', __name__)
+
+def create_app(config=None):
+    """Application factory; `config` overrides the settings read from the environment"""
+    app = Flask(__name__)
+    app.config.update(
+        # Fitted models are stored on disk by dataset fingerprint and shared by all workers
+        MODEL_DIR=os.environ.get('INVENTORY_MODEL_DIR', DEFAULT_MODEL_DIR),
+        # Response cache for /api/calculate keyed on a hash of items and parameters
+        CACHE_SIZE=int(os.environ.get('INVENTORY_CACHE_SIZE', 256)),
+        CACHE_TTL=float(os.environ.get('INVENTORY_CACHE_TTL', 300)),
+        CACHE_MAX_MB=float(os.environ.get('INVENTORY_CACHE_MAX_MB', 256)),
+        CACHE_DIR=os.environ.get('INVENTORY_CACHE_DIR'),
+        CACHE_DISK_MAX_MB=float(os.environ.get('INVENTORY_CACHE_DISK_MAX_MB', 256)),
+        BATCH_WORKERS=int(os.environ.get('INVENTORY_BATCH_WORKERS', os.cpu_count() or 1)),
+        # Background jobs; set JOB_DB to a SQLite file to share jobs between workers and keep them across restarts
+        JOB_DB=os.environ.get('INVENTORY_JOB_DB'),
+        JOB_WORKERS=int(os.environ.get('INVENTORY_JOB_WORKERS', 2)),
+        JOB_RETENTION=float(os.environ.get('INVENTORY_JOB_RETENTION', 3600)),
+        # Daily demand history used for measured per-item σ (disabled when unset)
+        HISTORY_DIR=os.environ.get('INVENTORY_HISTORY_DIR'),
+        # Processed datasets kept (per process) for paging through GET /api/results; with RESULTS_DIR
+        # (default: a results/ folder in CACHE_DIR) they are shared by the workers
+        RESULTS_DATASETS=int(os.environ.get('INVENTORY_RESULTS_DATASETS', 4)),
+        RESULTS_DIR=os.environ.get('INVENTORY_RESULTS_DIR'),
+        RESULTS_DISK_DATASETS=int(os.environ.get('INVENTORY_RESULTS_DISK_DATASETS', DEFAULT_DISK_DATASETS)),
+        # Persistent catalog updated by item deltas (disabled when unset); connections per worker process
+        STORE_DB=os.environ.get('INVENTORY_STORE_DB'),
+        STORE_POOL_SIZE=int(os.environ.get('INVENTORY_STORE_POOL_SIZE', 4)),
+        # Honour the X-Profile request header (cProfile / tracemalloc); keep off on public deployments
+        PROFILING=os.environ.get('INVENTORY_PROFILING', '0') == '1',
+    )
+    if config:
+        app.config.update(config)
+    # Let browser clients read the response headers that carry ids and timings
+    CORS(app, expose_headers=['X-Results-Id', 'X-Profile-Id', 'Server-Timing'])
+    
+    app.extensions['model_registry'] = ModelRegistry(app.config['MODEL_DIR'])
+    app.extensions['result_cache'] = ResultCache(
+        max_entries=app.config['CACHE_SIZE'],
+        ttl=app.config['CACHE_TTL'],
+        max_bytes=int(app.config['CACHE_MAX_MB'] * 1024 * 1024),
+        disk_dir=app.config['CACHE_DIR'],
+        disk_max_bytes=int(app.config['CACHE_DISK_MAX_MB'] * 1024 * 1024)
+    )
+    app.extensions['job_queue'] = JobQueue(
+        SqliteJobStore(app.config['JOB_DB']) if app.config['JOB_DB'] else None,
+        registry=app.extensions['model_registry'],
+        max_workers=app.config['JOB_WORKERS'],
+        retention=app.config['JOB_RETENTION']
+    )
+    app.extensions['demand_history'] = (
+        DemandHistoryStore(app.config['HISTORY_DIR']) if app.config['HISTORY_DIR'] else None
+    )
+    app.extensions['metrics'] = MetricsRegistry()
+    app.extensions['profiles'] = OrderedDict()
+    results_dir = app.config['RESULTS_DIR'] or (
+        os.path.join(app.config['CACHE_DIR'], 'results') if app.config['CACHE_DIR'] else None
+    )
+    app.extensions['results'] = ResultsStore(
+        app.config['RESULTS_DATASETS'],
+        directory=results_dir,
+        max_disk_datasets=app.config['RESULTS_DISK_DATASETS']
+    )
+    app.extensions['inventory_store'] = (
+        InventoryStore(app.config['STORE_DB'], app.extensions['model_registry'], app.config['STORE_POOL_SIZE'])
+        if app.config['STORE_DB'] else None
+    )
+    # Process pool for /api/batch, created on first use so forked workers never share one
+    app.extensions['batch_executor'] = None
+    app.register_blueprint(api)
+    return app
+
+def get_model_registry():
+    return current_app.extensions['model_registry']
+
+def get_result_cache():
+    return current_app.extensions['result_cache']
+
+def get_job_queue():
+    return current_app.extensions['job_queue']
+
+def get_demand_history():
+    return current_app.extensions['demand_history']
+
+def with_measured_std(items, data):
+    """Add Demand_Std from the demand history to the items that have one
+
+    Only when the request asks for it with `demand_window_days`; the σ then
+    becomes part of the items, so cached results and jobs follow the history.
     """
-    z = norm.ppf(service_level)
-    std_dev = predicted_demand * 0.1  # σ is 10% of predicted demand
-    safety_stock = z * std_dev * np.sqrt(lead_time)
-    return safety_stock
-
-def calculate_holding_cost(safety_stock, unit_cost, holding_cost_rate=0.2):
-    """Calculate holding cost for safety stock
-    Formula: Holding Cost = Safety Stock × Unit Cost × Holding Cost Rate
+    window_days = data.get('demand_window_days')
+    if window_days is None:
+        return items
+    history = get_demand_history()
+    if history is None:
+        raise ValueError('No demand history configured (set INVENTORY_HISTORY_DIR)')
+    std = history.demand_std(int(window_days), period_days=float(data.get('demand_period_days', 1))).to_dict()
+    return [dict(item, Demand_Std=std[str(item.get('Item'))]) if str(item.get('Item')) in std else item
+            for item in items]
+
+def with_forecast(items, data):
+    """Per-item forecasts over the demand history: Demand_Forecast (annual) and its residual σ as Demand_Std
+
+    Only when the request names a `forecast_method` (ses, moving_average or
+    seasonal_naive); as with with_measured_std the values become part of
+    the items. Items without history keep the regression and the 10% rule.
     """
-    return safety_stock * unit_cost * holding_cost_rate
+    method = data.get('forecast_method')
+    if method is None:
+        return items
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unknown forecast method: {method} (choose one of: {', '.join(FORECAST_METHODS)})")
+    history = get_demand_history()
+    if history is None:
+        raise ValueError('No demand history configured (set INVENTORY_HISTORY_DIR)')
+    records = history.read([item.get('Item') for item in items])
+    if records.empty:
+        return items
+    # Daily periods, so the residual σ scales to the Lead_Time unit like the measured σ does
+    forecasts = forecast_items(records, method)
+    annual = forecasts['Annual_Forecast'].to_dict()
+    std = (forecasts['Residual_Std'] * float(data.get('demand_period_days', 1)) ** 0.5).to_dict()
+    return [dict(item, Demand_Forecast=annual[str(item.get('Item'))], Demand_Std=std[str(item.get('Item'))])
+            if str(item.get('Item')) in annual else item for item in items]
 
-def process_all_calculations(data, service_level=0.95, holding_cost_rate=0.2):
-    """Process all calculations: ABC Analysis, AI Classification, Demand Forecasting, Safety Stock"""
-    df = pd.DataFrame(data)
-    
-    # Step 1: ABC Analysis
-    df['Annual_Value'] = df['Annual_Usage'] * df['Unit_Cost']
-    df = df.sort_values(by='Annual_Value', ascending=False).reset_index(drop=True)
-    df['Cumulative%'] = df['Annual_Value'].cumsum() / df['Annual_Value'].sum() * 100
-    df['ABC_Category'] = df.apply(classify_abc, axis=1)
-    
-    # Step 2: Train Decision Tree for ABC Prediction
-    if len(df) >= 3:
-        features = df[['Annual_Usage', 'Unit_Cost', 'Lead_Time', 'Past_Demand']]
-        labels = df['ABC_Category']
-        
-        global decision_tree_model
-        decision_tree_model = DecisionTreeClassifier(random_state=42)
-        decision_tree_model.fit(features, labels)
-        df['Predicted_ABC'] = decision_tree_model.predict(features)
-    else:
-        df['Predicted_ABC'] = df['ABC_Category']
-    
-    # Step 3: Demand Forecasting using Linear Regression
-    if len(df) >= 2:
-        X = np.array(df['Past_Demand']).reshape(-1, 1)
-        y = np.array(df['Annual_Usage'])
-        
-        global regression_model
-        regression_model = LinearRegression()
-        regression_model.fit(X, y)
-        df['Predicted_Demand'] = regression_model.predict(X).round()
-    else:
-        df['Predicted_Demand'] = df['Annual_Usage']
-    
-    # Step 4: Safety Stock Calculation
-    df['Safety_Stock'] = df.apply(
-        lambda row: calculate_safety_stock(
-            row['Predicted_Demand'],
-            row['Lead_Time'],
-            service_level
-        ), axis=1
-    ).round()
-    
-    # Calculate Holding Cost
-    df['Holding_Cost'] = df.apply(
-        lambda row: calculate_holding_cost(
-            row['Safety_Stock'],
-            row['Unit_Cost'],
-            holding_cost_rate
-        ), axis=1
-    ).round(2)
-    
-    return df.to_dict('records')
+def with_demand_cv(frame, data):
+    """Add Demand_CV from the demand history (`demand_window_days`), for XYZ classification"""
+    window_days = data.get('demand_window_days')
+    if window_days is None:
+        return frame
+    history = get_demand_history()
+    if history is None:
+        raise ValueError('No demand history configured (set INVENTORY_HISTORY_DIR)')
+    cv = history.demand_cv(int(window_days), period_days=float(data.get('demand_period_days', 1)))
+    frame[DEMAND_CV_COLUMN] = frame['Item'].astype(str).map(cv)
+    return frame
+
+def get_metrics():
+    return current_app.extensions['metrics']
+
+def get_results_store():
+    return current_app.extensions['results']
+
+def get_inventory_store():
+    return current_app.extensions['inventory_store']
+
+def store_results():
+    """Results index of the persistent store's current version (`dataset=store`)"""
+    store = get_inventory_store()
+    if store is None:
+        raise ValueError('No inventory store configured (set INVENTORY_STORE_DB)')
+    dataset_id = f'store-{store.version}'
+    index = get_results_store().get(dataset_id)
+    if index is None:
+        index = get_results_store().add(store.frame(), dataset_id)
+    return index
+
+def results_id(cache_key):
+    """Dataset id of a cached calculation: the same request always maps to the same results"""
+    return cache_key[:16]
+
+def cached_results(cache_key, body, fmt):
+    """Register a cached /api/calculate body with the results store, decoded only if it is paged
+
+    The body may come from another worker or the disk tier, or its index
+    may have been evicted since; either way its X-Results-Id must resolve.
+    """
+    def load():
+        frame = decode_frame(body, fmt)
+        # Records JSON is written with sorted keys; put the pipeline's columns back in order
+        ordered = [col for col in OUTPUT_COLUMNS if col in frame.columns]
+        return frame[ordered + [col for col in frame.columns if col not in ordered]]
+
+    get_results_store().defer(results_id(cache_key), load)
+
+def results_query():
+    """ResultsQuery from the /api/results query string"""
+    args = request.args
+    order = args.get('order', 'asc')
+    if order not in SORT_ORDERS:
+        raise ValueError(f"order must be one of: {', '.join(SORT_ORDERS)}")
+    return ResultsQuery(
+        sort=args.get('sort') or None,
+        descending=order == 'desc',
+        # ?category=A,B or ?category=A&category=B
+        categories=tuple(cat for value in args.getlist('category') for cat in value.split(',') if cat),
+        value_column=args.get('value_column', 'Annual_Value'),
+        min_value=args.get('min_value', type=float),
+        max_value=args.get('max_value', type=float),
+        prefix=args.get('prefix') or None,
+    )
+
+def get_batch_executor():
+    """Shared process pool for partitioned batch runs"""
+    executor = current_app.extensions['batch_executor']
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=current_app.config['BATCH_WORKERS'])
+        current_app.extensions['batch_executor'] = executor
+    return executor
+
+def response_format():
+    """Requested response format from ?format= or the Accept header (records JSON by default)
+
+    Returns None when an explicitly requested format is not supported.
+    """
+    fmt = request.args.get('format')
+    if fmt:
+        return fmt if fmt in FORMATS else None
+    offered = list(MEDIA_TYPES.values()) + list(MEDIA_TYPE_ALIASES)
+    return format_for_media_type(request.accept_mimetypes.best_match(offered, default=MEDIA_TYPES[RECORDS]))
+
+def unsupported_format():
+    return jsonify({'error': f"Unsupported response format; choose one of: {', '.join(MEDIA_TYPES.values())}"}), 406
+
+def encoded_response(body, fmt):
+    response = current_app.response_class(body, mimetype=MEDIA_TYPES[fmt])
+    response.vary.add('Accept')
+    return response
+
+def streamed_response(lines):
+    """Send NDJSON lines as they are produced (chunked transfer)"""
+    response = current_app.response_class(lines, mimetype=MEDIA_TYPES[NDJSON])
+    response.vary.add('Accept')
+    return response
+
+def stream_batch_size():
+    return max(request.args.get('batch_size', DEFAULT_BATCH_ROWS, type=int), 1)
+
+def shutdown_app(app):
+    """Release worker-owned resources (the batch process pool, job threads) on shutdown"""
+    # Unfinished jobs in a SQLite job store are resumed by the next worker to start
+    app.extensions['job_queue'].shutdown(wait=False)
+    if app.extensions.get('inventory_store') is not None:
+        app.extensions['inventory_store'].close()
+    executor = app.extensions.get('batch_executor')
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+        app.extensions['batch_executor'] = None
+
+@api.before_app_request
+def start_request():
+    g.request_started = time.perf_counter()
+    mode = request.headers.get('X-Profile')
+    if mode and current_app.config['PROFILING']:
+        if mode not in PROFILE_MODES:
+            return jsonify({'error': f"X-Profile must be one of: {', '.join(PROFILE_MODES)}"}), 400
+        g.profile_report = {'mode': mode}
+        g.profile_stack = ExitStack()
+        g.profile_stack.enter_context(capture_profile(mode, g.profile_report))
+
+@api.after_app_request
+def finish_request(response):
+    """Record the request latency and hand back the profile id, if one was captured
+
+    Streamed bodies are still being produced at this point, so their latency
+    and profile only cover the work done before the first byte.
+    """
+    stack = g.pop('profile_stack', None)
+    if stack is not None:
+        stack.close()
+        profile_id = uuid.uuid4().hex
+        profiles = current_app.extensions['profiles']
+        profiles[profile_id] = g.profile_report
+        while len(profiles) > PROFILE_HISTORY:
+            profiles.popitem(last=False)
+        response.headers['X-Profile-Id'] = profile_id
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        get_metrics().histogram(
+            'inventory_http_request_duration_seconds', 'Request latency by route'
+        ).observe(time.perf_counter() - started, route=route, method=request.method, status=response.status_code)
+    return response
 
-@app.route('/api/calculate', methods=['POST'])
-def calculate():
-    """Main endpoint for processing inventory data"""
+@api.teardown_app_request
+def close_profile(exc):
+    # A request that failed before after_request still stops its profiler
+    stack = g.pop('profile_stack', None)
+    if stack is not None:
+        stack.close()
+
+@api.route('/api/calculate', methods=['POST'])
+def calculate(run_async=False):
+    """Main endpoint for processing inventory data (`"async": true` queues it as a background job)"""
     try:
         data = request.json
         items = data.get('items', [])
         service_level = data.get('service_level', 0.95)
         holding_cost_rate = data.get('holding_cost_rate', 0.2)
+        mode = data.get('mode', 'fit')
         
         if not items:
             return jsonify({'error': 'No items provided'}), 400
+        fmt = response_format()
+        if fmt is None:
+            return unsupported_format()
+        
+        model_registry = get_model_registry()
+        result_cache = get_result_cache()
+        if mode == 'predict-only':
+            # Score the items against a stored model without retraining
+            model_id = data.get('model_id') or model_registry.latest_fingerprint()
+            bundle = model_registry.get(model_id) if model_id else None
+            if bundle is None:
+                return jsonify({'error': 'No stored model found'}), 404
+        elif mode == 'fit':
+            model_id = None
+        else:
+            return jsonify({'error': f'Unknown mode: {mode}'}), 400
+        try:
+            items = with_forecast(with_measured_std(items, data), data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if run_async or data.get('async'):
+            job = get_job_queue().submit(items, service_level, holding_cost_rate, mode, model_id)
+            return jsonify({'success': True, 'job': job.to_dict()}), 202
         
-        results = process_all_calculations(items, service_level, holding_cost_rate)
+        if fmt == NDJSON:
+            # ABC and the models are computed up front; rows are scored while streaming
+            if mode == 'predict-only':
+                stream = stream_scores(items, bundle.classifier, bundle.regressor, service_level, holding_cost_rate)
+                stream.model_id = bundle.fingerprint
+            else:
+                stream = stream_calculations(items, service_level, holding_cost_rate, registry=model_registry)
+            return streamed_response(stream.ndjson(stream_batch_size()))
+        
+        # Identical requests are answered with the cached response body
+        cache_key = payload_key('calculate', fmt, mode, model_id, items, service_level, holding_cost_rate)
+        body = result_cache.get(cache_key)
+        timer = None
+        if body is None:
+            timer = StageTimer(len(items))
+            if mode == 'predict-only':
+                result = score_items(items, bundle.classifier, bundle.regressor, service_level, holding_cost_rate,
+                                     on_stage=timer)
+                result.model_id = bundle.fingerprint
+            else:
+                result = process_all_calculations(items, service_level, holding_cost_rate, registry=model_registry,
+                                                  on_stage=timer)
+            if fmt == RECORDS:
+                body = jsonify({
+                    'success': True,
+                    'model_id': result.model_id,
+                    'data': result.to_records()
+                }).get_data()
+            else:
+                body = encode_frame(result.frame, fmt, {'success': True, 'model_id': result.model_id})
+            timer('serialize')
+            get_metrics().observe_stages(timer, route='/api/calculate')
+            result_cache.set(cache_key, body)
+            get_results_store().add(result.frame, results_id(cache_key))
+        else:
+            cached_results(cache_key, body, fmt)
+        
+        response = encoded_response(body, fmt)
+        # Page through these results with GET /api/results?dataset=<id>
+        response.headers['X-Results-Id'] = results_id(cache_key)
+        if timer is not None:
+            response.headers['Server-Timing'] = timer.server_timing()
+        return response
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue a calculation in the background (same body as /api/calculate)"""
+    return calculate(run_async=True)
+
+@api.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status and progress of a background job"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+@api.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """One page of a finished job's rows (?offset=0&limit=1000)"""
+    try:
+        job_queue = get_job_queue()
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown job'}), 404
+        if job.status != DONE:
+            return jsonify({'error': f'Job is {job.status}', 'job': job.to_dict()}), 409
+        
+        offset = request.args.get('offset', 0, type=int)
+        limit = request.args.get('limit', 1000, type=int)
+        try:
+            page = job_queue.result(job_id, offset, limit)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        next_offset = offset + len(page)
         
         return jsonify({
             'success': True,
-            'data': results
+            'model_id': job.model_id,
+            'total': job.rows,
+            'offset': offset,
+            'next_offset': next_offset if next_offset < job.rows else None,
+            'data': page.to_dict('records')
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/upload', methods=['POST'])
+def upload():
+    """Bulk catalog upload (CSV, Parquet or Arrow file in the `file` form field)"""
+    try:
+        upload_file = request.files.get('file')
+        if upload_file is None or not upload_file.filename:
+            return jsonify({'error': 'No file provided'}), 400
+        service_level = request.form.get('service_level', 0.95, type=float)
+        holding_cost_rate = request.form.get('holding_cost_rate', 0.2, type=float)
+        include_data = request.form.get('include_data', 'false').lower() in ('1', 'true', 'yes')
+        
+        try:
+            catalog = load_catalog(upload_file.stream, detect_format(upload_file.filename))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if catalog.empty:
+            return jsonify({'error': 'No items provided'}), 400
+        
+        timer = StageTimer(len(catalog))
+        result = process_all_calculations(catalog, service_level, holding_cost_rate, registry=get_model_registry(),
+                                          on_stage=timer)
+        get_metrics().observe_stages(timer, route='/api/upload')
+        df = result.frame
+        response = {
+            'success': True,
+            'model_id': result.model_id,
+            'results_id': get_results_store().add(df).dataset_id,
+            'summary': {
+                'items': len(df),
+                'categories': {cat: int(count) for cat, count in df['ABC_Category'].value_counts().sort_index().items()},
+                'total_safety_stock': float(df['Safety_Stock'].sum()),
+                'total_holding_cost': float(df['Holding_Cost'].sum())
+            }
+        }
+        if include_data:
+            response['data'] = result.to_records()
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/batch', methods=['POST'])
+def batch():
+    """Run the pipeline separately for every partition (e.g. warehouse) of the items"""
+    try:
+        data = request.json
+        items = data.get('items', [])
+        partition_key = data.get('partition_key')
+        service_level = data.get('service_level', 0.95)
+        holding_cost_rate = data.get('holding_cost_rate', 0.2)
+        
+        if not items or not partition_key:
+            return jsonify({'error': 'Missing required data'}), 400
+        keys = [partition_key] if isinstance(partition_key, str) else list(partition_key)
+        
+        df = pd.DataFrame(items)
+        missing = [key for key in keys if key not in df.columns]
+        if missing:
+            return jsonify({'error': f"Unknown partition key: {', '.join(missing)}"}), 400
+        
+        results = run_partitioned(df, keys, service_level, holding_cost_rate, executor=get_batch_executor())
+        partitions = results.groupby(keys, sort=False, observed=True).size().reset_index(name='items')
+        
+        return jsonify({
+            'success': True,
+            'partitions': partitions.to_dict('records'),
+            'data': results.to_dict('records')
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/scenarios', methods=['POST'])
+def scenarios():
+    """Evaluate many service level / holding cost / lead time scenarios in one pass"""
+    try:
+        data = request.json
+        items = data.get('items', [])
+        include_items = bool(data.get('include_items', False))
+        
+        if not items:
+            return jsonify({'error': 'No items provided'}), 400
+        try:
+            items = with_forecast(with_measured_std(items, data), data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        try:
+            if data.get('scenarios'):
+                grid = [Scenario(float(s['service_level']), float(s['holding_cost_rate']),
+                                 float(s.get('lead_time_multiplier', 1.0))) for s in data['scenarios']]
+            else:
+                grid = scenario_grid(
+                    data.get('service_levels', [0.95]),
+                    data.get('holding_cost_rates', [0.2]),
+                    data.get('lead_time_multipliers', [1.0])
+                )
+            results = evaluate_scenarios(items, grid, registry=get_model_registry(), keep_items=include_items)
+        except KeyError as e:
+            return jsonify({'error': f'Invalid scenarios: missing {e.args[0]}'}), 400
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid scenarios: {e}'}), 400
+        
+        return jsonify({
+            'success': True,
+            'model_id': results.model_id,
+            **results.to_dict()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/tradeoff', methods=['POST'])
+@api.route('/api/tradeoff', methods=['POST'])
 def tradeoff():
     """Calculate service level trade-offs for selected products"""
     try:
         data = request.json
         items = data.get('items', [])
         selected_items = data.get('selected_items', [])
-        service_level_min = data.get('service_level_min', 80) / 100
-        service_level_max = data.get('service_level_max', 99) / 100
         holding_cost_rate = data.get('holding_cost_rate', 0.2)
         
         if not items or not selected_items:
             return jsonify({'error': 'Missing required data'}), 400
+        fmt = response_format()
+        if fmt is None:
+            return unsupported_format()
+        try:
+            service_levels = service_level_grid(float(data.get('service_level_min', 80)) / 100,
+                                                float(data.get('service_level_max', 99)) / 100,
+                                                float(data.get('service_level_step', 1)) / 100)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
         
         df = pd.DataFrame(items)
-        service_levels = np.arange(service_level_min, service_level_max + 0.01, 0.01)
-        
-        results = {}
-        for item_name in selected_items:
-            item_data = df[df['Item'] == item_name].iloc[0]
-            predicted_demand = item_data['Predicted_Demand']
-            lead_time = item_data['Lead_Time']
-            unit_cost = item_data['Unit_Cost']
-            
-            safety_stocks = []
-            holding_costs = []
-            
-            for sl in service_levels:
-                ss = calculate_safety_stock(predicted_demand, lead_time, sl)
-                hc = calculate_holding_cost(ss, unit_cost, holding_cost_rate)
-                safety_stocks.append(float(ss))
-                holding_costs.append(float(hc))
-            
-            results[item_name] = {
-                'service_levels': [float(sl * 100) for sl in service_levels],
-                'safety_stocks': safety_stocks,
-                'holding_costs': holding_costs
-            }
+        try:
+            if fmt == NDJSON:
+                return streamed_response(stream_tradeoff(df, selected_items, service_levels, holding_cost_rate,
+                                                         stream_batch_size()))
+            curves = tradeoff_curves(df, selected_items, service_levels, holding_cost_rate)
+        except KeyError as e:
+            return jsonify({'error': e.args[0]}), 400
+        if fmt != RECORDS:
+            return encoded_response(encode_tradeoff(curves, fmt, {'success': True}), fmt)
+        results = curves.to_dict()
         
         return jsonify({
             'success': True,
             'data': results
         })
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/results', methods=['GET'])
+def results():
+    """One page of a processed dataset, sorted and filtered on the server
+
+    Query string: sort, order (asc/desc), category, value_column, min_value,
+    max_value, prefix, limit and dataset (default: the latest; `store` for the
+    persistent inventory store). Follow-up
+    pages are requested with the returned cursor alone.
+    """
+    try:
+        fmt = response_format()
+        if fmt is None or fmt == NDJSON:
+            return unsupported_format()
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        try:
+            # A cursor names its own dataset
+            dataset_id = decode_cursor(cursor)[0] if cursor else request.args.get('dataset')
+            if dataset_id == 'store':
+                index = store_results()
+            else:
+                index = get_results_store().get(dataset_id)
+            if index is None and dataset_id:
+                # Evicted, or computed by another worker without a shared INVENTORY_RESULTS_DIR
+                return jsonify({'error': f'Unknown or expired dataset: {dataset_id}; '
+                                         'rerun /api/calculate or /api/upload'}), 404
+            if index is None:
+                return jsonify({'error': 'No processed results found; run /api/calculate or /api/upload first'}), 404
+            page = index.resume(cursor, limit) if cursor else index.page(results_query(), 0, limit or DEFAULT_PAGE_SIZE)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        meta = {
+            'success': True,
+            'dataset': index.dataset_id,
+            'total': page.total,
+            'offset': page.offset,
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+        }
+        if fmt == RECORDS:
+            return jsonify({**meta, 'data': page.rows.to_dict('records')})
+        return encoded_response(encode_frame(page.rows, fmt, meta), fmt)
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/charts', methods=['POST'])
+def charts():
+    """Dashboard figures as plotly JSON whose size does not grow with the catalog
+
+    Same body as /api/calculate, plus `max_points` (per line/scatter series)
+    and `top_n` (bars in the per-item charts).
+    """
+    try:
+        data = request.json
+        items = data.get('items', [])
+        service_level = data.get('service_level', 0.95)
+        holding_cost_rate = data.get('holding_cost_rate', 0.2)
+        max_points = int(data.get('max_points', DEFAULT_MAX_POINTS))
+        top_n = int(data.get('top_n', DEFAULT_TOP_N))
+        
+        if not items:
+            return jsonify({'error': 'No items provided'}), 400
+        if max_points < 3 or top_n < 1:
+            return jsonify({'error': 'max_points must be at least 3 and top_n at least 1'}), 400
+        try:
+            items = with_forecast(with_measured_std(items, data), data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        result_cache = get_result_cache()
+        cache_key = payload_key('charts', items, service_level, holding_cost_rate, max_points, top_n)
+        body = result_cache.get(cache_key)
+        timer = None
+        if body is None:
+            timer = StageTimer(len(items))
+            result = process_all_calculations(items, service_level, holding_cost_rate, registry=get_model_registry(),
+                                              on_stage=timer)
+            # The figures are already JSON; splice them in rather than parsing and re-encoding
+            figures = chart_json(result.frame, max_points, top_n)
+            body = f'{{"success":true,"model_id":{json.dumps(result.model_id)},"figures":{figures}}}'.encode('utf-8')
+            timer('charts')
+            get_metrics().observe_stages(timer, route='/api/charts')
+            result_cache.set(cache_key, body)
+        
+        response = encoded_response(body, RECORDS)
+        if timer is not None:
+            response.headers['Server-Timing'] = timer.server_timing()
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/classify', methods=['POST'])
+def classify_items():
+    """ABC / XYZ / custom labels per item, and the matrix of the first two criteria
+
+    `criteria` is a list of {name, kind, column, breakpoints, labels}
+    specs (default: ABC, plus XYZ when the items carry Demand_CV or
+    `demand_window_days` is given). `group_by` takes shares within each
+    value of a column, e.g. Warehouse.
+    """
+    try:
+        data = request.json or {}
+        items = data.get('items', [])
+        group_by = data.get('group_by')
+        
+        if not items:
+            return jsonify({'error': 'No items provided'}), 400
+        fmt = response_format()
+        if fmt is None or fmt == NDJSON:
+            return unsupported_format()
+        timer = StageTimer(len(items))
+        try:
+            frame = with_demand_cv(pd.DataFrame(items), data)
+            specs = data.get('criteria')
+            if specs is None:
+                specs = [{'name': 'ABC'}] + ([{'name': 'XYZ'}] if DEMAND_CV_COLUMN in frame.columns else [])
+            criteria = [Criterion.from_dict(spec) for spec in specs]
+            labels = classify(frame, criteria, group_by)
+        except (ValueError, TypeError, KeyError) as e:
+            return jsonify({'error': str(e)}), 400
+        timer('classify')
+        meta = {
+            'success': True,
+            'counts': {criterion.name: labels[criterion.output_column].value_counts(sort=False).to_dict()
+                       for criterion in criteria},
+        }
+        if len(criteria) > 1:
+            rows, columns = criteria[:2]
+            matrix = class_matrix(labels, rows, columns)
+            meta['matrix'] = {'rows': list(rows.labels), 'columns': list(columns.labels),
+                              'counts': matrix.to_numpy().tolist()}
+        keys = ['Item'] + ([group_by] if group_by else [])
+        result = pd.concat([frame[keys], labels.astype(str)], axis=1)
+        if fmt == RECORDS:
+            response = jsonify({**meta, 'data': result.to_dict('records')})
+        else:
+            response = encoded_response(encode_frame(result, fmt, meta), fmt)
+        timer('serialize')
+        get_metrics().observe_stages(timer, route='/api/classify')
+        response.headers['Server-Timing'] = timer.server_timing()
+        return response
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/history', methods=['POST'])
+def append_history():
+    """Append daily demand records (Item, Date, Demand) to the demand history"""
+    try:
+        history = get_demand_history()
+        if history is None:
+            return jsonify({'error': 'No demand history configured (set INVENTORY_HISTORY_DIR)'}), 404
+        records = (request.json or {}).get('records', [])
+        if not records:
+            return jsonify({'error': 'No records provided'}), 400
+        try:
+            rows = history.append(pd.DataFrame(records))
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'success': True, 'rows': rows, 'version': history.version})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/history/stats', methods=['GET'])
+def history_stats():
+    """Per-item count, mean and σ of daily demand (?window_days=, ?items=A,B)"""
+    try:
+        history = get_demand_history()
+        if history is None:
+            return jsonify({'error': 'No demand history configured (set INVENTORY_HISTORY_DIR)'}), 404
+        stats = history.stats(request.args.get('window_days', type=int))
+        items = request.args.get('items')
+        if items:
+            stats = stats[stats.index.isin(items.split(','))]
+        return jsonify({
+            'success': True,
+            'version': history.version,
+            'data': stats.reset_index().to_dict('records')
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/store/catalog', methods=['POST'])
+def store_catalog():
+    """Replace the stored catalog (`"sync": true` sends only the difference from the stored one)"""
+    try:
+        store = get_inventory_store()
+        if store is None:
+            return jsonify({'error': 'No inventory store configured (set INVENTORY_STORE_DB)'}), 404
+        data = request.json or {}
+        items = data.get('items', [])
+        service_level = data.get('service_level', 0.95)
+        holding_cost_rate = data.get('holding_cost_rate', 0.2)
+        if not items:
+            return jsonify({'error': 'No items provided'}), 400
+        try:
+            items = with_measured_std(items, data)
+            write = store.sync if data.get('sync') else store.load
+            delta = write(items, service_level, holding_cost_rate)
+        except (ValueError, KeyError) as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'success': True, **delta.to_dict()})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/store/delta', methods=['POST'])
+def store_delta():
+    """Apply changed items (`items`) and removed ones (`deletes`) to the stored catalog
+
+    Only the sent items are scored; the response lists every item whose
+    ABC category moved as a result. A new `service_level` or
+    `holding_cost_rate` rescores safety stock for the whole catalog.
+    """
+    try:
+        store = get_inventory_store()
+        if store is None:
+            return jsonify({'error': 'No inventory store configured (set INVENTORY_STORE_DB)'}), 404
+        data = request.json or {}
+        items = data.get('items', [])
+        deletes = data.get('deletes', [])
+        service_level = data.get('service_level')
+        holding_cost_rate = data.get('holding_cost_rate')
+        if not items and not deletes and service_level is None and holding_cost_rate is None:
+            return jsonify({'error': 'No changes provided'}), 400
+        try:
+            items = with_measured_std(items, data)
+            delta = store.apply_delta(items or None, deletes, service_level, holding_cost_rate)
+        except (ValueError, KeyError) as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'success': True, **delta.to_dict()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/store/changes', methods=['GET'])
+def store_changes():
+    """Stored rows written, and items deleted, after version ?since= (0 for everything)"""
+    try:
+        store = get_inventory_store()
+        if store is None:
+            return jsonify({'error': 'No inventory store configured (set INVENTORY_STORE_DB)'}), 404
+        fmt = response_format()
+        if fmt is None or fmt == NDJSON:
+            return unsupported_format()
+        version = store.version
+        changed, deleted = store.changes(request.args.get('since', 0, type=int))
+        meta = {'success': True, 'version': version, 'deleted': deleted}
+        if fmt == RECORDS:
+            changed = changed.astype(object).where(changed.notna(), None)
+            return jsonify({**meta, 'data': changed.to_dict('records')})
+        return encoded_response(encode_frame(changed, fmt, meta), fmt)
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/store/stats', methods=['GET'])
+def store_stats():
+    """Version, item count per ABC category and the parameters of the stored catalog"""
+    try:
+        store = get_inventory_store()
+        if store is None:
+            return jsonify({'error': 'No inventory store configured (set INVENTORY_STORE_DB)'}), 404
+        return jsonify({'success': True, **store.stats()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/models', methods=['GET'])
+def models():
+    """List stored model fingerprints"""
+    model_registry = get_model_registry()
+    return jsonify({
+        'models': model_registry.fingerprints(),
+        'latest': model_registry.latest_fingerprint()
+    })
+
+@api.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Result cache hit/miss counters"""
+    return jsonify(get_result_cache().stats())
+
+@api.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Request latency histograms and pipeline stage timings in the Prometheus text format"""
+    return current_app.response_class(get_metrics().render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/api/profiles/<profile_id>', methods=['GET'])
+def profile(profile_id):
+    """Text report of a request profiled with the X-Profile header"""
+    report = current_app.extensions['profiles'].get(profile_id)
+    if report is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return current_app.response_class(report.get('text', ''), mimetype='text/plain')
+
+@api.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({'status': 'healthy'})
 
+app = create_app()
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000, host='0.0.0.0')
+    # Development server only; serve production traffic with gunicorn (see gunicorn.conf.py)
+    app.run(debug=os.environ.get('FLASK_DEBUG', '1') == '1', port=5000, host='0.0.0.0')
 
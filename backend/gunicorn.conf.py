@@ -0,0 +1,44 @@
+"""gunicorn settings for the inventory API (cd backend && gunicorn -c gunicorn.conf.py wsgi:app)
+
+Every setting can be overridden from the environment, e.g.
+INVENTORY_WORKERS=8 INVENTORY_BIND=0.0.0.0:8000.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('INVENTORY_BIND', '0.0.0.0:5000')
+wsgi_app = 'wsgi:app'
+chdir = os.path.dirname(os.path.abspath(__file__))
+
+# Preforked workers; the calculations are CPU bound so a few threads per
+# worker only cover I/O waits (request bodies, model files)
+workers = int(os.environ.get('INVENTORY_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('INVENTORY_THREADS', 2))
+
+# Import the app, heavy libraries and stored models once in the master
+preload_app = True
+
+# Large uploads and catalogs take a while; give in-flight requests time to
+# finish on SIGTERM / HUP before workers are killed
+timeout = int(os.environ.get('INVENTORY_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('INVENTORY_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth of long-lived caches
+max_requests = int(os.environ.get('INVENTORY_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+# Set INVENTORY_ACCESS_LOG to an empty string to turn access logging off
+accesslog = os.environ.get('INVENTORY_ACCESS_LOG', '-') or None
+
+
+def when_ready(server):
+    from wsgi import preloaded_models
+    server.log.info('Preloaded %d stored model(s)', preloaded_models)
+
+
+def worker_exit(server, worker):
+    # Shut the worker's /api/batch process pool down cleanly
+    from app import shutdown_app
+    shutdown_app(worker.wsgi)
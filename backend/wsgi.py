@@ -0,0 +1,38 @@
+"""WSGI entry point for production serving.
+
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app (see gunicorn.conf.py) this module is imported once in
+the gunicorn master: pandas, scikit-learn and SciPy are imported, lazily
+loaded submodules are warmed up by a tiny calculation, and the stored
+models are read into the registry before the workers are forked, so every
+worker shares those pages copy-on-write instead of loading its own copy.
+"""
+import gc
+import os
+
+from app import app, get_model_registry
+from inventory_core import ModelRegistry, process_all_calculations, tradeoff_curves
+
+WARM_UP_ITEMS = [
+    {'Item': f'W{i}', 'Annual_Usage': 100 * i + 50, 'Unit_Cost': i + 1, 'Lead_Time': 2, 'Past_Demand': 90 * i + 40}
+    for i in range(5)
+]
+
+
+def preload(flask_app):
+    """Import-time work done once in the master before forking"""
+    with flask_app.app_context():
+        loaded = get_model_registry().preload(int(os.environ.get('INVENTORY_PRELOAD_MODELS', 8)))
+    # Run every stage once (in-memory registry, nothing stored) to pull in lazy imports
+    df = process_all_calculations(WARM_UP_ITEMS, registry=ModelRegistry()).frame
+    tradeoff_curves(df, [df['Item'].iloc[0]], [0.9, 0.95], 0.2)
+    # Service levels off engine.Z_TABLE fall back to SciPy; import it here rather than in a worker
+    import scipy.special  # noqa: F401
+    # Keep the preloaded objects out of the workers' GC passes so their pages stay shared
+    gc.collect()
+    gc.freeze()
+    return loaded
+
+
+preloaded_models = preload(app)
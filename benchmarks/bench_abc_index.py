@@ -0,0 +1,91 @@
+"""Benchmark: incremental ABC reclassification vs a full re-rank per change.
+
+Builds an inventory_core.abc_index.ABCIndex over a synthetic catalog, then
+applies single-item updates (new annual value for a random item), inserts
+and deletes, and reports per-operation latency next to the cost of one
+full sort + cumulative sum over the catalog. The index's categories are
+checked against a full re-rank at the end.
+
+Usage:
+    python benchmarks/bench_abc_index.py                    # 1M items
+    python benchmarks/bench_abc_index.py --rows 100000 --updates 20000 --batch 100
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_core.abc_index import DEFAULT_LOAD, ABCIndex
+from inventory_core.store import rank_abc
+from inventory_core.synthetic import synthetic_catalog
+
+
+def percentiles(seconds):
+    micros = np.asarray(seconds) * 1e6
+    return f'median {np.median(micros):,.1f} µs, p99 {np.percentile(micros, 99):,.1f} µs'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--updates', type=int, default=10_000)
+    parser.add_argument('--batch', type=int, default=1000, help='items per batched apply()')
+    parser.add_argument('--load', type=int, default=DEFAULT_LOAD, help='keys per sublist')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    catalog = synthetic_catalog(args.rows, seed=args.seed)
+    items = catalog['Item'].astype(str).tolist()
+    values = (catalog['Annual_Usage'] * catalog['Unit_Cost']).to_numpy(dtype=float)
+
+    start = time.perf_counter()
+    rank_abc(np.asarray(items, dtype=object), values)
+    full = time.perf_counter() - start
+    start = time.perf_counter()
+    index = ABCIndex(items, values, args.load)
+    print(f'{args.rows:,} items: full re-rank {full * 1000:,.0f} ms, '
+          f'index build {(time.perf_counter() - start) * 1000:,.0f} ms')
+
+    def new_value():
+        return float(values[rng.integers(len(values))] * rng.uniform(0.5, 2.0))
+
+    timings = {'update': [], 'insert': [], 'delete': []}
+    changed = 0
+    for i in range(args.updates):
+        item = items[rng.integers(len(items))]
+        start = time.perf_counter()
+        changed += len(index.update(item, new_value()))
+        timings['update'].append(time.perf_counter() - start)
+        if i % 10 == 0:
+            start = time.perf_counter()
+            index.update(f'NEW{i:09d}', new_value())
+            timings['insert'].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            index.remove(f'NEW{i:09d}')
+            timings['delete'].append(time.perf_counter() - start)
+    for name, seconds in timings.items():
+        print(f'{name:>7}: {percentiles(seconds)} ({len(seconds):,} ops, {full / np.median(seconds):,.0f}x '
+              f'faster than a re-rank)')
+    print(f'categories changed by single updates: {changed:,} ({changed / args.updates:.2f} per update)')
+
+    batch = [(items[rng.integers(len(items))], new_value()) for _ in range(args.batch)]
+    start = time.perf_counter()
+    changed = index.apply(batch)
+    print(f'  batch: {args.batch:,} updates in {(time.perf_counter() - start) * 1000:,.1f} ms, '
+          f'{len(changed):,} categories changed')
+
+    indexed = index.annual_values()
+    current = np.asarray(list(indexed), dtype=object)
+    order, _, expected = rank_abc(current, np.asarray(list(indexed.values()), dtype=float))
+    actual = np.asarray([index.category(item) for item in current[order]], dtype=object)
+    print(f'mismatches vs a full re-rank: {int((actual != expected).sum())} of {len(current):,}')
+    print(f'A/B/C: {index.counts()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark: batched per-SKU forecasting throughput (SKUs/s).
+
+Generates a synthetic SKUs × periods demand matrix (Poisson demand with a
+weekly pattern) and fits every method of inventory_core.forecasting to all
+SKUs at once, then with the given process pool sizes. A per-SKU Python
+loop over the same functions is timed on --loop-skus SKUs for comparison.
+
+Usage:
+    python benchmarks/bench_forecasting.py
+    python benchmarks/bench_forecasting.py --skus 1000000 --periods 365 --workers 1 2 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_core.forecasting import FORECAST_METHODS, forecast_matrix
+
+
+def make_demand(skus, periods, seed=42):
+    rng = np.random.default_rng(seed)
+    base = rng.pareto(1.5, skus)[:, None] * 10 + 1
+    weekly = 1 + 0.3 * np.sin(2 * np.pi * np.arange(periods) / 7)[None, :]
+    return rng.poisson(base * weekly).astype(float)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--skus', type=int, default=200_000)
+    parser.add_argument('--periods', type=int, default=365)
+    parser.add_argument('--horizon', type=int, default=28)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1])
+    parser.add_argument('--loop-skus', type=int, default=2_000)
+    args = parser.parse_args()
+
+    demand = make_demand(args.skus, args.periods)
+    print(f'{args.skus:,} SKUs × {args.periods} periods, horizon {args.horizon}')
+    print(f"{'method':<16} {'mode':<12} {'seconds':>9} {'SKUs/s':>14}")
+    for method in FORECAST_METHODS:
+        sample = demand[:args.loop_skus]
+        elapsed = timed(lambda: [forecast_matrix(row[None, :], method, args.horizon) for row in sample])
+        print(f"{method:<16} {'per-SKU':<12} {elapsed:>9.2f} {len(sample) / elapsed:>14,.0f}")
+        for workers in args.workers:
+            elapsed = timed(lambda: forecast_matrix(demand, method, args.horizon, max_workers=workers))
+            mode = 'batched' if workers == 1 else f'{workers} workers'
+            print(f'{method:<16} {mode:<12} {elapsed:>9.2f} {args.skus / elapsed:>14,.0f}')
+
+
+if __name__ == '__main__':
+    main()
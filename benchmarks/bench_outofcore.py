@@ -0,0 +1,108 @@
+"""Benchmark: out-of-core ABC classification on a large synthetic catalog.
+
+Writes a synthetic catalog file chunk by chunk (Parquet when pyarrow is
+installed, CSV otherwise), classifies it with inventory_core.outofcore and
+reports wall time, throughput and peak RSS. Below --verify-limit rows the
+result is also checked against the in-memory apply_abc path; equal values
+straddling a breakpoint can be ranked either way, so a few tied items may
+differ.
+
+Usage:
+    python benchmarks/bench_outofcore.py                   # 50M rows
+    python benchmarks/bench_outofcore.py --rows 2000000 --chunksize 500000
+"""
+import argparse
+import importlib.util
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_core.engine import apply_abc
+from inventory_core.ingest import iter_csv_chunks, iter_parquet_chunks
+from inventory_core.outofcore import VALUE_COLUMNS, assign_pass, build_sketch
+from inventory_core.synthetic import synthetic_catalog
+
+
+def write_catalog(path, rows, chunksize, fmt, seed=42):
+    """Write `rows` synthetic rows to `path` without holding them all"""
+    writer = None
+    for start in range(0, rows, chunksize):
+        chunk = synthetic_catalog(min(chunksize, rows - start), seed=seed + start, start=start, total=rows)
+        # float32 keeps the multi-GB file and its chunks small
+        chunk = chunk.astype({col: np.float32 for col in chunk.columns if col != 'Item'})
+        if fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        else:
+            chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    if writer is not None:
+        writer.close()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000_000)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=['parquet', 'csv'], default=None)
+    parser.add_argument('--verify-limit', type=int, default=5_000_000)
+    parser.add_argument('--keep', help='write the synthetic file here and keep it')
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt is None:
+        fmt = 'parquet' if importlib.util.find_spec('pyarrow') else 'csv'
+    path = args.keep or os.path.join(tempfile.mkdtemp(), f'catalog.{fmt}')
+    reader = iter_parquet_chunks if fmt == 'parquet' else iter_csv_chunks
+
+    start = time.perf_counter()
+    write_catalog(path, args.rows, args.chunksize, fmt)
+    print(f'wrote {args.rows:,} rows to {path} ({os.path.getsize(path) / 1e6:,.0f} MB) '
+          f'in {time.perf_counter() - start:.1f}s')
+
+    def make_chunks():
+        return reader(path, args.chunksize)
+
+    start = time.perf_counter()
+    sketch = build_sketch(lambda: reader(path, args.chunksize, columns=VALUE_COLUMNS))
+    sketch_time = time.perf_counter() - start
+    counts = np.zeros(3, dtype=np.int64)
+    labels = []
+    for chunk in assign_pass(make_chunks(), sketch):
+        counts += (chunk['ABC_Category'].to_numpy()[:, None] == np.array(['A', 'B', 'C'])).sum(axis=0)
+        if args.rows <= args.verify_limit:
+            labels.append(chunk[['Item', 'ABC_Category']])
+    total_time = time.perf_counter() - start
+
+    print(f'sketch + refine: {sketch_time:.1f}s, total: {total_time:.1f}s, '
+          f'{args.rows / total_time:,.0f} rows/s, boundary items refined: {len(sketch.boundary_rows):,}')
+    print(f'A/B/C: {counts[0]:,} / {counts[1]:,} / {counts[2]:,}, peak RSS: {peak_rss_mb():,.0f} MB')
+
+    if args.rows <= args.verify_limit:
+        streamed = pd.concat(labels).set_index('Item')['ABC_Category']
+        in_memory = apply_abc(pd.concat(make_chunks(), ignore_index=True)).set_index('Item')['ABC_Category']
+        mismatches = int((streamed.sort_index() != in_memory.sort_index()).sum())
+        print(f'mismatches vs in-memory apply_abc: {mismatches}')
+
+    if not args.keep:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark: partitioned pipeline throughput versus process pool size.
+
+Builds a synthetic catalog spread over --partitions warehouses and runs
+inventory_core.parallel.run_partitioned serially in-process and then on a
+warm pool of 1, 2, 4, ... workers (up to the CPU count), reporting wall
+time, rows/s and speedup over the serial run. Run it at several --rows
+to find where the pool starts to pay off (PARALLEL_MIN_ROWS).
+
+Usage:
+    python benchmarks/bench_parallel.py
+    python benchmarks/bench_parallel.py --rows 2000000 --partitions 32 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_core.bench import make_catalog
+from inventory_core.parallel import run_partitioned, usable_cpus
+
+
+def default_workers():
+    cpus = usable_cpus()
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--partitions', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers())
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_catalog(args.rows)
+    df['Warehouse'] = np.char.add('WH', (np.arange(args.rows) % args.partitions).astype(str))
+    print(f'{args.rows:,} rows in {args.partitions} partitions')
+    print(f"{'workers':>8} {'seconds':>10} {'rows/s':>14} {'speedup':>8}")
+
+    def best_of(**kwargs):
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run_partitioned(df, 'Warehouse', **kwargs)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    # A min_rows above the catalog size keeps every partition in this process
+    baseline = best_of(min_rows=args.rows + 1)
+    print(f"{'serial':>8} {baseline:>10.2f} {args.rows / baseline:>14,.0f} {1:>7.2f}x")
+    for workers in args.workers:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Warm the pool so worker start-up and imports are not timed
+            run_partitioned(df.head(args.partitions * 10), 'Warehouse', executor=executor, min_rows=0)
+            best = best_of(executor=executor, min_rows=0)
+        print(f'{workers:>8} {best:>10.2f} {args.rows / best:>14,.0f} {baseline / best:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
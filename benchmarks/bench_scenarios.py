@@ -0,0 +1,59 @@
+"""Benchmark: a scenario sweep as repeated pipeline runs vs one evaluate_scenarios call.
+
+Sweeps service level × holding cost rate × lead time multiplier over a
+synthetic catalog, first by calling process_all_calculations once per
+scenario (what a client looping over /api/calculate costs), then with
+inventory_core.scenarios.evaluate_scenarios, and checks the totals agree.
+
+Usage:
+    python benchmarks/bench_scenarios.py
+    python benchmarks/bench_scenarios.py --rows 100000 --levels 10 --rates 4 --multipliers 3
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_core import evaluate_scenarios, process_all_calculations, scenario_grid
+from inventory_core.bench import make_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--levels', type=int, default=5)
+    parser.add_argument('--rates', type=int, default=3)
+    parser.add_argument('--multipliers', type=int, default=2)
+    args = parser.parse_args()
+
+    df = make_catalog(args.rows)
+    grid = scenario_grid(
+        np.linspace(0.85, 0.99, args.levels),
+        np.linspace(0.1, 0.3, args.rates),
+        np.linspace(1.0, 2.0, args.multipliers)
+    )
+    print(f'{args.rows:,} items × {len(grid)} scenarios')
+
+    start = time.perf_counter()
+    looped = []
+    for scenario in grid:
+        scaled = df.assign(Lead_Time=df['Lead_Time'] * scenario.lead_time_multiplier)
+        looped.append(process_all_calculations(scaled, scenario.service_level, scenario.holding_cost_rate)
+                      .frame['Holding_Cost'].sum())
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = evaluate_scenarios(df, grid, keep_items=False)
+    sweep_time = time.perf_counter() - start
+
+    print(f'one pipeline run per scenario: {loop_time:8.2f}s')
+    print(f'evaluate_scenarios:            {sweep_time:8.2f}s ({loop_time / sweep_time:,.0f}x faster)')
+    print(f'totals agree: {np.allclose(looped, results.total_holding_cost)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark: cold-start import time of the backend and the core package.
+
+Runs each target in a fresh interpreter with `python -X importtime`,
+keeps the fastest of --repeat runs and lists the slowest imports. Fails
+(exit code 1) when a target exceeds its time budget or pulls in a module
+that must stay deferred until first use: scikit-learn and SciPy (loaded
+on the first model fit / uncommon service level), plotly (loaded when the
+Streamlit app draws its first chart) and matplotlib (not used at all).
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 5 --budget-ms backend=800 core=600
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (working directory, statement)
+TARGETS = {
+    'core': (ROOT, 'import inventory_core'),
+    'backend': (os.path.join(ROOT, 'backend'), 'import app'),
+}
+DEFAULT_BUDGET_MS = {'core': 900, 'backend': 1200}
+DEFERRED_MODULES = ['sklearn', 'scipy', 'plotly', 'matplotlib']
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)')
+
+
+def measure(cwd, statement):
+    """(total ms, [(cumulative ms, module)] for top-level-ish imports, loaded deferred modules)"""
+    check = (f'{statement}; import sys; '
+             f'print(",".join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', check], cwd=cwd,
+                            capture_output=True, text=True, check=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            depth = (len(match.group(3)) - 1) // 2
+            imports.append((int(match.group(2)) / 1000, depth, match.group(4)))
+    total = sum(cumulative for cumulative, depth, _ in imports if depth == 0)
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return total, imports, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--budget-ms', nargs='+', default=[], metavar='TARGET=MS',
+                        help='Override a time budget, e.g. backend=800')
+    args = parser.parse_args()
+    budgets = dict(DEFAULT_BUDGET_MS)
+    for override in args.budget_ms:
+        name, _, value = override.partition('=')
+        budgets[name] = float(value)
+
+    failures = []
+    for name, (cwd, statement) in TARGETS.items():
+        runs = [measure(cwd, statement) for _ in range(args.repeat)]
+        total, imports, loaded = min(runs, key=lambda run: run[0])
+        print(f'{name}: {statement!r} in {total:.0f} ms (budget {budgets[name]:.0f} ms, best of {args.repeat})')
+        for cumulative, depth, module in sorted(imports, key=lambda item: -item[0])[:args.top]:
+            print(f'    {cumulative:>8.1f} ms  {"  " * depth}{module}')
+        if total > budgets[name]:
+            failures.append(f'{name} took {total:.0f} ms, over its {budgets[name]:.0f} ms budget')
+        if loaded:
+            failures.append(f"{name} imported {', '.join(loaded)} at startup")
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    if failures:
+        sys.exit(1)
+    print('OK: startup within budget, no deferred modules loaded')
+
+
+if __name__ == '__main__':
+    main()
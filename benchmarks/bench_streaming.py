@@ -0,0 +1,68 @@
+"""Benchmark: buffered JSON vs streamed NDJSON responses from the Flask API.
+
+Posts the same synthetic catalog to /api/calculate (and a trade-off request
+for every item to /api/tradeoff) through Flask's test client, once as the
+default records JSON and once as NDJSON, and reports time to first byte,
+total time and the peak traced memory (tracemalloc) of each. The request
+body is built before tracing starts, so only the server side is measured.
+
+Usage:
+    python benchmarks/bench_streaming.py
+    python benchmarks/bench_streaming.py --rows 500000 --batch-size 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from app import create_app  # noqa: E402
+from inventory_core.bench import make_catalog  # noqa: E402
+
+
+def measure(client, path, payload, query):
+    """(time to first byte, total time, peak traced MB, body bytes) for one request"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.post(path + query, json=payload, buffered=False)
+    first_byte = None
+    size = 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    response.close()
+    return first_byte, total, peak / 1e6, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=5_000)
+    args = parser.parse_args()
+
+    app = create_app({'MODEL_DIR': tempfile.mkdtemp(), 'CACHE_SIZE': 0})
+    client = app.test_client()
+    items = make_catalog(args.rows).to_dict('records')
+    calculate = {'items': items}
+    calculated = client.post('/api/calculate?format=columns', json=calculate).get_json()['data']
+    results = [dict(zip(calculated, row)) for row in zip(*calculated.values())]
+    tradeoff = {'items': results, 'selected_items': [row['Item'] for row in results]}
+
+    print(f'{args.rows:,} items, NDJSON batches of {args.batch_size:,}')
+    print(f"{'request':<28} {'TTFB s':>8} {'total s':>8} {'peak MB':>9} {'body MB':>9}")
+    for path, payload in [('/api/calculate', calculate), ('/api/tradeoff', tradeoff)]:
+        for label, query in [('json', ''), ('ndjson', f'?format=ndjson&batch_size={args.batch_size}')]:
+            first_byte, total, peak, size = measure(client, path, payload, query)
+            print(f'{path + " " + label:<28} {first_byte:>8.2f} {total:>8.2f} {peak:>9.0f} {size / 1e6:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
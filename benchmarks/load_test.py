@@ -0,0 +1,88 @@
+"""Load test: latency percentiles of /api/calculate and /api/tradeoff at fixed concurrency.
+
+Start the server first (e.g. cd backend && gunicorn -c gunicorn.conf.py),
+then run:
+
+    python benchmarks/load_test.py --url http://localhost:5000 --concurrency 16 --requests 400
+
+Each /api/calculate request uses a slightly different service level so the
+result cache does not answer it (pass --cached to measure cache hits).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_core.bench import make_catalog
+
+
+def post(url, payload):
+    """POST a JSON payload; returns (seconds, HTTP status)"""
+    body = json.dumps(payload).encode()
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def run(url, payloads, concurrency):
+    """Send every payload with `concurrency` requests in flight; returns latencies, errors, wall time"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda payload: post(url, payload), payloads))
+    wall = time.perf_counter() - start
+    latencies = np.array([seconds for seconds, _ in results])
+    errors = sum(status != 200 for _, status in results)
+    return latencies, errors, wall
+
+
+def report(name, latencies, errors, wall):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f'{name:<16} {len(latencies):>8} {errors:>7} {len(latencies) / wall:>9.1f} '
+          f'{p50:>9.1f} {p99:>9.1f} {latencies.max() * 1000:>9.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400, help='requests per endpoint')
+    parser.add_argument('--items', type=int, default=500, help='items per request')
+    parser.add_argument('--selected', type=int, default=5, help='items per trade-off request')
+    parser.add_argument('--cached', action='store_true', help='repeat one identical /api/calculate payload')
+    args = parser.parse_args()
+
+    items = make_catalog(args.items).to_dict('records')
+    calculate = [
+        {'items': items, 'service_level': 0.95 if args.cached else 0.9 + (i % 1000) / 20000, 'holding_cost_rate': 0.2}
+        for i in range(args.requests)
+    ]
+    # Trade-off curves need calculated items (Predicted_Demand, Unit_Cost)
+    req = urllib.request.Request(f'{args.url}/api/calculate', data=json.dumps(calculate[0]).encode(),
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req) as response:
+        calculated = json.loads(response.read())['data']
+    selected = [item['Item'] for item in calculated[:args.selected]]
+    tradeoff = [{'items': calculated, 'selected_items': selected, 'holding_cost_rate': 0.2}] * args.requests
+
+    print(f'{args.items} items per request, concurrency {args.concurrency}')
+    print(f"{'endpoint':<16} {'requests':>8} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    report('/api/calculate', *run(f'{args.url}/api/calculate', calculate, args.concurrency))
+    report('/api/tradeoff', *run(f'{args.url}/api/tradeoff', tradeoff, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
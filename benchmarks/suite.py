@@ -0,0 +1,184 @@
+"""Benchmark suite: every pipeline stage and the main endpoints, 10 to 10M rows.
+
+Cases run on synthetic catalogs (inventory_core.synthetic: Pareto annual
+value, mixed lead times) at each --rows size:
+
+    classify_abc      engine.classify_abc on a precomputed Cumulative% column
+    safety_stock      engine.calculate_safety_stock on the prediction arrays
+    apply_abc         sort + cumulative % + labels on the catalog
+    classify          classification.classify: ABC within 20 warehouses plus XYZ
+    pipeline          process_all_calculations end to end
+    charts            chart_json (bounded dashboard figures) on the pipeline results
+    api_calculate     POST /api/calculate through the Flask test client
+    api_tradeoff      POST /api/tradeoff for up to 1,000 items
+
+The API cases are skipped above --api-max-rows, where building the JSON
+request would dominate. Results (best and median seconds per case) are
+written as JSON together with the commit and library versions, and
+--compare reports the change against an earlier results file:
+
+    python benchmarks/suite.py --rows 10 1000 100000 1000000 -o before.json
+    python benchmarks/suite.py --rows 10 1000 100000 1000000 --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+import pandas as pd  # noqa: E402
+import scipy  # noqa: E402
+import sklearn  # noqa: E402
+
+from inventory_core.charts import chart_json  # noqa: E402
+from inventory_core.classification import abc_criterion, classify, xyz_criterion  # noqa: E402
+from inventory_core.engine import apply_abc, calculate_safety_stock, classify_abc  # noqa: E402
+from inventory_core.pipeline import process_all_calculations  # noqa: E402
+from inventory_core.synthetic import synthetic_catalog  # noqa: E402
+
+DEFAULT_ROWS = [10, 1_000, 100_000, 1_000_000]
+TRADEOFF_ITEMS = 1_000
+CLASSIFY_WAREHOUSES = 20
+
+
+def timings(func, repeat):
+    """Best and median wall-clock seconds over `repeat` runs"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return min(runs), float(np.median(runs))
+
+
+def cases(rows, api_max_rows, client, wanted=None):
+    """(name, callable) pairs for one catalog size"""
+    catalog = synthetic_catalog(rows)
+    ranked = apply_abc(catalog.copy())
+    cumulative = ranked['Cumulative%'].to_numpy()
+    demand = ranked['Annual_Usage'].to_numpy()
+    lead_time = ranked['Lead_Time'].to_numpy()
+    yield 'classify_abc', lambda: classify_abc(cumulative)
+    yield 'safety_stock', lambda: calculate_safety_stock(demand, lead_time, 0.95)
+    yield 'apply_abc', lambda: apply_abc(catalog.copy())
+    if not wanted or 'classify' in wanted:
+        rng = np.random.default_rng(0)
+        grouped = catalog.assign(Warehouse=rng.integers(CLASSIFY_WAREHOUSES, size=rows),
+                                 Demand_CV=rng.gamma(2.0, 0.35, size=rows))
+        criteria = [abc_criterion(), xyz_criterion()]
+        yield 'classify', lambda: classify(grouped, criteria, group_by='Warehouse')
+    yield 'pipeline', lambda: process_all_calculations(catalog)
+    if not wanted or 'charts' in wanted:
+        results = process_all_calculations(catalog).frame
+        yield 'charts', lambda: chart_json(results)
+    if client is None or rows > api_max_rows or (wanted and not {'api_calculate', 'api_tradeoff'} & set(wanted)):
+        return
+    items = catalog.to_dict('records')
+    body = {'items': items}
+
+    def calculate():
+        response = client.post('/api/calculate', json=body)
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+
+    yield 'api_calculate', calculate
+    results = process_all_calculations(catalog).frame.to_dict('records')
+    tradeoff_body = {'items': results, 'selected_items': [row['Item'] for row in results[:TRADEOFF_ITEMS]]}
+
+    def tradeoff():
+        response = client.post('/api/tradeoff', json=tradeoff_body)
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+
+    yield 'api_tradeoff', tradeoff
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit-learn': sklearn.__version__,
+        'scipy': scipy.__version__,
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Print the change per case; returns the cases slower than `threshold` (a fraction)"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r['case'], r['rows']): r['best'] for r in baseline['results']}
+    print(f"\nvs {baseline_path} (commit {baseline['environment'].get('commit')})")
+    print(f"{'case':<16} {'rows':>12} {'before ms':>11} {'after ms':>11} {'change':>8}")
+    regressions = []
+    for r in results:
+        old = before.get((r['case'], r['rows']))
+        if old is None:
+            continue
+        change = r['best'] / old - 1
+        flag = '  <-- slower' if change > threshold else ''
+        print(f"{r['case']:<16} {r['rows']:>12,} {old * 1000:>11.2f} {r['best'] * 1000:>11.2f} {change:>+7.1%}{flag}")
+        if change > threshold:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cases', nargs='+', help='Only run these cases')
+    parser.add_argument('--api-max-rows', type=int, default=100_000)
+    parser.add_argument('-o', '--output', help='Results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Slowdown (fraction) that counts as a regression; exits 1 if any')
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app({'MODEL_DIR': tempfile.mkdtemp(), 'CACHE_SIZE': 0})
+    client = app.test_client()
+
+    env = environment()
+    results = []
+    print(f"{'case':<16} {'rows':>12} {'best ms':>11} {'median ms':>11} {'rows/s':>14}")
+    for rows in args.rows:
+        # Fewer repeats for the largest catalogs
+        repeat = max(1, args.repeat if rows <= 1_000_000 else args.repeat // 3)
+        for name, func in cases(rows, args.api_max_rows, client, args.cases):
+            if args.cases and name not in args.cases:
+                continue
+            func()  # warm-up
+            best, median = timings(func, repeat)
+            results.append({'case': name, 'rows': rows, 'best': best, 'median': median, 'repeat': repeat})
+            print(f'{name:<16} {rows:>12,} {best * 1000:>11.2f} {median * 1000:>11.2f} {rows / best:>14,.0f}')
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"{env['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'environment': env, 'results': results}, f, indent=2)
+    print(f'\nResults written to {output}')
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
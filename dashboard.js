@@ -15,6 +15,24 @@ let currentData = [
 let calculatedData = [];
 let tradeoffData = {};
 
+// Backend results table: dataset id from X-Results-Id, current sort and the neighbouring page cursors
+const RESULTS_PAGE_SIZE = 100;
+const resultsView = { dataset: null, sort: null, order: 'asc', nextCursor: null, previousCursor: null };
+
+// Optional backend: set window.INVENTORY_API_URL (e.g. 'http://localhost:5000')
+// before this script loads to calculate through the Flask API instead
+const API_BASE_URL = window.INVENTORY_API_URL || null;
+const COLUMNAR_JSON = 'application/vnd.inventory.columnar+json';
+// Element for each figure returned by /api/charts
+const CHART_ELEMENTS = {
+    abc_distribution: 'abcChart',
+    abc_comparison: 'abcComparisonChart',
+    demand: 'demandChart',
+    demand_scatter: 'scatterChart',
+    safety_stock: 'safetyStockChart',
+    holding_cost: 'holdingCostChart'
+};
+
 // Normal distribution Z-scores for common service levels
 const Z_SCORES = {
     0.80: 0.8416,
@@ -174,6 +192,80 @@ function processAllCalculations(data, serviceLevel, holdingCostRate) {
     return processed;
 }
 
+// Convert a columnar API response ({columns, data: {column: [values]}}) to row objects
+function columnsToRecords(payload) {
+    const columns = payload.columns;
+    const rowCount = columns.length ? payload.data[columns[0]].length : 0;
+    const records = new Array(rowCount);
+    for (let i = 0; i < rowCount; i++) {
+        const row = {};
+        for (const col of columns) {
+            row[col] = payload.data[col][i];
+        }
+        records[i] = row;
+    }
+    return records;
+}
+
+// Run the calculation on the backend, asking for the compact columnar response
+async function fetchCalculation(data, serviceLevel, holdingCostRate) {
+    const response = await fetch(`${API_BASE_URL}/api/calculate`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Accept': COLUMNAR_JSON },
+        body: JSON.stringify({ items: data, service_level: serviceLevel, holding_cost_rate: holdingCostRate })
+    });
+    const payload = await response.json();
+    if (!response.ok) {
+        throw new Error(payload.error || response.statusText);
+    }
+    resultsView.dataset = response.headers.get('X-Results-Id');
+    return columnsToRecords(payload).map(item => ({ ...item, Cumulative: item['Cumulative%'] }));
+}
+
+// Fetch one page of the results table: the first page of the current sort and filters, or the page a cursor points at
+async function fetchResultsPage(cursor) {
+    const params = new URLSearchParams();
+    if (cursor) {
+        params.set('cursor', cursor);
+    } else {
+        params.set('dataset', resultsView.dataset);
+        params.set('limit', RESULTS_PAGE_SIZE);
+        if (resultsView.sort) {
+            params.set('sort', resultsView.sort);
+            params.set('order', resultsView.order);
+        }
+        const filters = {
+            category: document.getElementById('resultsCategory').value,
+            prefix: document.getElementById('resultsPrefix').value.trim(),
+            min_value: document.getElementById('resultsMinValue').value,
+            max_value: document.getElementById('resultsMaxValue').value
+        };
+        Object.entries(filters).forEach(([name, value]) => {
+            if (value !== '') params.set(name, value);
+        });
+    }
+    const response = await fetch(`${API_BASE_URL}/api/results?${params}`);
+    const payload = await response.json();
+    if (!response.ok) {
+        throw new Error(payload.error || response.statusText);
+    }
+    return payload;
+}
+
+// Fetch the dashboard figures, aggregated and downsampled on the backend so their size stays bounded
+async function fetchCharts(data, serviceLevel, holdingCostRate) {
+    const response = await fetch(`${API_BASE_URL}/api/charts`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ items: data, service_level: serviceLevel, holding_cost_rate: holdingCostRate })
+    });
+    const payload = await response.json();
+    if (!response.ok) {
+        throw new Error(payload.error || response.statusText);
+    }
+    return payload.figures;
+}
+
 // Initialize
 document.addEventListener('DOMContentLoaded', function() {
     initializeTable();
@@ -254,7 +346,28 @@ function updateProductSelect() {
     });
 }
 
+function attachResultsListeners() {
+    document.querySelectorAll('#resultsTable th[data-column]').forEach(th => {
+        th.dataset.sort = '';
+        th.addEventListener('click', () => {
+            const column = th.dataset.column;
+            // First click sorts ascending, the next one descending
+            resultsView.order = resultsView.sort === column && resultsView.order === 'asc' ? 'desc' : 'asc';
+            resultsView.sort = column;
+            loadResultsPage(null);
+        });
+    });
+    ['resultsCategory', 'resultsPrefix', 'resultsMinValue', 'resultsMaxValue'].forEach(id => {
+        document.getElementById(id).addEventListener('change', () => loadResultsPage(null));
+    });
+    document.getElementById('resultsPrevBtn').addEventListener('click', () => loadResultsPage(resultsView.previousCursor));
+    document.getElementById('resultsNextBtn').addEventListener('click', () => loadResultsPage(resultsView.nextCursor));
+}
+
 function attachEventListeners() {
+    if (API_BASE_URL) {
+        attachResultsListeners();
+    }
     document.getElementById('addRowBtn').addEventListener('click', addRow);
     document.getElementById('calculateBtn').addEventListener('click', calculate);
     document.getElementById('refreshBtn').addEventListener('click', () => location.reload());
@@ -321,15 +434,27 @@ function hideLoading() {
 function calculate() {
     showLoading();
     
-    setTimeout(() => {
+    setTimeout(async () => {
         try {
             const serviceLevel = document.getElementById('serviceLevel').value / 100;
             const holdingCostRate = document.getElementById('holdingCostRate').value / 100;
             
-            calculatedData = processAllCalculations(currentData, serviceLevel, holdingCostRate);
+            let figures = null;
+            if (API_BASE_URL) {
+                [calculatedData, figures] = await Promise.all([
+                    fetchCalculation(currentData, serviceLevel, holdingCostRate),
+                    fetchCharts(currentData, serviceLevel, holdingCostRate)
+                ]);
+            } else {
+                calculatedData = processAllCalculations(currentData, serviceLevel, holdingCostRate);
+            }
             
             updateMetrics();
-            updateCharts();
+            if (figures) {
+                renderCharts(figures);
+            } else {
+                updateCharts();
+            }
             updateResultsTable();
             updateTradeoffChart();
             
@@ -379,6 +504,15 @@ function updateCharts() {
     updateHoldingCostChart();
 }
 
+function renderCharts(figures) {
+    Object.entries(CHART_ELEMENTS).forEach(([name, elementId]) => {
+        const figure = figures[name];
+        if (figure) {
+            Plotly.newPlot(elementId, figure.data, figure.layout, {responsive: true});
+        }
+    });
+}
+
 function updateABCChart() {
     const abcCounts = {};
     calculatedData.forEach(item => {
@@ -728,10 +862,38 @@ function updateTradeoffChart() {
 }
 
 function updateResultsTable() {
+    if (API_BASE_URL && resultsView.dataset) {
+        document.getElementById('resultsFilters').style.display = 'flex';
+        document.getElementById('resultsPager').style.display = 'flex';
+        loadResultsPage(null);
+        return;
+    }
+    renderResultRows(calculatedData);
+}
+
+// Show the page a cursor points at (or the first page of the current view) from the backend
+async function loadResultsPage(cursor) {
+    try {
+        const page = await fetchResultsPage(cursor);
+        renderResultRows(page.data);
+        resultsView.nextCursor = page.next_cursor;
+        resultsView.previousCursor = page.previous_cursor;
+        document.getElementById('resultsPrevBtn').disabled = !page.previous_cursor;
+        document.getElementById('resultsNextBtn').disabled = !page.next_cursor;
+        document.getElementById('resultsPageInfo').textContent = page.total
+            ? `Rows ${(page.offset + 1).toLocaleString()}–${(page.offset + page.data.length).toLocaleString()} of ${page.total.toLocaleString()}`
+            : 'No items match these filters';
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error loading results: ' + error.message);
+    }
+}
+
+function renderResultRows(rows) {
     const tbody = document.getElementById('resultsTableBody');
     tbody.innerHTML = '';
     
-    calculatedData.forEach(item => {
+    rows.forEach(item => {
         const tr = document.createElement('tr');
         tr.innerHTML = `
             <td>${item.Item}</td>
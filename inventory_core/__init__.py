@@ -0,0 +1,52 @@
+"""Core inventory calculations shared by the Streamlit app and the Flask API.
+
+Only pandas, NumPy, scikit-learn and SciPy are imported here; streamlit,
+flask and plotly stay in the front ends.
+"""
+from .abc_index import ABCIndex
+from .abc_model import ABC_POLICIES, ABCFitStats, ABCPredictor
+from .cache import ResultCache, payload_key
+from .charts import chart_figures, chart_json, lttb
+from .classification import Criterion, abc_criterion, class_matrix, classify, xyz_criterion
+from .engine import (
+    apply_abc,
+    apply_holding_cost,
+    apply_safety_stock,
+    calculate_holding_cost,
+    calculate_safety_stock,
+    classify_abc,
+    cumulative_percent,
+    z_score,
+)
+from .forecasting import FORECAST_METHODS, Forecast, demand_matrix, forecast_items, forecast_matrix
+from .history import DemandHistoryStore
+from .incremental import IncrementalPipeline
+from .ingest import COMPACT_DTYPES, compact_frame, iter_csv_chunks, iter_parquet_chunks, load_catalog
+from .jobs import JobQueue, MemoryJobStore, SqliteJobStore
+from .outofcore import abc_csv, out_of_core_abc
+from .parallel import run_partitioned
+from .pipeline import (
+    FEATURE_COLUMNS,
+    INPUT_COLUMNS,
+    OUTPUT_COLUMNS,
+    PIPELINE_STAGES,
+    PipelineResult,
+    attach_demand_forecast,
+    attach_demand_std,
+    fit_abc_classifier,
+    fit_demand_regression,
+    predict_abc,
+    predict_demand,
+    process_all_calculations,
+    score_items,
+)
+from .registry import ModelBundle, ModelRegistry, dataset_fingerprint
+from .results import ResultsIndex, ResultsPage, ResultsQuery, ResultsStore
+from .scenarios import Scenario, ScenarioResults, evaluate_scenarios, scenario_grid
+from .store import ConnectionPool, InventoryStore, StoreDelta
+from .tradeoff import (
+    TradeoffCurves,
+    item_positions,
+    service_level_grid,
+    tradeoff_curves,
+)
@@ -0,0 +1,280 @@
+"""Incremental ABC classification for a catalog that changes item by item.
+
+apply_abc sorts every item by Annual_Value and takes a cumulative sum, so
+one changed item costs a full re-sort. ABCIndex keeps the items ranked
+instead:
+
+    ranking     sorted sublists of (-Annual_Value, Item) keys, about `load`
+                keys each; a bisect over the sublist maxima finds the sublist,
+                an insort the slot
+    value sums  a Fenwick tree over the sublists, so the value ranked above
+                any sublist is a prefix query and the sublist holding a
+                breakpoint is found by a descent, both O(log N)
+
+An insert, update or delete costs O(log N) plus a list shift inside one
+sublist. A breakpoint is a Fenwick descent plus a cumulative sum over one
+sublist. Besides the items that were written, only the items ranked
+between a breakpoint's old and new position can change category, so the
+changes are reported without visiting the rest of the catalog.
+
+Ties in Annual_Value are ranked by Item (as in store.rank_abc). An item
+whose cumulative share lands exactly on a breakpoint may be labelled
+differently from a full re-rank, since the sums are added up in another
+order. Annual values must be non-negative; NaN values are C, as in the
+in-memory path.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .engine import ABC_BREAKPOINTS, ABC_LABELS, classify_abc, cumulative_percent
+
+# Keys per sublist; sublists split at twice this
+DEFAULT_LOAD = 128
+
+Key = Tuple[float, str]
+
+
+class _Fenwick:
+    """Prefix sums over a fixed number of slots"""
+
+    def __init__(self, values: Sequence[float]):
+        self.n = len(values)
+        self.tree = [0.0] + list(values)
+        for i in range(1, self.n + 1):
+            parent = i + (i & -i)
+            if parent <= self.n:
+                self.tree[parent] += self.tree[i]
+
+    def add(self, i: int, delta: float) -> None:
+        i += 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i: int) -> float:
+        """Sum of the first `i` slots"""
+        total = 0.0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def search(self, target: float) -> Tuple[int, float]:
+        """Most leading slots whose sum stays <= target, and that sum (slots must be non-negative)"""
+        pos, total = 0, 0.0
+        step = 1 << self.n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and total + self.tree[nxt] <= target:
+                pos, total = nxt, total + self.tree[nxt]
+            step >>= 1
+        return pos, total
+
+
+class ABCIndex:
+    """ABC categories of a catalog, kept current under item inserts, updates and deletes"""
+
+    def __init__(self, items: Iterable = (), annual_values: Iterable[float] = (), load: int = DEFAULT_LOAD):
+        self.load = load
+        items = [str(item) for item in items]
+        values = np.asarray(annual_values if isinstance(annual_values, np.ndarray) else list(annual_values),
+                            dtype=float)
+        if len(items) != len(values):
+            raise ValueError('items and annual_values differ in length')
+        if (values < 0).any():
+            raise ValueError('Annual values must be non-negative')
+        self._value: Dict[str, float] = dict(zip(items, values.tolist()))
+        if len(self._value) != len(items):
+            raise ValueError('Duplicate items')
+        present = ~np.isnan(values)
+        ranked_items = np.asarray(items, dtype=object)[present]
+        ranked_values = values[present]
+        order = np.lexsort((ranked_items, -ranked_values))
+        ranked_items, ranked_values = ranked_items[order].tolist(), ranked_values[order]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            labels = classify_abc(cumulative_percent(ranked_values)) if len(order) else np.array([], dtype=object)
+
+        keys = list(zip((-ranked_values).tolist(), ranked_items))
+        self._keys: List[List[Key]] = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self._values: List[List[float]] = [ranked_values[i:i + load].tolist() for i in range(0, len(keys), load)]
+        self._maxes: List[Key] = [sub[-1] for sub in self._keys]
+        self._block_sums: List[float] = [math.fsum(values) for values in self._values]
+        self._rebuild()
+        # Last key inside each band but the lowest (None: the band is empty); labels are monotone in rank
+        ends = np.searchsorted(labels, ABC_LABELS[:-1], side='right') if len(labels) else [0] * len(ABC_BREAKPOINTS)
+        self._bounds: List[Optional[Key]] = [keys[end - 1] if end else None for end in ends]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, load: int = DEFAULT_LOAD) -> 'ABCIndex':
+        """Index over a catalog frame (Annual_Value, or Annual_Usage × Unit_Cost)"""
+        if 'Annual_Value' in df.columns:
+            values = df['Annual_Value'].to_numpy(dtype=float)
+        else:
+            values = (df['Annual_Usage'] * df['Unit_Cost']).to_numpy(dtype=float)
+        return cls(df['Item'].tolist(), values, load)
+
+    def __len__(self) -> int:
+        return len(self._value)
+
+    def __contains__(self, item) -> bool:
+        return str(item) in self._value
+
+    def _rebuild(self) -> None:
+        """Fenwick trees over the sublists, after a split or a removed sublist (O(N / load))"""
+        self._sums = _Fenwick(self._block_sums)
+        self._counts = _Fenwick([len(values) for values in self._values])
+
+    def _insert(self, key: Key, value: float) -> None:
+        if not self._keys:
+            self._keys, self._values, self._maxes, self._block_sums = [[key]], [[value]], [key], [value]
+            self._rebuild()
+            return
+        j = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        keys, values = self._keys[j], self._values[j]
+        pos = bisect_left(keys, key)
+        keys.insert(pos, key)
+        values.insert(pos, value)
+        self._maxes[j] = keys[-1]
+        if len(keys) > 2 * self.load:
+            self._keys[j:j + 1] = [keys[:self.load], keys[self.load:]]
+            self._values[j:j + 1] = [values[:self.load], values[self.load:]]
+            self._maxes[j:j + 1] = [keys[self.load - 1], keys[-1]]
+            # Exact sums for the halves also clear the rounding left by earlier updates
+            self._block_sums[j:j + 1] = [math.fsum(values[:self.load]), math.fsum(values[self.load:])]
+            self._rebuild()
+        else:
+            self._block_sums[j] += value
+            self._sums.add(j, value)
+            self._counts.add(j, 1)
+
+    def _delete(self, key: Key, value: float) -> None:
+        j = bisect_left(self._maxes, key)
+        keys, values = self._keys[j], self._values[j]
+        pos = bisect_left(keys, key)
+        del keys[pos], values[pos]
+        if not keys:
+            del self._keys[j], self._values[j], self._maxes[j], self._block_sums[j]
+            self._rebuild()
+        else:
+            self._maxes[j] = keys[-1]
+            self._block_sums[j] -= value
+            self._sums.add(j, -value)
+            self._counts.add(j, -1)
+
+    def _boundary(self, percent: float) -> Optional[Key]:
+        """Key of the last item whose cumulative share is <= percent (None when there is none)"""
+        total = self._sums.prefix(self._sums.n)
+        if not total > 0:
+            # All-zero catalogs have no cumulative share: every item is C
+            return None
+        target = total * percent / 100
+        j, before = self._sums.search(target)
+        if j == len(self._keys):
+            return self._maxes[-1]
+        inside = bisect_right(list(accumulate(self._values[j], initial=before)), target) - 1
+        if inside > 0:
+            return self._keys[j][inside - 1]
+        return self._maxes[j - 1] if j > 0 else None
+
+    def _rank(self, key: Optional[Key]) -> int:
+        """Number of ranked items at or above `key`"""
+        if key is None:
+            return 0
+        j = bisect_left(self._maxes, key)
+        if j == len(self._keys):
+            return int(self._counts.prefix(self._counts.n))
+        return int(self._counts.prefix(j)) + bisect_right(self._keys[j], key)
+
+    def _between(self, low: Optional[Key], high: Optional[Key]) -> Iterator[str]:
+        """Items ranked after `low` and up to `high` (None ranks before every item)"""
+        if low is None:
+            j, pos = 0, 0
+        else:
+            j = bisect_right(self._maxes, low)
+            pos = bisect_right(self._keys[j], low) if j < len(self._keys) else 0
+        while j < len(self._keys):
+            keys = self._keys[j]
+            end = bisect_right(keys, high)
+            for key in keys[pos:end]:
+                yield key[1]
+            if end < len(keys):
+                return
+            j, pos = j + 1, 0
+
+    def _label(self, item: str, bounds: Optional[List[Optional[Key]]] = None) -> str:
+        """Category from the item's rank key and the band ends (the current ones by default)"""
+        value = self._value[item]
+        if not math.isnan(value):
+            key = (-value, item)
+            for bound, label in zip(bounds or self._bounds, ABC_LABELS):
+                if bound is not None and key <= bound:
+                    return label
+        return ABC_LABELS[-1]
+
+    def annual_values(self) -> Dict[str, float]:
+        """Annual_Value by item, as currently indexed"""
+        return dict(self._value)
+
+    def category(self, item) -> str:
+        return self._label(str(item))
+
+    def counts(self) -> Dict[str, int]:
+        ends = [self._rank(bound) for bound in self._bounds]
+        counts = dict(zip(ABC_LABELS[:-1], np.diff([0] + ends).tolist()))
+        counts[ABC_LABELS[-1]] = len(self) - ends[-1]
+        return counts
+
+    def boundaries(self) -> Dict[str, Optional[Tuple[str, float]]]:
+        """(Item, Annual_Value) of the last item in each band but C (None when the band is empty)"""
+        return {label: (bound[1], -bound[0]) if bound is not None else None
+                for label, bound in zip(ABC_LABELS, self._bounds)}
+
+    def apply(self, updates: Iterable[Tuple[object, float]] = (), removes: Iterable = ()) -> Dict[str, str]:
+        """Set the annual value of `updates` (new or existing items) and drop `removes`
+
+        Returns {item: category} for every remaining item whose category
+        changed, including the new items.
+        """
+        updates = [(str(item), float(value)) for item, value in updates]
+        if any(value < 0 for _, value in updates):
+            raise ValueError('Annual values must be non-negative')
+        before = {item: self._label(item) for item, _ in updates if item in self._value}
+        for item in map(str, removes):
+            value = self._value.pop(item, None)
+            if value is not None and not math.isnan(value):
+                self._delete((-value, item), value)
+        for item, value in updates:
+            old = self._value.get(item)
+            if old is not None and not math.isnan(old):
+                self._delete((-old, item), old)
+            if not math.isnan(value):
+                self._insert((-value, item), value)
+            self._value[item] = value
+
+        previous, self._bounds = self._bounds, [self._boundary(bp) for bp in ABC_BREAKPOINTS]
+        changed = {}
+        for item, _ in updates:
+            label = self._label(item)
+            if before.get(item) != label:
+                changed[item] = label
+        for old, new in zip(previous, self._bounds):
+            if old == new:
+                continue
+            low, high = (old, new) if old is None or (new is not None and old < new) else (new, old)
+            for item in self._between(low, high):
+                if item not in before and item not in changed:
+                    label = self._label(item)
+                    if label != self._label(item, previous):
+                        changed[item] = label
+        return changed
+
+    def update(self, item, annual_value: float) -> Dict[str, str]:
+        return self.apply([(item, annual_value)])
+
+    def remove(self, item) -> Dict[str, str]:
+        return self.apply(removes=[item])
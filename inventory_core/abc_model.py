@@ -0,0 +1,122 @@
+"""ABC prediction with reusable training state.
+
+A DecisionTreeClassifier cannot be updated in place, so instead of
+partial fitting the predictor keeps the last tree plus a hash of every
+(features, label) row it was trained on. Policies:
+
+    always  Train a new tree on every call (the pipeline's default behaviour)
+    drift   Reuse the cached tree while the share of new or changed rows stays
+            within `drift_threshold` and the tree still labels those rows with
+            at least `min_accuracy`; refit otherwise
+    rule    Skip training: the cumulative-% rule already gives the labels,
+            which is what a tree fitted to them reproduces
+
+Every call is timed and counted in `stats`.
+"""
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import FEATURE_COLUMNS, predict_abc, train_abc_classifier
+
+if TYPE_CHECKING:
+    from sklearn.tree import DecisionTreeClassifier
+
+ABC_POLICIES = ['always', 'drift', 'rule']
+
+
+@dataclass
+class ABCFitStats:
+    """Counters across calls; `fit_seconds` only covers calls that trained a tree"""
+    calls: int = 0
+    fits: int = 0
+    reused: int = 0
+    rule: int = 0
+    fit_seconds: float = 0.0
+    last_seconds: float = 0.0
+    last_action: Optional[str] = None
+    last_drift: Optional[float] = None
+
+    @property
+    def skipped(self) -> int:
+        return self.reused + self.rule
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), 'skipped': self.skipped}
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """One hash per (features, ABC_Category) row"""
+    return pd.util.hash_pandas_object(df[FEATURE_COLUMNS + ['ABC_Category']], index=False).to_numpy()
+
+
+class ABCPredictor:
+    """Predicted_ABC for ranked frames, refitting the tree only as the policy requires"""
+
+    def __init__(self, policy: str = 'drift', drift_threshold: float = 0.05, min_accuracy: float = 1.0):
+        if policy not in ABC_POLICIES:
+            raise ValueError(f"Unknown ABC policy: {policy} (choose one of: {', '.join(ABC_POLICIES)})")
+        self.policy = policy
+        self.drift_threshold = drift_threshold
+        self.min_accuracy = min_accuracy
+        self.stats = ABCFitStats()
+        self.model: Optional['DecisionTreeClassifier'] = None
+        self._trained_on: Optional[np.ndarray] = None
+
+    def drift(self, hashes: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Share of rows added, edited or removed since the last fit, and the mask of new rows"""
+        changed = ~np.isin(hashes, self._trained_on)
+        removed = np.count_nonzero(~np.isin(self._trained_on, hashes))
+        return (np.count_nonzero(changed) + removed) / max(len(hashes), 1), changed
+
+    def _still_valid(self, df: pd.DataFrame, hashes: np.ndarray) -> bool:
+        if self.model is None or self._trained_on is None:
+            return False
+        drift, changed = self.drift(hashes)
+        self.stats.last_drift = float(drift)
+        if drift > self.drift_threshold:
+            return False
+        if not changed.any():
+            return True
+        rows = df[changed]
+        accuracy = np.mean(self.model.predict(rows[FEATURE_COLUMNS]) == rows['ABC_Category'].to_numpy())
+        return accuracy >= self.min_accuracy
+
+    def fit_predict(self, df: pd.DataFrame) -> Tuple[np.ndarray, Optional['DecisionTreeClassifier']]:
+        """Labels and the tree behind them (None under the rule policy)
+
+        `df` must already carry ABC_Category (see engine.apply_abc).
+        """
+        start = time.perf_counter()
+        self.stats.calls += 1
+        self.stats.last_drift = None
+        if self.policy == 'rule':
+            labels, model, action = predict_abc(df, None), None, 'rule'
+        else:
+            hashes = row_hashes(df)
+            if self.policy == 'drift' and self._still_valid(df, hashes):
+                action = 'reused'
+            else:
+                self.model = train_abc_classifier(df)
+                self._trained_on = np.unique(hashes)
+                action = 'fit'
+            labels, model = predict_abc(df, self.model), self.model
+        elapsed = time.perf_counter() - start
+        self.stats.last_seconds = elapsed
+        self.stats.last_action = action
+        if action == 'fit':
+            self.stats.fits += 1
+            self.stats.fit_seconds += elapsed
+        elif action == 'reused':
+            self.stats.reused += 1
+        else:
+            self.stats.rule += 1
+        return labels, model
+
+    def reset(self) -> None:
+        """Forget the cached tree so the next call trains from scratch"""
+        self.model = None
+        self._trained_on = None
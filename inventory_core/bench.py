@@ -0,0 +1,87 @@
+"""Micro-benchmark harness for the calculation pipeline.
+
+Times each pipeline stage separately on a synthetic catalog:
+
+    python -m inventory_core.bench
+    python -m inventory_core.bench --rows 1000 100000 --repeat 5
+"""
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import pandas as pd
+
+from .engine import apply_abc, apply_safety_stock
+from .formats import COLUMNS, encode_frame
+from .pipeline import (
+    PipelineResult,
+    fit_abc_classifier,
+    fit_demand_regression,
+    process_all_calculations,
+)
+from .synthetic import synthetic_catalog
+from .tradeoff import service_level_grid, tradeoff_curves
+
+
+def make_catalog(n: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic catalog with the same input columns as the data editor (see synthetic.synthetic_catalog)"""
+    return synthetic_catalog(n, seed=seed)
+
+
+def best_of(func: Callable[..., Any], repeat: int, *args: Any) -> Tuple[float, Any]:
+    """Best wall-clock time over `repeat` runs, plus the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def stage_timings(df: pd.DataFrame, repeat: int = 3,
+                  service_level: float = 0.95, holding_cost_rate: float = 0.2) -> Dict[str, float]:
+    """Best time in seconds for each stage and for the full pipeline"""
+    timings = {}
+    timings['abc'], ranked = best_of(lambda: apply_abc(df.copy()), repeat)
+    timings['classifier'], _ = best_of(fit_abc_classifier, repeat, ranked)
+    timings['regression'], (predicted, _) = best_of(fit_demand_regression, repeat, ranked)
+    ranked['Predicted_Demand'] = predicted
+    timings['safety_stock'], _ = best_of(
+        lambda: apply_safety_stock(ranked.copy(), service_level, holding_cost_rate), repeat
+    )
+    timings['pipeline'], result = best_of(
+        process_all_calculations, repeat, df, service_level, holding_cost_rate
+    )
+    timings['to_records'], _ = best_of(PipelineResult.to_records, repeat, result)
+    # Full response bodies: records JSON (the API default) vs columnar JSON
+    timings['records_json'], _ = best_of(lambda: json.dumps({'data': result.to_records()}).encode(), repeat)
+    timings['columns_json'], _ = best_of(encode_frame, repeat, result.frame, COLUMNS)
+    # Trade-off curves for up to 5,000 products over a 0.1%-resolution grid
+    selected = result.frame['Item'].head(5_000).tolist()
+    grid = service_level_grid(0.80, 0.99, 0.001)
+    timings['tradeoff'], _ = best_of(tradeoff_curves, repeat, result.frame, selected, grid, holding_cost_rate)
+    return timings
+
+
+def run(rows: Sequence[int], repeat: int = 3) -> List[Dict[str, Any]]:
+    """Stage timings for each catalog size"""
+    return [{'rows': n, **stage_timings(make_catalog(n), repeat)} for n in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time each stage of the calculation pipeline')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    stages = [key for key in results[0] if key != 'rows']
+    print(f"{'rows':>10} " + ' '.join(f'{stage:>13}' for stage in stages))
+    for row in results:
+        print(f"{row['rows']:>10,} " + ' '.join(f'{row[stage] * 1000:>11.2f}ms' for stage in stages))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""Content-hash result cache with LRU/TTL eviction and an optional disk tier.
+
+Keys are hashes of the request content (items plus parameters), so the
+same calculation sent twice is answered from memory without rerunning the
+pipeline.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+# Longest gap between two sweeps of the disk tier by one process, in seconds
+DISK_SWEEP_INTERVAL = 60.0
+
+
+def _value_size(value: Any) -> int:
+    """Bytes counted against max_bytes: the length of a response body, else the object's own size"""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+def payload_key(*parts: Any) -> str:
+    """Stable hash of JSON-like values (dict key order does not matter)"""
+    encoded = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Bounded in-memory LRU with per-entry TTL, backed by an optional directory
+
+    `max_entries` and `max_bytes` (the summed size of the stored bodies, no
+    limit when None) cap the in-memory tier; the least recently used
+    entries are evicted first, and a value larger than `max_bytes` is not
+    kept in memory at all. Entries older than `ttl` seconds are treated as misses
+    (`ttl=None` keeps them until evicted). With `disk_dir`, entries are also
+    pickled to disk and memory misses fall back to that tier. The directory
+    may be shared by several processes. Writes sweep it, removing expired
+    entries and then the oldest ones until it holds at most
+    `disk_max_bytes`: whenever the size counted at the last sweep plus
+    this process's writes since would exceed the cap, and at least every
+    DISK_SWEEP_INTERVAL seconds (or every `ttl`, when that is shorter).
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = 300.0, disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = DEFAULT_DISK_MAX_BYTES, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._last_sweep = 0.0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.pkl')
+
+    def _store(self, key: str, value: Any, stored_at: float) -> None:
+        size = _value_size(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (stored_at, value, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _load_from_disk(self, key: str) -> Optional[Any]:
+        path = self._disk_path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self._expired(stored_at):
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        self._store(key, value, stored_at)
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for `key`, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value, size = entry
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self._bytes -= size
+        if self.disk_dir:
+            value = self._load_from_disk(key)
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key` in memory (and on disk when configured)"""
+        stored_at = time.time()
+        self._store(key, value, stored_at)
+        if self.disk_dir:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self._disk_path(key))
+            interval = min(DISK_SWEEP_INTERVAL, self.ttl) if self.ttl is not None else DISK_SWEEP_INTERVAL
+            with self._lock:
+                self._disk_bytes += size
+                due = self._disk_bytes > self.disk_max_bytes or stored_at - self._last_sweep > interval
+            if due:
+                self._sweep_disk()
+
+    def _sweep_disk(self) -> None:
+        """Remove expired entries, then the least recently written ones while over disk_max_bytes"""
+        entries = []
+        with os.scandir(self.disk_dir) as listing:
+            for entry in listing:
+                if not entry.name.endswith('.pkl'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Removed by another process's sweep
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for stored_at, size, path in entries:
+            if not (self._expired(stored_at) or total > self.disk_max_bytes):
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        with self._lock:
+            self.disk_evictions += removed
+            self._disk_bytes = total
+            self._last_sweep = time.time()
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = self.evictions = self.disk_evictions = 0
+            self._bytes = self._disk_bytes = 0
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'disk_evictions': self.disk_evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'disk_tier': bool(self.disk_dir),
+                'disk_max_bytes': self.disk_max_bytes if self.disk_dir else None,
+            }
@@ -0,0 +1,272 @@
+"""Bounded-size chart payloads for the dashboard figures.
+
+Every figure is a plain plotly JSON dict ({'data': [...], 'layout': {...}})
+built without importing plotly, so the Streamlit app and dashboard.js
+render the same payload. Payload size does not grow with the catalog:
+
+    abc_distribution    item count per category
+    abc_comparison      actual vs predicted count per category
+    demand              Annual_Usage and Predicted_Demand per item, LTTB-downsampled
+    demand_scatter      Past vs Predicted demand per category, LTTB-downsampled
+    safety_stock        the `top_n` items with the most safety stock
+    holding_cost        the `top_n` items with the highest holding cost
+
+chart_json serializes the figures once per (data hash, parameters) and
+keeps the string in a ResultCache.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import ResultCache, payload_key
+
+# Points per line/scatter series and bars per per-item bar chart
+DEFAULT_MAX_POINTS = 1000
+DEFAULT_TOP_N = 50
+CATEGORIES = ['A', 'B', 'C']
+CATEGORY_COLORS = {'A': '#2563eb', 'B': '#64748b', 'C': '#94a3b8'}
+# Largest marker diameter (px) in the demand scatter, as plotly express sizes them
+MAX_MARKER_SIZE = 20
+CHART_COLUMNS = ['Item', 'ABC_Category', 'Predicted_ABC', 'Annual_Usage', 'Past_Demand', 'Predicted_Demand',
+                 'Safety_Stock', 'Holding_Cost']
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Positions of the points kept by Largest-Triangle-Three-Buckets downsampling
+
+    `x` must be sorted. The first and last points are always kept; every
+    bucket in between contributes the point forming the largest triangle
+    with the previously kept point and the next bucket's average.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket b covers edges[b]:edges[b + 1]; the first and last points sit outside the buckets
+    edges = np.floor(np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # The point after the last bucket is the last point itself
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for b in range(threshold - 2):
+        start, stop = edges[b], edges[b + 1]
+        ax, ay = x[previous], y[previous]
+        area = np.abs((ax - next_x[b]) * (y[start:stop] - ay) - (ax - x[start:stop]) * (next_y[b] - ay))
+        previous = start + int(np.argmax(area))
+        kept[b + 1] = previous
+    return kept
+
+
+def top_items(df: pd.DataFrame, column: str, n: int) -> pd.DataFrame:
+    """The `n` rows with the largest `column`, in their original order"""
+    if len(df) <= n:
+        return df
+    positions = np.sort(np.argpartition(-df[column].to_numpy(dtype=float), n - 1)[:n])
+    return df.iloc[positions]
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """Content hash of the chart columns (row order matters)"""
+    columns = [col for col in CHART_COLUMNS if col in df.columns]
+    digest = hashlib.sha256(','.join(columns).encode('utf-8'))
+    for col in columns:
+        values = df[col]
+        if values.dtype.kind in 'biuf':
+            digest.update(np.ascontiguousarray(values.to_numpy()).tobytes())
+        else:
+            # Joining the strings is several times faster than hash_pandas_object on them
+            digest.update('\x1f'.join(map(str, values.tolist())).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _values(values: Any) -> List[Any]:
+    """JSON-safe list: NaN becomes null"""
+    array = np.asarray(values)
+    if array.dtype.kind == 'f' and np.isnan(array).any():
+        return np.where(np.isnan(array), None, array).tolist()
+    return array.tolist()
+
+
+def _layout(title: str, **extra: Any) -> Dict[str, Any]:
+    axis = {'gridcolor': '#e5e7eb', 'linecolor': '#d1d5db'}
+    layout = {
+        'title': {'text': title, 'font': {'size': 16, 'color': '#1a2332'}},
+        'height': 350,
+        'plot_bgcolor': '#ffffff',
+        'paper_bgcolor': '#ffffff',
+        'font': {'family': 'Inter', 'size': 12, 'color': '#374151'},
+        'xaxis': dict(axis),
+        'yaxis': dict(axis),
+    }
+    for key, value in extra.items():
+        if key in ('xaxis', 'yaxis'):
+            layout[key].update(value)
+        else:
+            layout[key] = value
+    return layout
+
+
+def _shown(title: str, shown: int, total: int) -> str:
+    return title if shown == total else f'{title} (top {shown:,} of {total:,} items)'
+
+
+def _category_counts(labels: pd.Series) -> List[int]:
+    return labels.value_counts().reindex(CATEGORIES, fill_value=0).tolist()
+
+
+def abc_distribution_figure(df: pd.DataFrame) -> Dict[str, Any]:
+    counts = _category_counts(df['ABC_Category'])
+    return {
+        'data': [{
+            'type': 'bar', 'x': CATEGORIES, 'y': counts,
+            'marker': {'color': [CATEGORY_COLORS[cat] for cat in CATEGORIES]},
+        }],
+        'layout': _layout('ABC Category Distribution', showlegend=False,
+                          xaxis={'title': {'text': 'Category'}}, yaxis={'title': {'text': 'Number of Items'}}),
+    }
+
+
+def abc_comparison_figure(df: pd.DataFrame) -> Dict[str, Any]:
+    traces = [
+        {'type': 'bar', 'name': name, 'x': CATEGORIES, 'y': counts, 'text': counts, 'textposition': 'outside',
+         'marker': {'color': color}}
+        for name, counts, color in [
+            ('Actual ABC', _category_counts(df['ABC_Category']), '#2563eb'),
+            ('Predicted ABC', _category_counts(df['Predicted_ABC']), '#10b981'),
+        ]
+    ]
+    return {
+        'data': traces,
+        'layout': _layout('Actual vs Predicted ABC Categories', barmode='group',
+                          xaxis={'title': {'text': 'Category'}}, yaxis={'title': {'text': 'Number of Items'}}),
+    }
+
+
+def demand_figure(df: pd.DataFrame, max_points: int = DEFAULT_MAX_POINTS) -> Dict[str, Any]:
+    """Actual and predicted demand in item order, keeping each series' LTTB points"""
+    position = np.arange(len(df))
+    actual = df['Annual_Usage'].to_numpy(dtype=float)
+    predicted = df['Predicted_Demand'].to_numpy(dtype=float)
+    kept = np.union1d(lttb(position, actual, max_points), lttb(position, predicted, max_points))
+    items = df['Item'].iloc[kept]
+    marker = {'size': 8 if len(kept) == len(df) else 4}
+    title = 'Demand Forecasting Comparison'
+    if len(kept) < len(df):
+        title = f'{title} ({len(kept):,} of {len(df):,} items shown)'
+    return {
+        'data': [
+            {'type': 'scatter', 'mode': 'lines+markers', 'name': 'Actual Annual Usage', 'x': _values(items),
+             'y': _values(actual[kept]), 'line': {'color': '#2563eb', 'width': 3}, 'marker': marker},
+            {'type': 'scatter', 'mode': 'lines+markers', 'name': 'Predicted Demand', 'x': _values(items),
+             'y': _values(predicted[kept]), 'line': {'color': '#10b981', 'width': 3, 'dash': 'dash'},
+             'marker': marker},
+        ],
+        'layout': _layout(title, xaxis={'title': {'text': 'Item'}}, yaxis={'title': {'text': 'Demand'}},
+                          legend={'orientation': 'h', 'yanchor': 'bottom', 'y': 1.02, 'xanchor': 'right', 'x': 1}),
+    }
+
+
+def demand_scatter_figure(df: pd.DataFrame, max_points: int = DEFAULT_MAX_POINTS) -> Dict[str, Any]:
+    """Past vs predicted demand, one trace per category sorted by past demand and LTTB-downsampled"""
+    past = df['Past_Demand'].to_numpy(dtype=float)
+    predicted = df['Predicted_Demand'].to_numpy(dtype=float)
+    usage = df['Annual_Usage'].to_numpy(dtype=float)
+    categories = df['ABC_Category'].to_numpy()
+    items = df['Item']
+    # Marker area proportional to Annual_Usage, as in plotly express
+    sizeref = 2.0 * max(np.nanmax(usage), 1.0) / MAX_MARKER_SIZE ** 2 if len(df) else 1.0
+    traces = []
+    for cat in CATEGORIES:
+        rows = np.flatnonzero(categories == cat)
+        rows = rows[np.argsort(past[rows], kind='stable')]
+        rows = rows[lttb(past[rows], predicted[rows], max_points)]
+        traces.append({
+            'type': 'scatter', 'mode': 'markers', 'name': cat, 'x': _values(past[rows]), 'y': _values(predicted[rows]),
+            'text': _values(items.iloc[rows]),
+            'marker': {'color': CATEGORY_COLORS[cat], 'size': _values(usage[rows]), 'sizemode': 'area',
+                       'sizeref': sizeref, 'sizemin': 2},
+        })
+    max_val = float(np.nanmax([np.nanmax(past), np.nanmax(predicted)])) if len(df) else 0.0
+    traces.append({
+        'type': 'scatter', 'mode': 'lines', 'name': 'Perfect Prediction', 'x': [0, max_val], 'y': [0, max_val],
+        'line': {'color': '#dc2626', 'width': 2, 'dash': 'dot'},
+    })
+    return {
+        'data': traces,
+        'layout': _layout('Demand Prediction Scatter Plot', legend={'title': {'text': 'ABC_Category'}},
+                          xaxis={'title': {'text': 'Past Demand'}}, yaxis={'title': {'text': 'Predicted Demand'}}),
+    }
+
+
+def safety_stock_figure(df: pd.DataFrame, top_n: int = DEFAULT_TOP_N) -> Dict[str, Any]:
+    top = top_items(df, 'Safety_Stock', top_n)
+    safety_stock = _values(top['Safety_Stock'])
+    return {
+        'data': [{
+            'type': 'bar', 'x': _values(top['Item']), 'y': safety_stock,
+            'marker': {'color': safety_stock, 'colorscale': 'Blues', 'showscale': True,
+                       'colorbar': {'title': {'text': 'Units'}}},
+        }],
+        'layout': _layout(_shown('Safety Stock Levels (AI-Predicted)', len(top), len(df)), showlegend=False,
+                          xaxis={'title': {'text': 'Item'}}, yaxis={'title': {'text': 'Safety Stock Units'}}),
+    }
+
+
+def holding_cost_figure(df: pd.DataFrame, top_n: int = DEFAULT_TOP_N) -> Dict[str, Any]:
+    top = top_items(df, 'Holding_Cost', top_n)
+    traces = []
+    for cat in CATEGORIES:
+        rows = top[top['ABC_Category'] == cat]
+        if len(rows):
+            traces.append({'type': 'bar', 'name': cat, 'x': _values(rows['Item']), 'y': _values(rows['Holding_Cost']),
+                           'marker': {'color': CATEGORY_COLORS[cat]}})
+    return {
+        'data': traces,
+        'layout': _layout(_shown('Holding Cost by Item and Category', len(top), len(df)),
+                          legend={'title': {'text': 'ABC_Category'}},
+                          xaxis={'title': {'text': 'Item'}, 'categoryorder': 'array',
+                                 'categoryarray': _values(top['Item'])},
+                          yaxis={'title': {'text': 'Holding Cost ($)'}}),
+    }
+
+
+def chart_figures(df: pd.DataFrame, max_points: int = DEFAULT_MAX_POINTS,
+                  top_n: int = DEFAULT_TOP_N) -> Dict[str, Dict[str, Any]]:
+    """Every figure the columns of `df` allow, by name (see the module docstring)"""
+    figures = {}
+    if 'ABC_Category' not in df.columns:
+        return figures
+    figures['abc_distribution'] = abc_distribution_figure(df)
+    if 'Predicted_ABC' in df.columns:
+        figures['abc_comparison'] = abc_comparison_figure(df)
+    if 'Predicted_Demand' in df.columns:
+        figures['demand'] = demand_figure(df, max_points)
+        figures['demand_scatter'] = demand_scatter_figure(df, max_points)
+    if 'Safety_Stock' in df.columns:
+        figures['safety_stock'] = safety_stock_figure(df, top_n)
+        figures['holding_cost'] = holding_cost_figure(df, top_n)
+    return figures
+
+
+def chart_json(df: pd.DataFrame, max_points: int = DEFAULT_MAX_POINTS, top_n: int = DEFAULT_TOP_N,
+               cache: Optional[ResultCache] = None) -> str:
+    """chart_figures serialized as one JSON object, cached by data hash and parameters"""
+    key = payload_key('charts', frame_hash(df), max_points, top_n)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    encoded = json.dumps(chart_figures(df, max_points, top_n), separators=(',', ':'), allow_nan=False)
+    if cache is not None:
+        cache.set(key, encoded)
+    return encoded
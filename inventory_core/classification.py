@@ -0,0 +1,226 @@
+"""Multi-criteria inventory classification: ABC, XYZ and their matrix.
+
+Each criterion turns one column into labels with a single vectorized pass:
+
+    share   Pareto share: rank by the column (largest first), take the
+            cumulative share in % and band it with np.searchsorted, as
+            engine.classify_abc does (ABC on Annual_Value: A up to 70%,
+            B up to 90%, C above)
+    band    Band the column itself (XYZ on the coefficient of variation of
+            demand: X up to 0.5, Y up to 1.0, Z above)
+
+Breakpoints and labels are free: any number of bands per criterion and any
+number of criteria. With `group_by` (e.g. Warehouse) shares are taken
+within each group: one sort by value, a stable sort by group code and a
+cumulative sum with per-group offsets, so every SKU of every warehouse is labelled without
+a loop over warehouses.
+
+Labels come back as categoricals. With two or more criteria the combined
+label (AX, BZ, ...) is added too, and `class_matrix` counts the items (or
+sums a column) per combination. Missing values take the last label (C, Z),
+as NaN values do in apply_abc.
+"""
+import itertools
+import string
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .engine import ABC_BREAKPOINTS, ABC_LABELS
+
+CRITERION_KINDS = ['share', 'band']
+DEMAND_CV_COLUMN = 'Demand_CV'
+XYZ_BREAKPOINTS = (0.5, 1.0)
+XYZ_LABELS = ('X', 'Y', 'Z')
+
+
+@dataclass(frozen=True)
+class Criterion:
+    """One classification: `column` banded at `breakpoints` into `labels` (one more label than breakpoints)"""
+    name: str
+    column: str
+    breakpoints: Tuple[float, ...]
+    labels: Tuple[str, ...]
+    kind: str = 'share'
+
+    def __post_init__(self):
+        if self.kind not in CRITERION_KINDS:
+            raise ValueError(f"Unknown criterion kind: {self.kind} (choose one of: {', '.join(CRITERION_KINDS)})")
+        if len(self.labels) != len(self.breakpoints) + 1:
+            raise ValueError(f'{self.name}: {len(self.breakpoints)} breakpoints need {len(self.breakpoints) + 1} labels')
+        if len(set(self.labels)) != len(self.labels):
+            raise ValueError(f'{self.name}: labels must be distinct')
+        if np.any(np.diff(self.breakpoints) <= 0) or not np.all(np.isfinite(self.breakpoints)):
+            raise ValueError(f'{self.name}: breakpoints must be finite and increasing')
+
+    @property
+    def output_column(self) -> str:
+        return f'{self.name}_Category'
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> 'Criterion':
+        """Criterion from a JSON spec; name ABC or XYZ fills in the defaults of that classification"""
+        name = str(spec.get('name', 'ABC'))
+        breakpoints = spec.get('breakpoints')
+        labels = spec.get('labels')
+        if name.upper() == 'XYZ' and spec.get('kind', 'band') == 'band':
+            return xyz_criterion(breakpoints or XYZ_BREAKPOINTS, spec.get('column', DEMAND_CV_COLUMN), labels)
+        if name.upper() == 'ABC' and spec.get('kind', 'share') == 'share':
+            return abc_criterion(breakpoints or ABC_BREAKPOINTS, spec.get('column', 'Annual_Value'), labels)
+        if breakpoints is None or 'column' not in spec:
+            raise ValueError(f'{name}: a custom criterion needs a column and breakpoints')
+        return cls(name, spec['column'], tuple(float(bp) for bp in breakpoints),
+                   tuple(str(label) for label in labels or _letters(len(breakpoints) + 1)), spec.get('kind', 'share'))
+
+
+def _letters(n: int) -> Tuple[str, ...]:
+    if n > len(string.ascii_uppercase):
+        raise ValueError('Too many bands for default labels; pass labels')
+    return tuple(string.ascii_uppercase[:n])
+
+
+def abc_criterion(breakpoints: Sequence[float] = ABC_BREAKPOINTS, column: str = 'Annual_Value',
+                  labels: Optional[Sequence[str]] = None) -> Criterion:
+    """ABC on the cumulative share of annual value (labels default to A, B, C, ...)"""
+    breakpoints = tuple(float(bp) for bp in breakpoints)
+    if labels is None:
+        labels = tuple(ABC_LABELS) if len(breakpoints) == len(ABC_BREAKPOINTS) else _letters(len(breakpoints) + 1)
+    return Criterion('ABC', column, breakpoints, tuple(str(label) for label in labels), 'share')
+
+
+def xyz_criterion(breakpoints: Sequence[float] = XYZ_BREAKPOINTS, column: str = DEMAND_CV_COLUMN,
+                  labels: Optional[Sequence[str]] = None) -> Criterion:
+    """XYZ on the coefficient of variation of demand (labels default to X, Y, Z for two breakpoints)"""
+    breakpoints = tuple(float(bp) for bp in breakpoints)
+    if labels is None:
+        if len(breakpoints) != len(XYZ_BREAKPOINTS):
+            raise ValueError(f'XYZ: {len(breakpoints)} breakpoints need {len(breakpoints) + 1} labels')
+        labels = XYZ_LABELS
+    return Criterion('XYZ', column, breakpoints, tuple(str(label) for label in labels), 'band')
+
+
+def share_bands(values: np.ndarray, breakpoints: Sequence[float],
+                groups: Optional[np.ndarray] = None) -> np.ndarray:
+    """Band index per value from its cumulative share (in %) of the total, largest values first
+
+    `groups` (integer codes) takes shares within each group. Values that
+    are NaN, or in a group whose total is zero, get the last band.
+    """
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return np.zeros(0, dtype=np.int8)
+    missing = np.isnan(values)
+    filled = np.where(missing, 0.0, values)
+    # Unstable like apply_abc's sort: equal values may be ranked in either order
+    order = np.argsort(-filled)
+    if groups is None:
+        cumulative = np.cumsum(filled[order])
+        base = np.zeros(1)
+        total = cumulative[-1:]
+        position = np.zeros(len(order), dtype=np.intp)
+    else:
+        # A stable sort of the (small integer) group codes keeps the value order within each group;
+        # for int16 codes numpy uses a radix sort
+        codes = groups[order]
+        if len(codes) and codes.max() < np.iinfo(np.int16).max:
+            codes = codes.astype(np.int16)
+        order = order[np.argsort(codes, kind='stable')]
+        cumulative = np.cumsum(filled[order])
+        sorted_groups = groups[order]
+        # Offsets from the same running sum, so every group's share ends at exactly 100%
+        starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        ends = np.r_[starts[1:], len(order)] - 1
+        base = np.where(starts > 0, cumulative[starts - 1], 0.0)
+        total = cumulative[ends] - base
+        position = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(order)]))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = (cumulative - base[position]) / total[position] * 100
+    band = np.empty(len(values), dtype=np.int8)
+    band[order] = np.searchsorted(np.asarray(breakpoints, dtype=float), share, side='left')
+    band[missing] = len(breakpoints)
+    return band
+
+
+def value_bands(values: np.ndarray, breakpoints: Sequence[float]) -> np.ndarray:
+    """Band index per value: up to the first breakpoint is band 0 (NaN gets the last band)"""
+    return np.searchsorted(np.asarray(breakpoints, dtype=float), np.asarray(values, dtype=float),
+                           side='left').astype(np.int8)
+
+
+def _column(df: pd.DataFrame, criterion: Criterion) -> np.ndarray:
+    if criterion.column in df.columns:
+        return df[criterion.column].to_numpy(dtype=float, na_value=np.nan)
+    if criterion.column == 'Annual_Value' and {'Annual_Usage', 'Unit_Cost'} <= set(df.columns):
+        return (df['Annual_Usage'] * df['Unit_Cost']).to_numpy(dtype=float, na_value=np.nan)
+    raise ValueError(f'Missing column for {criterion.name}: {criterion.column}')
+
+
+def group_codes(df: pd.DataFrame, group_by: Optional[str]) -> Optional[np.ndarray]:
+    """Integer code per row for `group_by` (missing keys form one group of their own)"""
+    if not group_by:
+        return None
+    if group_by not in df.columns:
+        raise ValueError(f'Unknown group column: {group_by}')
+    codes, uniques = pd.factorize(df[group_by], sort=True)
+    codes[codes < 0] = len(uniques)
+    return codes
+
+
+def classify(df: pd.DataFrame, criteria: Optional[Iterable[Criterion]] = None, group_by: Optional[str] = None,
+             combined: bool = True) -> pd.DataFrame:
+    """One categorical label column per criterion (default: ABC), indexed like `df`
+
+    `group_by` applies to share criteria. With two or more criteria and
+    `combined`, a column named after all of them (ABC_XYZ_Category) holds
+    the joined labels.
+    """
+    criteria = list(criteria) if criteria is not None else [abc_criterion()]
+    if not criteria:
+        raise ValueError('No classification criteria given')
+    if len({criterion.name for criterion in criteria}) != len(criteria):
+        raise ValueError('Criterion names must be distinct')
+    groups = group_codes(df, group_by)
+    columns = {}
+    codes = []
+    for criterion in criteria:
+        values = _column(df, criterion)
+        band = (share_bands(values, criterion.breakpoints, groups) if criterion.kind == 'share'
+                else value_bands(values, criterion.breakpoints))
+        codes.append(band)
+        columns[criterion.output_column] = pd.Categorical.from_codes(band, categories=list(criterion.labels))
+    if combined and len(criteria) > 1:
+        # Mixed-radix code over the criteria, in the order the labels are listed
+        joined = np.zeros(len(df), dtype=np.int32)
+        for criterion, band in zip(criteria, codes):
+            joined = joined * len(criterion.labels) + band
+        names = [''.join(labels) for labels in itertools.product(*(criterion.labels for criterion in criteria))]
+        columns[combined_column(criteria)] = pd.Categorical.from_codes(joined, categories=names)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def combined_column(criteria: Sequence[Criterion]) -> str:
+    return '_'.join(criterion.name for criterion in criteria) + '_Category'
+
+
+def class_matrix(labels: pd.DataFrame, rows: Criterion, columns: Criterion, weights: Optional[np.ndarray] = None,
+                 groups: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Items per (rows label, columns label), or the sum of `weights`, e.g. the ABC × XYZ matrix
+
+    With `groups`, one block of rows per group (a (group, label) index).
+    """
+    row_codes = labels[rows.output_column].cat.codes.to_numpy().astype(np.int64)
+    column_codes = labels[columns.output_column].cat.codes.to_numpy().astype(np.int64)
+    size = len(rows.labels) * len(columns.labels)
+    flat = row_codes * len(columns.labels) + column_codes
+    row_index = pd.Index(list(rows.labels), name=rows.name)
+    if groups is not None:
+        group_index, uniques = pd.factorize(groups, sort=True, use_na_sentinel=False)
+        flat = flat + group_index.astype(np.int64) * size
+        row_index = pd.MultiIndex.from_product([uniques, list(rows.labels)], names=[groups.name, rows.name])
+    counts = np.bincount(flat, weights=weights, minlength=size * (len(row_index) // len(rows.labels)))
+    if weights is None:
+        counts = counts.astype(np.int64)
+    return pd.DataFrame(counts.reshape(len(row_index), len(columns.labels)), index=row_index,
+                        columns=pd.Index(list(columns.labels), name=columns.name))
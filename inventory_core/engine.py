@@ -0,0 +1,183 @@
+"""Vectorized calculation engine shared by the Streamlit app and the Flask API.
+
+Every function here works on whole columns at once instead of one row at a
+time, so the cost of a recalculation grows with NumPy speed rather than with
+the Python interpreter.
+"""
+import numpy as np
+
+# Cumulative% breakpoints: Top 70% → A, Next 20% → B, Remaining → C
+ABC_BREAKPOINTS = np.array([70.0, 90.0])
+ABC_LABELS = np.array(['A', 'B', 'C'], dtype=object)
+
+# σ is 10% of predicted demand unless a measured Demand_Std is available
+DEMAND_STD_RATIO = 0.1
+DEMAND_STD_COLUMN = 'Demand_Std'
+
+
+# norm.ppf at the service levels the sliders and API defaults produce (50%-99% in
+# whole percents, 97.5%, 99.5%, 99.9%), so the common path never imports SciPy
+Z_TABLE = {
+    0.5: 0.0,
+    0.51: 0.02506890825871106,
+    0.52: 0.05015358346473367,
+    0.53: 0.0752698620998299,
+    0.54: 0.10043372051146988,
+    0.55: 0.12566134685507416,
+    0.56: 0.1509692154967774,
+    0.57: 0.1763741647808612,
+    0.58: 0.20189347914185074,
+    0.59: 0.22754497664114934,
+    0.6: 0.2533471031357997,
+    0.61: 0.27931903444745415,
+    0.62: 0.3054807880993974,
+    0.63: 0.33185334643681663,
+    0.64: 0.3584587932511938,
+    0.65: 0.38532046640756773,
+    0.66: 0.41246312944140495,
+    0.67: 0.4399131656732339,
+    0.68: 0.4676987991145084,
+    0.69: 0.4958503473474532,
+    0.7: 0.5244005127080407,
+    0.71: 0.5533847195556727,
+    0.72: 0.5828415072712162,
+    0.73: 0.6128129910166272,
+    0.74: 0.643345405392917,
+    0.75: 0.6744897501960817,
+    0.76: 0.7063025628400874,
+    0.77: 0.7388468491852137,
+    0.78: 0.7721932141886848,
+    0.79: 0.8064212470182404,
+    0.8: 0.8416212335729143,
+    0.81: 0.8778962950512289,
+    0.82: 0.9153650878428138,
+    0.83: 0.9541652531461943,
+    0.84: 0.994457883209753,
+    0.85: 1.0364333894937898,
+    0.86: 1.0803193408149558,
+    0.87: 1.1263911290388007,
+    0.88: 1.1749867920660904,
+    0.89: 1.2265281200366105,
+    0.9: 1.2815515655446004,
+    0.91: 1.3407550336902165,
+    0.92: 1.4050715603096329,
+    0.93: 1.475791028179171,
+    0.94: 1.5547735945968535,
+    0.95: 1.6448536269514722,
+    0.96: 1.7506860712521692,
+    0.97: 1.8807936081512509,
+    0.975: 1.959963984540054,
+    0.98: 2.0537489106318225,
+    0.99: 2.3263478740408408,
+    0.995: 2.5758293035489004,
+    0.999: 3.090232306167813,
+}
+_Z_LEVELS = np.array(list(Z_TABLE))
+_Z_VALUES = np.array(list(Z_TABLE.values()))
+
+
+def z_score(service_level):
+    """Z-score for a service level (scalar or array)
+
+    Levels in Z_TABLE are looked up; anything else goes through
+    scipy.special.ndtri, which is what norm.ppf evaluates.
+    """
+    levels = np.asarray(service_level, dtype=float)
+    positions = np.minimum(np.searchsorted(_Z_LEVELS, levels), len(_Z_LEVELS) - 1)
+    if np.all(_Z_LEVELS[positions] == levels):
+        z = _Z_VALUES[positions]
+        return z if z.ndim else z[()]
+    from scipy.special import ndtri
+    return ndtri(levels) if levels.ndim else ndtri(levels[()])
+
+
+def cumulative_percent(annual_value):
+    """Cumulative share (in %) of an Annual_Value column already sorted descending
+
+    Missing values are skipped and stay NaN, like pandas cumsum()/sum().
+    """
+    annual_value = np.asarray(annual_value)
+    if annual_value.dtype.kind != 'f':
+        return np.cumsum(annual_value) / annual_value.sum() * 100
+    if annual_value.dtype.itemsize < 8:
+        # Compact (float32) catalogs still accumulate in float64
+        annual_value = annual_value.astype(np.float64)
+    cumulative = np.nancumsum(annual_value) / np.nansum(annual_value) * 100
+    cumulative[np.isnan(annual_value)] = np.nan
+    return cumulative
+
+
+def classify_abc(cumulative_pct, breakpoints=ABC_BREAKPOINTS, labels=ABC_LABELS):
+    """Classify items into ABC categories based on cumulative percentage
+
+    Same bands as the row-wise rule: <= 70 → A, <= 90 → B, otherwise C.
+    Other `breakpoints` need one more label than breakpoints.
+    """
+    band = np.searchsorted(np.asarray(breakpoints, dtype=float), np.asarray(cumulative_pct, dtype=float), side='left')
+    return np.asarray(labels, dtype=object)[band]
+
+
+def demand_std(predicted_demand, measured_std=None):
+    """σ per item: the measured value where there is one, else 10% of predicted demand"""
+    std_dev = np.asarray(predicted_demand, dtype=float) * DEMAND_STD_RATIO
+    if measured_std is None:
+        return std_dev
+    measured_std = np.asarray(measured_std, dtype=float)
+    return np.where(np.isnan(measured_std), std_dev, measured_std)
+
+
+def calculate_safety_stock(predicted_demand, lead_time, service_level, measured_std=None):
+    """Calculate safety stock using Z-score and lead time
+    Formula: Safety stock = Z.σ√Lead Time where σ is the measured demand σ, or 10% of predicted demand
+    """
+    z = z_score(service_level)
+    std_dev = demand_std(predicted_demand, measured_std)
+    return z * std_dev * np.sqrt(np.asarray(lead_time, dtype=float))
+
+
+def calculate_holding_cost(safety_stock, unit_cost, holding_cost_rate=0.2):
+    """Calculate holding cost for safety stock
+    Formula: Holding Cost = Safety Stock × Unit Cost × Holding Cost Rate
+    """
+    return np.asarray(safety_stock, dtype=float) * np.asarray(unit_cost, dtype=float) * holding_cost_rate
+
+
+def apply_abc(df):
+    """Add Annual_Value, Cumulative% and ABC_Category; returns the frame sorted by value"""
+    df['Annual_Value'] = df['Annual_Usage'] * df['Unit_Cost']
+    df = df.sort_values(by='Annual_Value', ascending=False).reset_index(drop=True)
+    df['Cumulative%'] = cumulative_percent(df['Annual_Value'].to_numpy())
+    df['ABC_Category'] = classify_abc(df['Cumulative%'].to_numpy())
+    return df
+
+
+def measured_std(df):
+    """The Demand_Std column as an array, or None when the frame has none"""
+    return df[DEMAND_STD_COLUMN].to_numpy() if DEMAND_STD_COLUMN in df.columns else None
+
+
+def apply_safety_stock(df, service_level, holding_cost_rate):
+    """Add Safety_Stock and Holding_Cost columns from Predicted_Demand (and Demand_Std, if present)
+
+    When the frame carries Demand_Std, its gaps are filled with the σ that was used instead.
+    """
+    std = measured_std(df)
+    if std is not None:
+        df[DEMAND_STD_COLUMN] = demand_std(df['Predicted_Demand'].to_numpy(), std)
+    df['Safety_Stock'] = calculate_safety_stock(
+        df['Predicted_Demand'].to_numpy(),
+        df['Lead_Time'].to_numpy(),
+        service_level,
+        measured_std(df)
+    ).round()
+    return apply_holding_cost(df, holding_cost_rate)
+
+
+def apply_holding_cost(df, holding_cost_rate):
+    """Add the Holding_Cost column from an existing Safety_Stock column"""
+    df['Holding_Cost'] = calculate_holding_cost(
+        df['Safety_Stock'].to_numpy(),
+        df['Unit_Cost'].to_numpy(),
+        holding_cost_rate
+    ).round(2)
+    return df
@@ -0,0 +1,133 @@
+"""Response encodings for calculation results.
+
+Records JSON (one object per row, produced by the API's jsonify) stays the
+default. The columnar encodings send one array per column instead, built
+from the DataFrame's column arrays without a per-row Python dict:
+
+    records   application/json                          [{col: value, ...}, ...]
+    columns   application/vnd.inventory.columnar+json   {col: [values, ...], ...}
+    msgpack   application/msgpack                       same layout as columns
+    arrow     application/vnd.apache.arrow.stream       Arrow IPC stream, metadata in the schema
+    ndjson    application/x-ndjson                      streamed batch by batch, see streaming.py
+
+msgpack and pyarrow are optional; asking for their format without the
+package installed raises ImportError.
+"""
+import json
+import math
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .tradeoff import TradeoffCurves
+
+RECORDS = 'records'
+COLUMNS = 'columns'
+MSGPACK = 'msgpack'
+ARROW = 'arrow'
+NDJSON = 'ndjson'
+
+MEDIA_TYPES = {
+    RECORDS: 'application/json',
+    COLUMNS: 'application/vnd.inventory.columnar+json',
+    MSGPACK: 'application/msgpack',
+    ARROW: 'application/vnd.apache.arrow.stream',
+    NDJSON: 'application/x-ndjson',
+}
+# Other names clients use for the same formats
+MEDIA_TYPE_ALIASES = {
+    'application/x-msgpack': MSGPACK,
+    'application/vnd.apache.arrow.file': ARROW,
+}
+FORMATS = list(MEDIA_TYPES)
+
+
+def format_for_media_type(media_type: str) -> Optional[str]:
+    """Format name for a media type, or None when it is not supported"""
+    for fmt, known in MEDIA_TYPES.items():
+        if known == media_type:
+            return fmt
+    return MEDIA_TYPE_ALIASES.get(media_type)
+
+
+def column_lists(frame: pd.DataFrame) -> Dict[str, List[Any]]:
+    """One Python list per column; missing values (float NaN, empty categories) become None (JSON null)"""
+    columns = {}
+    for col in frame.columns:
+        values = frame[col].to_numpy()
+        if values.dtype.kind in 'fO':
+            missing = pd.isna(values)
+            if missing.any():
+                values = values.astype(object)
+                values[missing] = None
+        columns[col] = values.tolist()
+    return columns
+
+
+def encode_frame(frame: pd.DataFrame, fmt: str, meta: Optional[Dict[str, Any]] = None) -> bytes:
+    """Serialize a result frame in a columnar format, plus response metadata (success, model_id, ...)"""
+    meta = dict(meta or {})
+    if fmt == ARROW:
+        return _arrow_stream(frame, meta)
+    return _encode_body({**meta, 'columns': [str(col) for col in frame.columns], 'data': column_lists(frame)}, fmt)
+
+
+def decode_frame(body: bytes, fmt: str) -> pd.DataFrame:
+    """Result frame back from a body in any format but NDJSON (records JSON keeps no column order)"""
+    if fmt == RECORDS:
+        return pd.DataFrame(json.loads(body)['data'])
+    if fmt == ARROW:
+        pa = _require('pyarrow')
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    if fmt == COLUMNS:
+        decoded = json.loads(body)
+    elif fmt == MSGPACK:
+        decoded = _require('msgpack').unpackb(body, raw=False)
+    else:
+        raise ValueError(f'Unsupported response format: {fmt}')
+    return pd.DataFrame(decoded['data'], columns=decoded['columns'])
+
+
+def encode_tradeoff(curves: 'TradeoffCurves', fmt: str, meta: Optional[Dict[str, Any]] = None) -> bytes:
+    """Serialize trade-off curves: items × levels arrays, or one row per (item, level) for Arrow"""
+    meta = dict(meta or {})
+    if fmt == ARROW:
+        return _arrow_stream(curves.to_frame(), meta)
+    return _encode_body({**meta, 'data': curves.to_columns()}, fmt)
+
+
+def _encode_body(body: Dict[str, Any], fmt: str) -> bytes:
+    if fmt == COLUMNS:
+        return json.dumps(body, default=_json_default, separators=(',', ':')).encode('utf-8')
+    if fmt == MSGPACK:
+        return _require('msgpack').packb(body, use_bin_type=True, default=_json_default)
+    raise ValueError(f'Unsupported response format: {fmt}')
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        value = value.item()
+        return None if isinstance(value, float) and math.isnan(value) else value
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _require(module: str):
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise ImportError(f'The {module} response format requires the {module} package (pip install {module})') from e
+
+
+def _arrow_stream(frame: pd.DataFrame, meta: Dict[str, Any]) -> bytes:
+    pa = _require('pyarrow')
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    # Response metadata travels in the schema; pandas' own metadata is not needed by clients
+    table = table.replace_schema_metadata({key: json.dumps(value) for key, value in meta.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
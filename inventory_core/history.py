@@ -0,0 +1,266 @@
+"""Append-only demand history with incremental per-item variability.
+
+Daily demand records (Item, Date, Demand) are appended as Parquet segments
+under root/part=NN/, with items hashed into a fixed number of partitions
+so all of an item's history lives in one partition. Segments are never
+rewritten.
+
+Alongside the raw history the store keeps running aggregates per item and
+time bucket (bucket_days days each): count, mean and M2, the sum of
+squared deviations from the mean (Welford). Appending a batch only merges
+the batch's aggregates into the buckets it touches (Chan's parallel
+update), and the σ over any window is combined from the buckets in the
+window, so history is never rescanned. The aggregates are partitioned
+like the history (stats/part=NN.parquet), and an append rewrites only
+the partitions its items hash to. Windows are rounded to whole
+buckets, and only days that have a record count towards σ (record
+zero-demand days explicitly).
+
+The σ values are daily; demand_std(period_days=...) scales them to the
+unit Lead_Time is measured in, assuming independent days. Reading and
+writing Parquet requires pyarrow.
+"""
+import json
+import os
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .ingest import _require_pyarrow
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are serialized within one process only
+    fcntl = None
+
+HISTORY_COLUMNS = ['Item', 'Date', 'Demand']
+STATS_DIR = 'stats'
+META_FILE = 'meta.json'
+LOCK_FILE = 'append.lock'
+DEFAULT_PARTITIONS = 64
+DEFAULT_BUCKET_DAYS = 7
+
+
+def combine_moments(groups: pd.DataFrame, keys: Any) -> pd.DataFrame:
+    """Merge (count, mean, m2) aggregates that share `keys` (Chan et al. parallel update)"""
+    weighted = groups.assign(total=groups['count'] * groups['mean'])
+    grouped = weighted.groupby(keys, sort=False, observed=True)
+    count = grouped['count'].transform('sum')
+    mean = grouped['total'].transform('sum') / count
+    # M2 of a union = Σ M2_i + Σ n_i (mean_i - mean)²
+    weighted['spread'] = weighted['m2'] + weighted['count'] * (weighted['mean'] - mean) ** 2
+    merged = weighted.groupby(keys, sort=False, observed=True).agg(
+        count=('count', 'sum'), total=('total', 'sum'), m2=('spread', 'sum'))
+    merged['mean'] = merged.pop('total') / merged['count']
+    return merged[['count', 'mean', 'm2']].reset_index()
+
+
+class DemandHistoryStore:
+    """Partitioned, append-only daily demand history with windowed per-item σ
+
+    Appends from several processes (e.g. gunicorn workers) are serialized
+    by an exclusive lock on a file in the store directory; any number of
+    processes may read, and readers pick up appends made by the others.
+    """
+
+    def __init__(self, root: str, bucket_days: int = DEFAULT_BUCKET_DAYS, partitions: int = DEFAULT_PARTITIONS):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        meta_path = os.path.join(root, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self._meta = json.load(f)
+        else:
+            self._meta = {'bucket_days': bucket_days, 'partitions': partitions, 'version': 0, 'last_day': None}
+            self._write_meta()
+        self.bucket_days = self._meta['bucket_days']
+        self.partitions = self._meta['partitions']
+        os.makedirs(os.path.join(root, STATS_DIR), exist_ok=True)
+        # Aggregates per partition as last read or written, and all of them combined
+        self._partition_stats: Dict[int, pd.DataFrame] = {}
+        self._stats = None
+
+    @property
+    def version(self) -> int:
+        """Number of batches appended so far (changes whenever σ may change)"""
+        return self._meta['version']
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        day = self._meta['last_day']
+        return None if day is None else pd.Timestamp(day, unit='D')
+
+    def _write_meta(self) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._meta, f)
+        os.replace(tmp_path, os.path.join(self.root, META_FILE))
+
+    @contextmanager
+    def _append_lock(self) -> Iterator[None]:
+        """Exclusive across threads and, through flock on LOCK_FILE, across processes"""
+        with self._lock, open(os.path.join(self.root, LOCK_FILE), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def partition_of(self, items: Iterable[Any]) -> np.ndarray:
+        """Partition number of each item (stable across processes and runs)"""
+        hashed = pd.util.hash_array(np.asarray(list(items), dtype=object).astype(str))
+        return (hashed % np.uint64(self.partitions)).astype(np.int64)
+
+    def _sync(self) -> None:
+        # Another process may have appended since the stats were loaded
+        with open(os.path.join(self.root, META_FILE)) as f:
+            meta = json.load(f)
+        if meta['version'] != self._meta['version']:
+            self._meta = meta
+            self._partition_stats = {}
+            self._stats = None
+
+    def _stats_path(self, number: int) -> str:
+        return os.path.join(self.root, STATS_DIR, f'part={number:02d}.parquet')
+
+    def _load_partition(self, number: int) -> Optional[pd.DataFrame]:
+        if number not in self._partition_stats:
+            path = self._stats_path(number)
+            self._partition_stats[number] = pd.read_parquet(path) if os.path.exists(path) else None
+        return self._partition_stats[number]
+
+    def _load_stats(self) -> pd.DataFrame:
+        self._sync()
+        if self._stats is None:
+            frames = [self._load_partition(number) for number in range(self.partitions)]
+            frames = [frame for frame in frames if frame is not None]
+            if frames:
+                self._stats = pd.concat(frames, ignore_index=True)
+            else:
+                self._stats = pd.DataFrame({'Item': pd.Series(dtype=object), 'bucket': pd.Series(dtype=np.int64),
+                                            'count': pd.Series(dtype=np.int64), 'mean': pd.Series(dtype=float),
+                                            'm2': pd.Series(dtype=float)})
+        return self._stats
+
+    def append(self, records: pd.DataFrame) -> int:
+        """Add daily demand rows (Item, Date, Demand); returns the number of rows written"""
+        pa = _require_pyarrow()
+        import pyarrow.parquet as pq
+        missing = [col for col in HISTORY_COLUMNS if col not in records.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        batch = pd.DataFrame({
+            'Item': records['Item'].astype(str).to_numpy(),
+            'Date': pd.to_datetime(records['Date']).dt.normalize().to_numpy(),
+            'Demand': pd.to_numeric(records['Demand']).astype(float).to_numpy(),
+        }).dropna()
+        if batch.empty:
+            return 0
+        day = batch['Date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        # Batch moments per (item, bucket), computed before taking the lock
+        keyed = batch.assign(bucket=day // self.bucket_days)
+        grouped = keyed.groupby(['Item', 'bucket'], sort=False)['Demand']
+        moments = grouped.agg(count='count', mean='mean', var=lambda x: x.var(ddof=0)).reset_index()
+        moments['m2'] = moments.pop('var') * moments['count']
+
+        moments_part = self.partition_of(moments['Item'])
+
+        with self._append_lock():
+            # Start from the aggregates and version another process may have just written
+            self._sync()
+            # Raw history: one new segment per touched partition
+            part = self.partition_of(batch['Item'])
+            segment = f'{self.version + 1:08d}-{uuid.uuid4().hex[:8]}.parquet'
+            for number in np.unique(part):
+                directory = os.path.join(self.root, f'part={number:02d}')
+                os.makedirs(directory, exist_ok=True)
+                rows = batch[part == number]
+                table = pa.Table.from_pandas(rows, preserve_index=False)
+                tmp_path = os.path.join(directory, f'.{segment}.tmp')
+                pq.write_table(table, tmp_path)
+                os.replace(tmp_path, os.path.join(directory, segment))
+
+            # Running aggregates: the batch moments merged into the stored ones, touched partitions only
+            for number in np.unique(moments_part):
+                stored = self._load_partition(number)
+                touched = moments[moments_part == number]
+                stats = touched if stored is None else pd.concat([stored, touched], ignore_index=True)
+                stats = combine_moments(stats, ['Item', 'bucket'])
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, STATS_DIR), suffix='.tmp')
+                os.close(fd)
+                stats.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, self._stats_path(number))
+                self._partition_stats[number] = stats
+            self._stats = None
+
+            last_day = int(day.max())
+            self._meta['last_day'] = max(last_day, self._meta['last_day'] or last_day)
+            self._meta['version'] += 1
+            self._write_meta()
+        return len(batch)
+
+    def stats(self, window_days: Optional[int] = None, as_of: Optional[Any] = None) -> pd.DataFrame:
+        """Per-item count, mean and σ (population) of daily demand over the window
+
+        The window covers the buckets of the `window_days` days up to `as_of`
+        (default: the latest recorded date); None uses all history.
+        """
+        stats = self._load_stats()
+        if window_days is not None and len(stats):
+            end = self._meta['last_day'] if as_of is None else int(
+                np.datetime64(pd.Timestamp(as_of).normalize(), 'D').astype(np.int64))
+            first_bucket = (end - window_days + 1) // self.bucket_days
+            stats = stats[(stats['bucket'] >= first_bucket) & (stats['bucket'] <= end // self.bucket_days)]
+        merged = combine_moments(stats, 'Item').set_index('Item')
+        merged['std'] = np.sqrt(merged['m2'] / merged['count'])
+        return merged[['count', 'mean', 'std']]
+
+    def demand_std(self, window_days: Optional[int] = None, as_of: Optional[Any] = None,
+                   period_days: float = 1.0, min_count: int = 2) -> pd.Series:
+        """σ of demand per `period_days` period for each item with at least `min_count` days in the window"""
+        stats = self.stats(window_days, as_of)
+        stats = stats[stats['count'] >= min_count]
+        return (stats['std'] * np.sqrt(period_days)).rename('Demand_Std')
+
+    def demand_cv(self, window_days: Optional[int] = None, as_of: Optional[Any] = None,
+                  period_days: float = 1.0, min_count: int = 2) -> pd.Series:
+        """Coefficient of variation (σ / mean) of demand per `period_days` period, for XYZ classification
+
+        Items without demand in the window, or with fewer than `min_count` days, are left out.
+        """
+        stats = self.stats(window_days, as_of)
+        stats = stats[(stats['count'] >= min_count) & (stats['mean'] > 0)]
+        return (stats['std'] / stats['mean'] / np.sqrt(period_days)).rename('Demand_CV')
+
+    def read(self, items: Optional[Iterable[Any]] = None) -> pd.DataFrame:
+        """Raw history, optionally only for some items (reads just their partitions)"""
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        if items is None:
+            numbers = range(self.partitions)
+        else:
+            items = [str(item) for item in items]
+            numbers = np.unique(self.partition_of(items))
+        frames = []
+        for number in numbers:
+            directory = os.path.join(self.root, f'part={number:02d}')
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if name.endswith('.parquet'):
+                    frames.append(pq.read_table(os.path.join(directory, name)).to_pandas())
+        if not frames:
+            return pd.DataFrame({'Item': pd.Series(dtype=object), 'Date': pd.Series(dtype='datetime64[ns]'),
+                                 'Demand': pd.Series(dtype=float)})
+        history = pd.concat(frames, ignore_index=True)
+        if items is not None:
+            history = history[history['Item'].isin(items)].reset_index(drop=True)
+        return history
@@ -0,0 +1,190 @@
+"""Bulk catalog ingestion from CSV, Parquet and Arrow files.
+
+Catalogs are loaded with compact dtypes: category for Item and int32 for
+the count columns (Annual_Usage, Lead_Time, Past_Demand), half the size of
+int64. Unit_Cost stays float64, since float32 prices such as 12.34 would
+come back as 12.340000152... in every value computed from them. A count
+column holding fractional or missing values is kept as float64 instead of
+being truncated. CSV files are parsed in chunks so only one chunk is ever
+held in the default dtypes; Parquet and Arrow files are memory mapped.
+pyarrow is only needed for the Parquet/Arrow readers.
+"""
+import os
+from typing import IO, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+COMPACT_DTYPES = {
+    'Item': 'category',
+    'Annual_Usage': 'int32',
+    'Unit_Cost': 'float64',
+    'Lead_Time': 'int32',
+    'Past_Demand': 'int32',
+}
+DEFAULT_CHUNKSIZE = 250_000
+
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.txt': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+
+Source = Union[str, os.PathLike, IO]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError('Reading Parquet/Arrow catalogs requires pyarrow (pip install pyarrow)') from e
+    return pyarrow
+
+
+def detect_format(name: str) -> str:
+    """File format ('csv', 'parquet' or 'arrow') from a file name"""
+    ext = os.path.splitext(str(name))[1].lower()
+    if ext not in FORMAT_EXTENSIONS:
+        raise ValueError(f'Unsupported catalog file type: {ext or name}')
+    return FORMAT_EXTENSIONS[ext]
+
+
+def catalog_dtypes(extra_columns: Sequence[str] = (), columns: Optional[Sequence[str]] = None) -> dict:
+    """Compact dtype map; extra columns (partition keys and the like) are categories
+
+    `columns` restricts the map to a subset, e.g. the value columns only.
+    """
+    dtypes = {**COMPACT_DTYPES, **{col: 'category' for col in extra_columns}}
+    if columns is not None:
+        dtypes = {col: dtypes[col] for col in columns}
+    return dtypes
+
+
+def _read_dtypes(dtypes: dict) -> dict:
+    """Dtypes to parse with: int32 columns are read as float64 and narrowed by _whole_numbers"""
+    return {col: 'float64' if dtype == 'int32' else dtype for col, dtype in dtypes.items()}
+
+
+def _whole_numbers(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Cast the int32 columns of `dtypes` that hold only whole numbers in int32 range; others stay float64"""
+    bounds = np.iinfo(np.int32)
+    for col, dtype in dtypes.items():
+        if dtype != 'int32' or not len(df):
+            continue
+        values = df[col].to_numpy()
+        if (np.isfinite(values).all() and (values == np.trunc(values)).all()
+                and bounds.min <= values.min() and values.max() <= bounds.max):
+            df[col] = values.astype(np.int32)
+    return df
+
+
+def check_columns(columns: Sequence[str], required: Sequence[str]) -> None:
+    """Raise ValueError naming any required column that is missing"""
+    missing = [col for col in required if col not in columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+
+def compact_frame(df: pd.DataFrame, extra_columns: Sequence[str] = ()) -> pd.DataFrame:
+    """Select the catalog columns and cast them to compact dtypes"""
+    dtypes = catalog_dtypes(extra_columns)
+    check_columns(df.columns, list(dtypes))
+    return _whole_numbers(df[list(dtypes)].astype(_read_dtypes(dtypes)), dtypes)
+
+
+def concat_compact(chunks: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate compact chunks, merging category columns without going through object"""
+    columns = {}
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            # Sorted categories, as a single-chunk read has them (codes then sort by name)
+            columns[col] = union_categoricals([chunk[col] for chunk in chunks], sort_categories=True)
+        else:
+            columns[col] = np.concatenate([chunk[col].to_numpy() for chunk in chunks])
+    return pd.DataFrame(columns)
+
+
+def iter_csv_chunks(source: Source, chunksize: int = DEFAULT_CHUNKSIZE, extra_columns: Sequence[str] = (),
+                    columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield compact-dtype chunks of a CSV catalog"""
+    dtypes = catalog_dtypes(extra_columns, columns)
+    reader = pd.read_csv(source, usecols=lambda col: col in dtypes, dtype=_read_dtypes(dtypes), chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            check_columns(chunk.columns, list(dtypes))
+            yield _whole_numbers(chunk[list(dtypes)], dtypes)
+
+
+def read_csv_catalog(source: Source, chunksize: int = DEFAULT_CHUNKSIZE,
+                     extra_columns: Sequence[str] = ()) -> pd.DataFrame:
+    """Load a CSV catalog chunk by chunk into one compact DataFrame"""
+    chunks: List[pd.DataFrame] = list(iter_csv_chunks(source, chunksize, extra_columns))
+    if not chunks:
+        return pd.DataFrame(columns=list(catalog_dtypes(extra_columns))).astype(catalog_dtypes(extra_columns))
+    return concat_compact(chunks)
+
+
+def iter_parquet_chunks(source: Source, chunksize: int = DEFAULT_CHUNKSIZE, extra_columns: Sequence[str] = (),
+                        columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield compact-dtype chunks of a Parquet catalog, one record batch at a time"""
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    dtypes = catalog_dtypes(extra_columns, columns)
+    parquet_file = pq.ParquetFile(source, memory_map=isinstance(source, (str, os.PathLike)))
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=list(dtypes)):
+        yield _arrow_to_compact(pa.Table.from_batches([batch]), dtypes)
+
+
+def _arrow_to_compact(table, dtypes: dict) -> pd.DataFrame:
+    pa = _require_pyarrow()
+    check_columns(table.column_names, list(dtypes))
+    arrays = []
+    for col, dtype in dtypes.items():
+        column = table.column(col)
+        if dtype == 'category':
+            column = column.dictionary_encode() if not pa.types.is_dictionary(column.type) else column
+        else:
+            column = column.cast(pa.float64())
+        arrays.append(column)
+    return _whole_numbers(pa.table(arrays, names=list(dtypes)).to_pandas(), dtypes)
+
+
+def read_parquet_catalog(source: Source, extra_columns: Sequence[str] = ()) -> pd.DataFrame:
+    """Load a Parquet catalog (memory mapped when given a path)"""
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+    columns = list(catalog_dtypes(extra_columns))
+    table = pq.read_table(source, columns=columns, memory_map=isinstance(source, (str, os.PathLike)))
+    return _arrow_to_compact(table, catalog_dtypes(extra_columns))
+
+
+def read_arrow_catalog(source: Source, extra_columns: Sequence[str] = ()) -> pd.DataFrame:
+    """Load an Arrow IPC / Feather catalog (memory mapped when given a path)"""
+    _require_pyarrow()
+    import pyarrow.feather as feather
+    columns = list(catalog_dtypes(extra_columns))
+    table = feather.read_table(source, columns=columns, memory_map=isinstance(source, (str, os.PathLike)))
+    return _arrow_to_compact(table, catalog_dtypes(extra_columns))
+
+
+def load_catalog(source: Source, fmt: Optional[str] = None, chunksize: int = DEFAULT_CHUNKSIZE,
+                 extra_columns: Sequence[str] = ()) -> pd.DataFrame:
+    """Load a catalog file in any supported format into a compact DataFrame
+
+    `fmt` defaults to the format implied by the file name.
+    """
+    if fmt is None:
+        fmt = detect_format(getattr(source, 'name', None) or os.fspath(source))
+    if fmt == 'csv':
+        return read_csv_catalog(source, chunksize, extra_columns)
+    if fmt == 'parquet':
+        return read_parquet_catalog(source, extra_columns)
+    if fmt == 'arrow':
+        return read_arrow_catalog(source, extra_columns)
+    raise ValueError(f'Unsupported catalog format: {fmt}')
@@ -0,0 +1,310 @@
+"""Background job queue for calculations too large to run inside a request.
+
+A submitted job is stored with its parameters, run on a thread pool and
+its progress (the pipeline stage reached) is recorded as it goes. Results
+are kept in pages of RESULT_PAGE_ROWS rows so clients can fetch them a
+page at a time.
+
+Two stores are available: MemoryJobStore (per process, lost on restart)
+and SqliteJobStore (a local SQLite file shared by every worker process on
+the host). With SQLite, jobs whose owning process died, e.g. on a
+restart, are picked up again by the next queue that starts.
+"""
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import pandas as pd
+
+from .pipeline import PIPELINE_STAGES, process_all_calculations, score_items
+
+if TYPE_CHECKING:
+    from .registry import ModelRegistry
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+UNFINISHED = (QUEUED, RUNNING)
+
+RESULT_PAGE_ROWS = 10_000
+
+# Completed stages over all stages, the last one being storing the result
+STAGE_PROGRESS = {stage: (i + 1) / (len(PIPELINE_STAGES) + 1) for i, stage in enumerate(PIPELINE_STAGES)}
+
+
+@dataclass
+class Job:
+    """State of one submitted calculation"""
+    id: str
+    params: Dict[str, Any]
+    status: str = QUEUED
+    stage: Optional[str] = None
+    progress: float = 0.0
+    error: Optional[str] = None
+    model_id: Optional[str] = None
+    rows: int = 0
+    owner: str = ''
+    created: float = field(default_factory=time.time)
+    updated: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status fields as returned by the API (without the submitted items)"""
+        return {name: value for name, value in vars(self).items() if name not in ('params', 'owner')}
+
+
+def _split_pages(frame: pd.DataFrame) -> List[pd.DataFrame]:
+    return [frame.iloc[start:start + RESULT_PAGE_ROWS] for start in range(0, len(frame), RESULT_PAGE_ROWS)]
+
+
+class MemoryJobStore:
+    """Jobs and results held in this process only"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._results: Dict[str, List[pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated = time.time()
+
+    def save_result(self, job_id: str, frame: pd.DataFrame) -> None:
+        with self._lock:
+            self._results[job_id] = _split_pages(frame)
+
+    def result_pages(self, job_id: str, first: int, last: int) -> List[pd.DataFrame]:
+        with self._lock:
+            return self._results.get(job_id, [])[first:last + 1]
+
+    def claim_orphans(self, owner: str) -> List[Job]:
+        # Nothing outlives this process
+        return []
+
+    def purge(self, before: float) -> None:
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.status not in UNFINISHED and j.updated < before]:
+                del self._jobs[job_id]
+                self._results.pop(job_id, None)
+
+
+class SqliteJobStore:
+    """Jobs and results in a local SQLite file, shared by every process using it"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, params TEXT, status TEXT, stage TEXT, '
+                'progress REAL, error TEXT, model_id TEXT, rows INTEGER, owner TEXT, created REAL, updated REAL)'
+            )
+            conn.execute('CREATE TABLE IF NOT EXISTS results (job_id TEXT, page INTEGER, data BLOB, '
+                         'PRIMARY KEY (job_id, page))')
+            conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)')
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread and process; connections never cross a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        values = dict(zip(Job.__dataclass_fields__, row))
+        values['params'] = json.loads(values['params'])
+        return Job(**values)
+
+    def add(self, job: Job) -> None:
+        values = dict(vars(job))
+        values['params'] = json.dumps(job.params)
+        columns = list(Job.__dataclass_fields__)
+        self._connect().execute(
+            f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [values[col] for col in columns]
+        )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        columns = ', '.join(Job.__dataclass_fields__)
+        row = self._connect().execute(f'SELECT {columns} FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields['updated'] = time.time()
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        self._connect().execute(f'UPDATE jobs SET {assignments} WHERE id = ?', [*fields.values(), job_id])
+
+    def save_result(self, job_id: str, frame: pd.DataFrame) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN')
+            conn.executemany(
+                'INSERT OR REPLACE INTO results (job_id, page, data) VALUES (?, ?, ?)',
+                [(job_id, i, pickle.dumps(page, protocol=pickle.HIGHEST_PROTOCOL))
+                 for i, page in enumerate(_split_pages(frame))]
+            )
+
+    def result_pages(self, job_id: str, first: int, last: int) -> List[pd.DataFrame]:
+        rows = self._connect().execute(
+            'SELECT data FROM results WHERE job_id = ? AND page BETWEEN ? AND ? ORDER BY page',
+            (job_id, first, last)
+        ).fetchall()
+        return [pickle.loads(data) for data, in rows]
+
+    def claim_orphans(self, owner: str) -> List[Job]:
+        """Take over unfinished jobs whose owning process is gone"""
+        conn = self._connect()
+        rows = conn.execute('SELECT id, owner FROM jobs WHERE status IN (?, ?)', UNFINISHED).fetchall()
+        claimed = []
+        for job_id, previous in rows:
+            if previous == owner or _owner_alive(previous):
+                continue
+            # Only one process wins the compare-and-swap on the owner column
+            cursor = conn.execute('UPDATE jobs SET owner = ?, status = ?, updated = ? WHERE id = ? AND owner = ?',
+                                  (owner, QUEUED, time.time(), job_id, previous))
+            if cursor.rowcount:
+                claimed.append(self.get(job_id))
+        return claimed
+
+    def purge(self, before: float) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN')
+            conn.execute('DELETE FROM results WHERE job_id IN '
+                         '(SELECT id FROM jobs WHERE status IN (?, ?) AND updated < ?)', (DONE, FAILED, before))
+            conn.execute('DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?', (DONE, FAILED, before))
+
+
+def _owner_alive(owner: str) -> bool:
+    """Whether the queue that owns a job may still be running (best effort, by pid)"""
+    pid = int(owner.split(':')[0] or 0)
+    if pid <= 0 or pid == os.getpid():
+        # Our own pid with another queue token: left over from a process that had this pid before
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobQueue:
+    """Runs submitted calculations in the background and tracks their progress
+
+    `store` defaults to a MemoryJobStore. Finished jobs are dropped after
+    `retention` seconds. The thread pool is created on first use in each
+    process, so a queue built before a server forks its workers is safe.
+    """
+
+    def __init__(self, store=None, registry: Optional['ModelRegistry'] = None,
+                 max_workers: int = 2, retention: float = 3600.0):
+        self.store = store if store is not None else MemoryJobStore()
+        self.registry = registry
+        self.max_workers = max_workers
+        self.retention = retention
+        self._executor = None
+        self._pid = None
+        self._owner = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='inventory-job')
+                self._pid = os.getpid()
+                self._owner = f'{self._pid}:{uuid.uuid4().hex[:8]}'
+                for job in self.store.claim_orphans(self._owner):
+                    self._executor.submit(self._run, job)
+            return self._executor
+
+    def submit(self, items: List[Dict[str, Any]], service_level: float = 0.95, holding_cost_rate: float = 0.2,
+               mode: str = 'fit', model_id: Optional[str] = None) -> Job:
+        """Queue a calculation; returns the new job (poll it with get())"""
+        pool = self._pool()
+        self.store.purge(time.time() - self.retention)
+        job = Job(uuid.uuid4().hex, {
+            'items': items,
+            'service_level': service_level,
+            'holding_cost_rate': holding_cost_rate,
+            'mode': mode,
+            'model_id': model_id,
+        }, owner=self._owner)
+        self.store.add(job)
+        pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Current state of a job, or None when it is unknown or expired"""
+        self._pool()
+        return self.store.get(job_id)
+
+    def result(self, job_id: str, offset: int = 0, limit: int = 1000) -> pd.DataFrame:
+        """Rows [offset, offset + limit) of a finished job's result"""
+        if limit <= 0 or offset < 0:
+            raise ValueError('offset must be >= 0 and limit > 0')
+        first, last = offset // RESULT_PAGE_ROWS, (offset + limit - 1) // RESULT_PAGE_ROWS
+        pages = self.store.result_pages(job_id, first, last)
+        if not pages:
+            return pd.DataFrame()
+        frame = pd.concat(pages) if len(pages) > 1 else pages[0]
+        start = offset - first * RESULT_PAGE_ROWS
+        return frame.iloc[start:start + limit].reset_index(drop=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the thread pool; with a SQLite store unfinished jobs resume on the next start"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+            self._pid = None
+
+    def _run(self, job: Job) -> None:
+        params = job.params
+        self.store.update(job.id, status=RUNNING, stage=None, progress=0.0)
+
+        def on_stage(stage: str) -> None:
+            self.store.update(job.id, stage=stage, progress=STAGE_PROGRESS[stage])
+
+        try:
+            if params['mode'] == 'predict-only':
+                bundle = self.registry.get(params['model_id']) if self.registry is not None else None
+                if bundle is None:
+                    raise LookupError(f"No stored model found: {params['model_id']}")
+                result = score_items(params['items'], bundle.classifier, bundle.regressor,
+                                     params['service_level'], params['holding_cost_rate'], on_stage=on_stage)
+                result.model_id = bundle.fingerprint
+            else:
+                result = process_all_calculations(params['items'], params['service_level'],
+                                                  params['holding_cost_rate'], registry=self.registry,
+                                                  on_stage=on_stage)
+            self.store.save_result(job.id, result.frame)
+            self.store.update(job.id, status=DONE, stage='done', progress=1.0,
+                              model_id=result.model_id, rows=len(result.frame))
+        except Exception as e:
+            self.store.update(job.id, status=FAILED, error=str(e))
@@ -0,0 +1,191 @@
+"""Stage timers, Prometheus-style metrics and on-demand profiling.
+
+StageTimer is an `on_stage` callback for process_all_calculations and
+score_items: it records how long each PIPELINE_STAGES stage took (the time
+since the previous stage finished). MetricsRegistry holds counters and
+latency histograms and renders them in the Prometheus text format, with
+no client library needed. Metrics are per process; under a preforking
+server each worker reports its own.
+
+capture_profile wraps a block in cProfile ('cpu') or tracemalloc
+('memory') and returns a plain-text report.
+"""
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from a cached response up to a large catalog
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROFILE_MODES = ['cpu', 'memory']
+PROFILE_TOP = 30
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class StageTimer:
+    """on_stage callback timing each stage since the previous one finished"""
+
+    def __init__(self, rows: Optional[int] = None):
+        self.rows = rows
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def __call__(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def restart(self) -> None:
+        """Time the next stage from now (e.g. after work that is not a stage)"""
+        self._last = time.perf_counter()
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in ms)"""
+        return ', '.join(f'{stage};dur={seconds * 1000:.2f}' for stage, seconds in self.timings.items())
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """Monotonic total per label set"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(labels)} {value:g}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: count per bucket (non-cumulative), sum, count
+        self._values: Dict[Labels, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+                lines.append(f'{self.name}_sum{_format_labels(labels)} {total:.6f}')
+                lines.append(f'{self.name}_count{_format_labels(labels)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Named counters and histograms rendered together for /api/metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        with self._lock:
+            return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def observe_stages(self, timer: StageTimer, **labels: str) -> None:
+        """Record a StageTimer's stage durations and row count"""
+        stages = self.histogram('inventory_pipeline_stage_seconds', 'Time spent in each pipeline stage')
+        for stage, seconds in timer.timings.items():
+            stages.observe(seconds, stage=stage, **labels)
+        if timer.rows is not None:
+            self.counter('inventory_pipeline_rows_total', 'Rows processed by the pipeline').inc(timer.rows, **labels)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+
+@contextmanager
+def capture_profile(mode: str, report: Dict[str, str]) -> Iterator[None]:
+    """Profile the block and put the text report in report['text']
+
+    'cpu' uses cProfile (this thread only, top functions by cumulative
+    time); 'memory' uses tracemalloc (top allocation sites still alive at
+    the end, plus the peak). tracemalloc is process-wide, so concurrent
+    requests show up in a memory profile too.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode} (choose one of: {', '.join(PROFILE_MODES)})")
+    if mode == 'cpu':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+            report['text'] = out.getvalue()
+        return
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started:
+            tracemalloc.stop()
+        lines = [f'Peak traced memory: {peak / 1e6:.1f} MB', f'Top {PROFILE_TOP} allocation sites:']
+        lines += [str(stat) for stat in snapshot.statistics('lineno')[:PROFILE_TOP]]
+        report['text'] = '\n'.join(lines) + '\n'
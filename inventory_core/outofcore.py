@@ -0,0 +1,172 @@
+"""Out-of-core ABC classification for catalogs that do not fit in memory.
+
+The in-memory path sorts every item by Annual_Value and takes a cumulative
+sum. Here the data is streamed in chunks instead:
+
+1. Sketch pass: total value plus the count and value sum per value bucket.
+   Buckets come from the top bits of the float64 value, so they are
+   ordered like the values themselves (about 0.4% wide). Every bucket whose
+   cumulative range does not straddle a breakpoint has one known category.
+2. Refine pass: only the items in the (at most two) boundary buckets are
+   kept, sorted exactly, and labelled with their true cumulative share.
+3. Assign pass: each chunk is labelled from the bucket table and the
+   refined boundary items, and yielded without holding the rest.
+
+Categories match engine.apply_abc on data that fits in memory. Items with
+exactly equal Annual_Value that straddle a breakpoint are ranked in file
+order. Annual values are assumed to be non-negative; NaN values are C, as
+in the in-memory path.
+"""
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .engine import ABC_BREAKPOINTS, ABC_LABELS
+
+# float64 bit pattern >> 44 keeps the exponent and 8 mantissa bits
+BUCKET_SHIFT = 44
+NUM_BUCKETS = 1 << (63 - BUCKET_SHIFT)
+NAN_BUCKET = -1
+
+# The sketch and refine passes only read these
+VALUE_COLUMNS = ['Annual_Usage', 'Unit_Cost']
+
+ChunkSource = Callable[[], Iterable[pd.DataFrame]]
+
+
+def annual_value(chunk: pd.DataFrame) -> np.ndarray:
+    """Annual_Value = Annual_Usage × Unit_Cost (computed like apply_abc, held as float64)"""
+    return (chunk['Annual_Usage'] * chunk['Unit_Cost']).to_numpy(dtype=np.float64)
+
+
+def value_buckets(values: np.ndarray) -> np.ndarray:
+    """Order-preserving bucket of each value (NAN_BUCKET for NaN)"""
+    keys = np.maximum(values, 0.0).view(np.int64) >> BUCKET_SHIFT
+    keys[np.isnan(values)] = NAN_BUCKET
+    return keys
+
+
+@dataclass
+class AbcSketch:
+    """Bucket table from the sketch pass plus the refined boundary items"""
+    total: float
+    rows: int
+    bucket_sums: np.ndarray
+    bucket_band: np.ndarray
+    boundary_buckets: np.ndarray
+    boundary_rows: Optional[np.ndarray] = None
+    boundary_band: Optional[np.ndarray] = None
+
+    def bands(self, values: np.ndarray, row_start: int) -> np.ndarray:
+        """Band index (0=A, 1=B, 2=C) for a chunk whose first row is `row_start`"""
+        keys = value_buckets(values)
+        valid = keys != NAN_BUCKET
+        bands = np.full(len(values), len(ABC_BREAKPOINTS), dtype=np.int8)
+        bands[valid] = self.bucket_band[keys[valid]]
+        pending = np.flatnonzero(valid & np.isin(keys, self.boundary_buckets))
+        if len(pending):
+            pos = np.searchsorted(self.boundary_rows, pending + row_start)
+            bands[pending] = self.boundary_band[pos]
+        return bands
+
+
+def sketch_pass(chunks: Iterable[pd.DataFrame]) -> AbcSketch:
+    """Pass 1: total value and per-bucket sums, plus the bucket-level bands"""
+    sums = np.zeros(NUM_BUCKETS)
+    rows = 0
+    for chunk in chunks:
+        values = annual_value(chunk)
+        keys = value_buckets(values)
+        valid = keys != NAN_BUCKET
+        sums += np.bincount(keys[valid], weights=values[valid], minlength=NUM_BUCKETS)
+        rows += len(chunk)
+    total = sums.sum()
+
+    # Cumulative % range (before, through] covered by each bucket, high values first
+    through = np.cumsum(sums[::-1])[::-1] / total * 100
+    before = through - sums / total * 100
+    bucket_band = np.searchsorted(ABC_BREAKPOINTS, through, side='left').astype(np.int8)
+    straddles = (before[:, None] < ABC_BREAKPOINTS) & (ABC_BREAKPOINTS < through[:, None])
+    boundary = np.flatnonzero(straddles.any(axis=1) & (sums > 0))
+    return AbcSketch(total, rows, sums, bucket_band, boundary)
+
+
+def refine_pass(chunks: Iterable[pd.DataFrame], sketch: AbcSketch) -> AbcSketch:
+    """Pass 2: exact bands for the items that fall in a boundary bucket"""
+    collected_rows, collected_values = [np.empty(0, dtype=np.int64)], [np.empty(0)]
+    row_start = 0
+    for chunk in chunks:
+        values = annual_value(chunk)
+        hit = np.flatnonzero(np.isin(value_buckets(values), sketch.boundary_buckets))
+        collected_rows.append(hit + row_start)
+        collected_values.append(values[hit])
+        row_start += len(chunk)
+    rows = np.concatenate(collected_rows)
+    values = np.concatenate(collected_values)
+
+    # Rank within the boundary buckets: value descending, then file order
+    order = np.lexsort((rows, -values))
+    rows, values = rows[order], values[order]
+    keys = value_buckets(values)
+    band = np.empty(len(values), dtype=np.int8)
+    for bucket in sketch.boundary_buckets:
+        in_bucket = keys == bucket
+        # Every bucket above this one ranks ahead of all of its items
+        value_above = sketch.bucket_sums[bucket + 1:].sum()
+        cum_pct = (value_above + np.cumsum(values[in_bucket])) / sketch.total * 100
+        band[in_bucket] = np.searchsorted(ABC_BREAKPOINTS, cum_pct, side='left')
+
+    # Index the refined bands by global row for the assign pass
+    by_row = np.argsort(rows)
+    sketch.boundary_rows = rows[by_row]
+    sketch.boundary_band = band[by_row]
+    return sketch
+
+
+def assign_pass(chunks: Iterable[pd.DataFrame], sketch: AbcSketch) -> Iterator[pd.DataFrame]:
+    """Pass 3: yield each chunk with Annual_Value and ABC_Category added"""
+    row_start = 0
+    for chunk in chunks:
+        values = annual_value(chunk)
+        chunk = chunk.assign(
+            Annual_Value=values,
+            ABC_Category=ABC_LABELS[sketch.bands(values, row_start)]
+        )
+        row_start += len(chunk)
+        yield chunk
+
+
+def build_sketch(make_chunks: ChunkSource) -> AbcSketch:
+    """Run the sketch and refine passes over a re-iterable chunk source"""
+    return refine_pass(make_chunks(), sketch_pass(make_chunks()))
+
+
+def out_of_core_abc(make_chunks: ChunkSource, make_value_chunks: Optional[ChunkSource] = None) -> Iterator[pd.DataFrame]:
+    """ABC-classify a catalog chunk by chunk
+
+    `make_chunks` is called once per pass and must return the same chunks
+    in the same order each time, e.g. ``lambda: iter_csv_chunks(path)``.
+    `make_value_chunks` optionally yields the same rows with only
+    VALUE_COLUMNS, which makes the first two passes cheaper to read.
+    The yielded chunks keep their original row order; Cumulative% is not
+    produced since it would need every item's global rank.
+    """
+    sketch = build_sketch(make_value_chunks or make_chunks)
+    return assign_pass(make_chunks(), sketch)
+
+
+def abc_csv(source: str, destination: str, chunksize: int = 1_000_000) -> AbcSketch:
+    """Classify a CSV catalog and write it to `destination` with the ABC columns"""
+    from .ingest import iter_csv_chunks
+
+    def make_chunks():
+        return iter_csv_chunks(source, chunksize)
+
+    sketch = build_sketch(lambda: iter_csv_chunks(source, chunksize, columns=VALUE_COLUMNS))
+    header = True
+    for chunk in assign_pass(make_chunks(), sketch):
+        chunk.to_csv(destination, mode='w' if header else 'a', header=header, index=False)
+        header = False
+    return sketch
@@ -0,0 +1,232 @@
+"""Partitioned pipeline runs on a process pool.
+
+Each partition (e.g. one warehouse, or one warehouse × category) is run
+through process_all_calculations independently. The catalog is sorted by
+partition once and its feature columns are copied into shared memory; the
+workers read their slice from there and write their results into shared
+output arrays, so only small task descriptors are pickled.
+
+The pool only pays off on large catalogs: every call allocates and copies
+the shared blocks and round-trips one task per partition, and a fresh pool
+also forks and imports the pipeline in each worker. Below min_rows
+(PARALLEL_MIN_ROWS), with a single partition, or with one usable CPU or
+worker, the partitions run one after another in this process instead.
+
+    python -m inventory_core.parallel catalog.parquet --partition-key Warehouse -o results.parquet
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .engine import ABC_LABELS
+from .pipeline import FEATURE_COLUMNS, process_all_calculations
+
+# Result columns written by the workers and their shared-memory dtypes
+FLOAT_OUTPUTS = ['Annual_Value', 'Cumulative%', 'Predicted_Demand', 'Safety_Stock', 'Holding_Cost']
+LABEL_OUTPUTS = ['ABC_Category', 'Predicted_ABC']
+ROW_COLUMN = '_source_row'
+# Smallest catalog sent to the process pool (see benchmarks/bench_parallel.py)
+PARALLEL_MIN_ROWS = 50_000
+
+PartitionKey = Union[str, Sequence[str]]
+
+
+@dataclass
+class SharedArray:
+    """Picklable handle to a NumPy array living in a shared memory block"""
+    name: str
+    dtype: str
+    length: int
+
+    def attach(self) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+        shm = _attach(self.name)
+        return shm, np.ndarray((self.length,), dtype=self.dtype, buffer=shm.buf)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # The parent owns and unlinks every block. Pool workers share its
+    # resource tracker, so attaching (and re-registering) is harmless on
+    # older Pythons; 3.13+ lets us skip tracking altogether.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedBlocks:
+    """Allocates shared arrays and frees them all on exit"""
+
+    def __init__(self):
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def array(self, values: Optional[np.ndarray] = None, dtype: str = 'float64',
+              length: int = 0) -> SharedArray:
+        if values is not None:
+            values = np.ascontiguousarray(values)
+            dtype, length = values.dtype.str, len(values)
+        nbytes = max(np.dtype(dtype).itemsize * length, 1)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._blocks.append(shm)
+        if values is not None:
+            np.ndarray((length,), dtype=dtype, buffer=shm.buf)[:] = values
+        return SharedArray(shm.name, np.dtype(dtype).str, length)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+
+
+def _run_partition(inputs: Dict[str, SharedArray], outputs: Dict[str, SharedArray],
+                   start: int, stop: int, service_level: float, holding_cost_rate: float) -> float:
+    """Worker: run the pipeline on rows [start, stop) and write the results in place"""
+    began = time.perf_counter()
+    attached = []
+    try:
+        columns = {}
+        for col, handle in inputs.items():
+            shm, values = handle.attach()
+            attached.append(shm)
+            columns[col] = values[start:stop].copy()
+        columns[ROW_COLUMN] = np.arange(start, stop)
+        df = process_all_calculations(pd.DataFrame(columns), service_level, holding_cost_rate).frame
+
+        arrays = {}
+        for col, handle in outputs.items():
+            shm, values = handle.attach()
+            attached.append(shm)
+            arrays[col] = values
+        arrays[ROW_COLUMN][start:stop] = df[ROW_COLUMN].to_numpy()
+        for col in FLOAT_OUTPUTS:
+            arrays[col][start:stop] = df[col].to_numpy(dtype=np.float64)
+        for col in LABEL_OUTPUTS:
+            arrays[col][start:stop] = np.searchsorted(ABC_LABELS.astype(str), df[col].to_numpy(dtype=str))
+    finally:
+        # Views into the blocks must be gone before they can be closed
+        arrays = columns = values = None
+        for shm in attached:
+            shm.close()
+    return time.perf_counter() - began
+
+
+def partition_bounds(df: pd.DataFrame, partition_key: PartitionKey) -> Tuple[np.ndarray, np.ndarray]:
+    """Stable row order grouping partitions together, and the start offset of each partition
+
+    Partitions are ordered by key value; rows keep their order within a partition.
+    """
+    keys = [partition_key] if isinstance(partition_key, str) else list(partition_key)
+    codes = df.groupby(keys, sort=True, observed=True, dropna=False).ngroup().to_numpy()
+    order = np.argsort(codes, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0]) if len(order) else np.empty(0, dtype=np.int64)
+    return order, starts
+
+
+def usable_cpus() -> int:
+    """CPUs this process may run on (the affinity mask where the platform has one)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def run_partitioned(
+    df: pd.DataFrame,
+    partition_key: PartitionKey,
+    service_level: float = 0.95,
+    holding_cost_rate: float = 0.2,
+    max_workers: Optional[int] = None,
+    executor: Optional[ProcessPoolExecutor] = None,
+    min_rows: int = PARALLEL_MIN_ROWS,
+) -> pd.DataFrame:
+    """Run process_all_calculations per partition, on a process pool for large catalogs
+
+    Returns one frame with every input column plus the pipeline outputs.
+    Partitions appear in key order, each sorted by Annual_Value as in a
+    single process_all_calculations call. Catalogs under `min_rows` rows
+    (and single-partition or single-CPU runs) are processed serially in
+    this process; `min_rows=0` always uses the pool.
+    """
+    order, starts = partition_bounds(df, partition_key)
+    ordered = df.iloc[order].reset_index(drop=True)
+    stops = np.r_[starts[1:], len(ordered)].astype(int)
+
+    workers = min(max_workers or usable_cpus(), usable_cpus())
+    serial = min_rows > 0 and (len(ordered) < min_rows or len(starts) < 2 or workers < 2)
+    own_executor = executor is None and not serial
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        with SharedBlocks() as blocks:
+            inputs = {col: blocks.array(ordered[col].to_numpy()) for col in FEATURE_COLUMNS}
+            outputs = {col: blocks.array(dtype='float64', length=len(ordered)) for col in FLOAT_OUTPUTS}
+            outputs.update({col: blocks.array(dtype='int8', length=len(ordered)) for col in LABEL_OUTPUTS})
+            outputs[ROW_COLUMN] = blocks.array(dtype='int64', length=len(ordered))
+
+            if serial:
+                for start, stop in zip(starts, stops):
+                    _run_partition(inputs, outputs, int(start), int(stop), service_level, holding_cost_rate)
+            else:
+                futures = [
+                    executor.submit(_run_partition, inputs, outputs, int(start), int(stop),
+                                    service_level, holding_cost_rate)
+                    for start, stop in zip(starts, stops)
+                ]
+                for future in futures:
+                    future.result()
+
+            results = {}
+            for col, handle in outputs.items():
+                shm, values = handle.attach()
+                results[col] = values.copy()
+                del values
+                shm.close()
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    merged = ordered.iloc[results.pop(ROW_COLUMN)].reset_index(drop=True)
+    for col in FLOAT_OUTPUTS:
+        merged[col] = results[col]
+    for col in LABEL_OUTPUTS:
+        merged[col] = ABC_LABELS[results[col]]
+    return merged
+
+
+def main() -> None:
+    from .ingest import load_catalog
+
+    parser = argparse.ArgumentParser(description='Run the inventory pipeline per partition on a process pool')
+    parser.add_argument('catalog', help='CSV, Parquet or Arrow catalog file')
+    parser.add_argument('--partition-key', nargs='+', required=True, help='column(s) to partition by')
+    parser.add_argument('-o', '--output', help='write results here (.csv or .parquet)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--service-level', type=float, default=0.95)
+    parser.add_argument('--holding-cost-rate', type=float, default=0.2)
+    args = parser.parse_args()
+
+    df = load_catalog(args.catalog, extra_columns=args.partition_key)
+    start = time.perf_counter()
+    result = run_partitioned(df, args.partition_key, args.service_level, args.holding_cost_rate, args.workers)
+    elapsed = time.perf_counter() - start
+    partitions = result.groupby(args.partition_key, observed=True).ngroups
+    print(f'{len(result):,} rows in {partitions:,} partitions with {args.workers} workers: '
+          f'{elapsed:.2f}s ({len(result) / elapsed:,.0f} rows/s)')
+    if args.output:
+        if args.output.endswith('.parquet'):
+            result.to_parquet(args.output, index=False)
+        else:
+            result.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Columnar calculation pipeline: ABC Analysis, AI Classification, Demand Forecasting, Safety Stock.
+
+This is the single implementation behind the Streamlit app and the Flask
+API. It only depends on pandas, NumPy, scikit-learn and SciPy so worker
+processes can import it without pulling in any UI framework.
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .engine import DEMAND_STD_COLUMN, apply_abc, apply_safety_stock
+
+if TYPE_CHECKING:
+    # scikit-learn is imported when a model is first trained, not at startup
+    from sklearn.linear_model import LinearRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+    from .abc_model import ABCPredictor
+    from .registry import ModelRegistry
+
+INPUT_COLUMNS = ['Item', 'Annual_Usage', 'Unit_Cost', 'Lead_Time', 'Past_Demand']
+FEATURE_COLUMNS = ['Annual_Usage', 'Unit_Cost', 'Lead_Time', 'Past_Demand']
+# Optional per-item annual forecast carried by the items (see forecasting.forecast_items)
+DEMAND_FORECAST_COLUMN = 'Demand_Forecast'
+OUTPUT_COLUMNS = INPUT_COLUMNS + [
+    'Annual_Value', 'Cumulative%', 'ABC_Category', 'Predicted_ABC',
+    'Predicted_Demand', 'Safety_Stock', 'Holding_Cost',
+]
+
+# Minimum number of items needed to fit each model
+MIN_CLASSIFIER_ITEMS = 3
+MIN_REGRESSION_ITEMS = 2
+
+# Stage names reported to `on_stage` callbacks, in execution order
+PIPELINE_STAGES = ['abc', 'classifier', 'regression', 'safety_stock']
+
+StageCallback = Callable[[str], None]
+
+InventoryData = Union[pd.DataFrame, Sequence[Mapping[str, Any]], Mapping[str, Sequence[Any]]]
+
+
+@dataclass
+class PipelineResult:
+    """Processed frame plus the models fitted while producing it
+
+    `model_id` is the registry fingerprint of the models, when they came
+    from a ModelRegistry.
+    """
+    frame: pd.DataFrame
+    classifier: Optional['DecisionTreeClassifier'] = None
+    regressor: Optional['LinearRegression'] = None
+    model_id: Optional[str] = None
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Row-oriented output, as returned by the JSON API"""
+        return self.frame.to_dict('records')
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """Column-oriented output: one array per column"""
+        return {col: self.frame[col].to_numpy() for col in self.frame.columns}
+
+
+def to_frame(data: InventoryData) -> pd.DataFrame:
+    """Build a private DataFrame from records, a column mapping or an existing frame"""
+    if isinstance(data, pd.DataFrame):
+        return data.copy()
+    return pd.DataFrame(data)
+
+
+def predict_abc(df: pd.DataFrame, model: Optional['DecisionTreeClassifier']) -> np.ndarray:
+    """Predicted ABC labels, or the rule-based labels when there is no model"""
+    if model is None:
+        return df['ABC_Category'].to_numpy()
+    return model.predict(df[FEATURE_COLUMNS])
+
+
+def predict_demand(df: pd.DataFrame, reg: Optional['LinearRegression']) -> np.ndarray:
+    """Rounded demand forecast, or Annual_Usage when there is no model"""
+    if reg is None:
+        return df['Annual_Usage'].to_numpy()
+    return reg.predict(df['Past_Demand'].to_numpy().reshape(-1, 1)).round()
+
+
+def attach_demand_std(df: pd.DataFrame, demand_std: Optional[pd.Series]) -> pd.DataFrame:
+    """Add the Demand_Std column from an Item → σ series (items without one keep the 10% rule)"""
+    if demand_std is not None:
+        df[DEMAND_STD_COLUMN] = df['Item'].astype(str).map(demand_std.rename(index=str)).astype(float)
+    return df
+
+
+def attach_demand_forecast(df: pd.DataFrame, demand_forecast: Optional[pd.Series]) -> pd.DataFrame:
+    """Replace Predicted_Demand with per-item annual forecasts (items without one keep the regression's)
+
+    The forecasts come from `demand_forecast` (Item → forecast) or, without
+    it, from a Demand_Forecast column of the items.
+    """
+    if demand_forecast is not None:
+        forecast = df['Item'].astype(str).map(demand_forecast.rename(index=str)).astype(float)
+    elif DEMAND_FORECAST_COLUMN in df.columns:
+        forecast = pd.to_numeric(df[DEMAND_FORECAST_COLUMN], errors='coerce').astype(float)
+    else:
+        return df
+    df['Predicted_Demand'] = forecast.round().fillna(pd.Series(df['Predicted_Demand'], index=df.index)).to_numpy()
+    return df
+
+
+def train_abc_classifier(df: pd.DataFrame) -> Optional['DecisionTreeClassifier']:
+    """Decision Tree trained on the ABC labels (None when there are too few items)"""
+    if len(df) < MIN_CLASSIFIER_ITEMS:
+        return None
+    from sklearn.tree import DecisionTreeClassifier
+    model = DecisionTreeClassifier(random_state=42)
+    model.fit(df[FEATURE_COLUMNS], df['ABC_Category'])
+    return model
+
+
+def train_demand_regression(df: pd.DataFrame) -> Optional['LinearRegression']:
+    """Linear Regression of Annual_Usage on Past_Demand (None when there are too few items)"""
+    if len(df) < MIN_REGRESSION_ITEMS:
+        return None
+    from sklearn.linear_model import LinearRegression
+    reg = LinearRegression()
+    reg.fit(df['Past_Demand'].to_numpy().reshape(-1, 1), df['Annual_Usage'].to_numpy())
+    return reg
+
+
+def fit_abc_classifier(df: pd.DataFrame) -> Tuple[np.ndarray, Optional['DecisionTreeClassifier']]:
+    """Train a Decision Tree on the ABC labels and predict them back"""
+    model = train_abc_classifier(df)
+    return predict_abc(df, model), model
+
+
+def fit_demand_regression(df: pd.DataFrame) -> Tuple[np.ndarray, Optional['LinearRegression']]:
+    """Forecast demand with a Linear Regression of Annual_Usage on Past_Demand"""
+    reg = train_demand_regression(df)
+    return predict_demand(df, reg), reg
+
+
+def process_all_calculations(
+    data: InventoryData,
+    service_level: float = 0.95,
+    holding_cost_rate: float = 0.2,
+    registry: Optional['ModelRegistry'] = None,
+    on_stage: Optional[StageCallback] = None,
+    demand_std: Optional[pd.Series] = None,
+    demand_forecast: Optional[pd.Series] = None,
+    abc_predictor: Optional['ABCPredictor'] = None,
+) -> PipelineResult:
+    """Process all calculations: ABC Analysis, AI Classification, Demand Forecasting, Safety Stock
+
+    With a `registry`, models already fitted on the same data are reused
+    instead of being trained again. `on_stage` is called with each
+    PIPELINE_STAGES name once that stage has finished. `demand_std` maps
+    Item to a measured demand σ (see history.DemandHistoryStore.demand_std)
+    and `demand_forecast` maps Item to an annual demand forecast that
+    replaces the regression's (see forecasting.forecast_items). An
+    `abc_predictor` supplies Predicted_ABC under its refit policy; the
+    registry then only supplies the regression (fitted on first sight of
+    the data), and `model_id` stays None.
+    """
+    df = attach_demand_std(to_frame(data), demand_std)
+
+    # Step 1: ABC Analysis
+    df = apply_abc(df)
+    if on_stage:
+        on_stage('abc')
+
+    if registry is not None and abc_predictor is None:
+        # Fetching (or fitting) the stored bundle is timed as part of the 'classifier' stage
+        bundle = registry.get_or_fit(df)
+        result = score_items(df, bundle.classifier, bundle.regressor, service_level, holding_cost_rate,
+                             ranked=True, on_stage=on_stage, demand_forecast=demand_forecast)
+        result.model_id = bundle.fingerprint
+        return result
+
+    # Step 2: Train Decision Tree for ABC Prediction
+    if abc_predictor is not None:
+        df['Predicted_ABC'], model = abc_predictor.fit_predict(df)
+    else:
+        df['Predicted_ABC'], model = fit_abc_classifier(df)
+    if on_stage:
+        on_stage('classifier')
+
+    # Step 3: Demand Forecasting using Linear Regression
+    if registry is not None:
+        reg = registry.get_or_fit(df, fit_classifier=False).regressor
+        df['Predicted_Demand'] = predict_demand(df, reg)
+    else:
+        df['Predicted_Demand'], reg = fit_demand_regression(df)
+    df = attach_demand_forecast(df, demand_forecast)
+    if on_stage:
+        on_stage('regression')
+
+    # Step 4: Safety Stock Calculation and Holding Cost
+    df = apply_safety_stock(df, service_level, holding_cost_rate)
+    if on_stage:
+        on_stage('safety_stock')
+
+    return PipelineResult(df, model, reg)
+
+
+def score_items(
+    data: InventoryData,
+    classifier: Optional['DecisionTreeClassifier'],
+    regressor: Optional['LinearRegression'],
+    service_level: float = 0.95,
+    holding_cost_rate: float = 0.2,
+    ranked: bool = False,
+    on_stage: Optional[StageCallback] = None,
+    demand_std: Optional[pd.Series] = None,
+    demand_forecast: Optional[pd.Series] = None,
+) -> PipelineResult:
+    """Run the pipeline with already-fitted models (predict-only, no training)
+
+    `ranked=True` means `data` already went through engine.apply_abc.
+    """
+    df = attach_demand_std(data if ranked else apply_abc(to_frame(data)), demand_std)
+    if on_stage and not ranked:
+        on_stage('abc')
+    df['Predicted_ABC'] = predict_abc(df, classifier)
+    if on_stage:
+        on_stage('classifier')
+    df['Predicted_Demand'] = predict_demand(df, regressor)
+    df = attach_demand_forecast(df, demand_forecast)
+    if on_stage:
+        on_stage('regression')
+    df = apply_safety_stock(df, service_level, holding_cost_rate)
+    if on_stage:
+        on_stage('safety_stock')
+    return PipelineResult(df, classifier, regressor)
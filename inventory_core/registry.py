@@ -0,0 +1,162 @@
+"""Persistent registry of fitted ABC classifiers and demand regressions.
+
+Models are keyed by a fingerprint of the training data, so the same item set
+is only ever fitted once. Fitted bundles are kept in memory and, when a
+directory is given, pickled to disk where other worker processes pick them
+up lazily on first use.
+"""
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional
+
+import pandas as pd
+
+from .pipeline import FEATURE_COLUMNS, train_abc_classifier, train_demand_regression
+
+if TYPE_CHECKING:
+    from sklearn.linear_model import LinearRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+LATEST_FILE = 'LATEST'
+FINGERPRINT_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+
+@dataclass
+class ModelBundle:
+    """Classifier and regressor fitted on one dataset
+
+    `has_classifier` is False for a regressor-only bundle (see
+    ModelRegistry.get_or_fit), whose classifier is still to be trained.
+    """
+    fingerprint: str
+    classifier: Optional['DecisionTreeClassifier'] = None
+    regressor: Optional['LinearRegression'] = None
+    has_classifier: bool = True
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Stable hash of the model training data (feature columns, in row order)"""
+    hashed = pd.util.hash_pandas_object(df[FEATURE_COLUMNS], index=False)
+    return hashlib.sha256(hashed.to_numpy().tobytes()).hexdigest()[:32]
+
+
+class ModelRegistry:
+    """Fit-once store of ModelBundles keyed by dataset fingerprint
+
+    `root` is the directory bundles are pickled to; with `root=None` the
+    registry is memory-only. `max_in_memory` bounds the in-process LRU.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_in_memory: int = 32):
+        self.root = root
+        self.max_in_memory = max_in_memory
+        self._bundles = OrderedDict()
+        self._latest = None
+        self._lock = threading.Lock()
+        if root:
+            os.makedirs(root, exist_ok=True)
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.root, f'{fingerprint}.pkl')
+
+    def _remember(self, bundle: ModelBundle) -> None:
+        with self._lock:
+            self._bundles[bundle.fingerprint] = bundle
+            self._bundles.move_to_end(bundle.fingerprint)
+            while len(self._bundles) > self.max_in_memory:
+                self._bundles.popitem(last=False)
+
+    def _write(self, bundle: ModelBundle) -> None:
+        # Write to a temp file and rename so readers never see a partial pickle
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(bundle.fingerprint))
+        if not bundle.has_classifier:
+            # Never the default model for predict-only scoring
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(bundle.fingerprint)
+        os.replace(tmp_path, os.path.join(self.root, LATEST_FILE))
+
+    def get(self, fingerprint: str) -> Optional[ModelBundle]:
+        """Stored bundle for a fingerprint, loading it from disk if needed"""
+        if not FINGERPRINT_PATTERN.fullmatch(str(fingerprint)):
+            # Fingerprints can come from API clients; never build paths from anything else
+            return None
+        with self._lock:
+            bundle = self._bundles.get(fingerprint)
+            if bundle is not None:
+                self._bundles.move_to_end(fingerprint)
+                return bundle
+        if not self.root or not os.path.exists(self._path(fingerprint)):
+            return None
+        with open(self._path(fingerprint), 'rb') as f:
+            bundle = pickle.load(f)
+        self._remember(bundle)
+        return bundle
+
+    def latest_fingerprint(self) -> Optional[str]:
+        """Fingerprint of the most recently fitted bundle (across processes when on disk)"""
+        if self.root:
+            try:
+                with open(os.path.join(self.root, LATEST_FILE)) as f:
+                    return f.read().strip() or None
+            except FileNotFoundError:
+                pass
+        return self._latest
+
+    def fingerprints(self) -> List[str]:
+        """Every fingerprint held in memory or on disk"""
+        known = set(self._bundles)
+        if self.root:
+            known.update(name[:-len('.pkl')] for name in os.listdir(self.root) if name.endswith('.pkl'))
+        return sorted(known)
+
+    def preload(self, limit: Optional[int] = None) -> int:
+        """Load the most recently stored bundles into memory; returns how many were loaded
+
+        Used by preforking servers so every worker inherits the models.
+        """
+        if not self.root:
+            return 0
+        limit = self.max_in_memory if limit is None else min(limit, self.max_in_memory)
+        paths = [os.path.join(self.root, f'{fp}.pkl') for fp in self.fingerprints()]
+        newest = sorted((p for p in paths if os.path.exists(p)), key=os.path.getmtime, reverse=True)[:limit]
+        latest = self.latest_fingerprint()
+        loaded = 0
+        # Oldest first so the LRU order matches the file ages, latest model last
+        for path in reversed(newest):
+            if self.get(os.path.basename(path)[:-len('.pkl')]) is not None:
+                loaded += 1
+        if latest:
+            self.get(latest)
+        return loaded
+
+    def get_or_fit(self, df: pd.DataFrame, fit_classifier: bool = True) -> ModelBundle:
+        """Bundle for this dataset, fitting and storing it on first sight
+
+        `df` must already carry ABC_Category (see engine.apply_abc). With
+        `fit_classifier=False` only the regressor is fitted for a new
+        dataset, for callers whose ABC labels come from elsewhere (an
+        ABCPredictor); a later full call adds the classifier to the bundle.
+        """
+        fingerprint = dataset_fingerprint(df)
+        bundle = self.get(fingerprint)
+        if bundle is None or (fit_classifier and not bundle.has_classifier):
+            regressor = train_demand_regression(df) if bundle is None else bundle.regressor
+            classifier = train_abc_classifier(df) if fit_classifier else None
+            bundle = ModelBundle(fingerprint, classifier, regressor, has_classifier=fit_classifier)
+            if self.root:
+                self._write(bundle)
+            self._remember(bundle)
+            if fit_classifier:
+                self._latest = fingerprint
+        return bundle
@@ -0,0 +1,280 @@
+"""Paged, sorted and filtered queries over processed results.
+
+ResultsIndex wraps one result frame and builds what queries need on first
+use: a sort order per column and the item names in sorted order (for
+prefix filters). It also keeps the row order of each recent (sort,
+filters) view, so after the first page, paging through a view costs
+O(page size) instead of a pass over the catalog.
+
+Cursors are opaque strings carrying the dataset id, the query and the
+offset, so the next page is always taken from the same snapshot; a cursor
+for another dataset is rejected. ResultsStore keeps the last few indexes
+by dataset id, and with a directory also pickles each dataset there so
+other processes sharing it (the workers of one deployment) can page
+through it too.
+"""
+import base64
+import json
+import os
+import pickle
+import re
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Filtered row orders kept per index
+MAX_VIEWS = 16
+SORT_ORDERS = ['asc', 'desc']
+# Datasets kept in a ResultsStore directory, across all processes sharing it
+DEFAULT_DISK_DATASETS = 64
+_DATASET_ID = re.compile(r'[A-Za-z0-9_-]+')
+
+
+@dataclass(frozen=True)
+class ResultsQuery:
+    """Sort and filters; `sort=None` keeps the frame's own order (ranked by annual value)"""
+    sort: Optional[str] = None
+    descending: bool = False
+    categories: Tuple[str, ...] = ()
+    category_column: str = 'ABC_Category'
+    value_column: str = 'Annual_Value'
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    prefix: Optional[str] = None
+
+
+@dataclass
+class ResultsPage:
+    rows: pd.DataFrame
+    total: int
+    offset: int
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+
+def encode_cursor(dataset_id: str, query: ResultsQuery, offset: int, limit: int) -> str:
+    payload = json.dumps({'d': dataset_id, 'q': asdict(query), 'o': offset, 'l': limit}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, ResultsQuery, int, int]:
+    """(dataset id, query, offset, limit); ValueError for a malformed cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        fields = dict(payload['q'], categories=tuple(payload['q']['categories']))
+        return payload['d'], ResultsQuery(**fields), int(payload['o']), int(payload['l'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+class ResultsIndex:
+    """Query one result frame by pages; the frame must not change afterwards"""
+
+    def __init__(self, frame: pd.DataFrame, dataset_id: Optional[str] = None):
+        self.frame = frame.reset_index(drop=True)
+        self.dataset_id = dataset_id or uuid.uuid4().hex
+        self._orders: Dict[str, np.ndarray] = {}
+        self._sorted_items: Optional[np.ndarray] = None
+        self._views: 'OrderedDict[ResultsQuery, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _column(self, name: str) -> pd.Series:
+        if name not in self.frame.columns:
+            raise ValueError(f'Unknown column: {name}')
+        return self.frame[name]
+
+    def _order(self, column: str, descending: bool) -> np.ndarray:
+        """Stable sort positions, missing values last in either direction"""
+        if column not in self._orders:
+            values = self._column(column)
+            if isinstance(values.dtype, pd.CategoricalDtype) and not values.cat.ordered:
+                # Codes follow the order categories were first seen in; sort by name instead
+                values = values.cat.reorder_categories(sorted(values.cat.categories, key=str))
+            self._orders[column] = np.asarray(values.array.argsort(kind='stable', na_position='last'))
+        order = self._orders[column]
+        if not descending:
+            return order
+        valid = len(order) - int(self.frame[column].isna().sum())
+        return np.concatenate([order[:valid][::-1], order[valid:]])
+
+    def _prefix_mask(self, prefix: str) -> np.ndarray:
+        order = self._order('Item', False)
+        if self._sorted_items is None:
+            self._sorted_items = self.frame['Item'].astype(str).to_numpy(dtype=object)[order]
+        # Every name starting with the prefix sorts between the prefix and prefix + the last code point
+        lo = np.searchsorted(self._sorted_items, prefix, side='left')
+        hi = np.searchsorted(self._sorted_items, prefix + '\U0010ffff', side='left')
+        mask = np.zeros(len(self.frame), dtype=bool)
+        mask[order[lo:hi]] = True
+        return mask
+
+    def _mask(self, query: ResultsQuery) -> Optional[np.ndarray]:
+        mask = None
+
+        def narrow(condition):
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        if query.categories:
+            narrow(self._column(query.category_column).isin(query.categories).to_numpy())
+        if query.min_value is not None or query.max_value is not None:
+            values = self._column(query.value_column).to_numpy(dtype=float)
+            if query.min_value is not None:
+                narrow(values >= query.min_value)
+            if query.max_value is not None:
+                narrow(values <= query.max_value)
+        if query.prefix:
+            narrow(self._prefix_mask(query.prefix))
+        return mask
+
+    def view(self, query: ResultsQuery) -> np.ndarray:
+        """Row positions matching the query, in sort order"""
+        with self._lock:
+            order = self._views.get(query)
+            if order is not None:
+                self._views.move_to_end(query)
+                return order
+            order = self._order(query.sort, query.descending) if query.sort else np.arange(len(self.frame))
+            mask = self._mask(query)
+            if mask is not None:
+                order = order[mask[order]]
+            self._views[query] = order
+            while len(self._views) > MAX_VIEWS:
+                self._views.popitem(last=False)
+            return order
+
+    def page(self, query: ResultsQuery = ResultsQuery(), offset: int = 0,
+             limit: int = DEFAULT_PAGE_SIZE) -> ResultsPage:
+        """Rows offset .. offset + limit of the query's view, with cursors for the neighbouring pages"""
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+        order = self.view(query)
+        offset = min(max(offset, 0), len(order))
+        end = offset + limit
+        next_cursor = encode_cursor(self.dataset_id, query, end, limit) if end < len(order) else None
+        previous_cursor = encode_cursor(self.dataset_id, query, max(offset - limit, 0), limit) if offset > 0 else None
+        return ResultsPage(self.frame.iloc[order[offset:end]], len(order), offset, next_cursor, previous_cursor)
+
+    def resume(self, cursor: str, limit: Optional[int] = None) -> ResultsPage:
+        """The page a cursor from this index points at (`limit` overrides the cursor's page size)"""
+        dataset_id, query, offset, cursor_limit = decode_cursor(cursor)
+        if dataset_id != self.dataset_id:
+            raise ValueError('Cursor belongs to another dataset')
+        return self.page(query, offset, limit or cursor_limit)
+
+
+class ResultsStore:
+    """The most recent result indexes by dataset id (the newest is the default)
+
+    A dataset added with `defer` is only built when it is first asked for,
+    so registering results that may never be paged costs nothing. With
+    `directory`, added frames are also written there and ids this process
+    does not know are loaded from it; the newest `max_disk_datasets` files
+    are kept. The default (newest) dataset is always this process's own.
+    """
+
+    def __init__(self, max_datasets: int = 4, directory: Optional[str] = None,
+                 max_disk_datasets: int = DEFAULT_DISK_DATASETS):
+        self.max_datasets = max_datasets
+        self.directory = directory
+        self.max_disk_datasets = max_disk_datasets
+        self._indexes: 'OrderedDict[str, Union[ResultsIndex, Callable[[], pd.DataFrame]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _put(self, dataset_id: str, entry: Union[ResultsIndex, Callable[[], pd.DataFrame]]) -> None:
+        with self._lock:
+            self._indexes[dataset_id] = entry
+            self._indexes.move_to_end(dataset_id)
+            while len(self._indexes) > self.max_datasets:
+                self._indexes.popitem(last=False)
+
+    def _path(self, dataset_id: str) -> Optional[str]:
+        # Ids come from requests; anything but a plain name is never a file here
+        if not self.directory or not _DATASET_ID.fullmatch(dataset_id):
+            return None
+        return os.path.join(self.directory, f'{dataset_id}.pkl')
+
+    def _write(self, index: ResultsIndex) -> None:
+        path = self._path(index.dataset_id)
+        if path is None:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(index.frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        entries = []
+        with os.scandir(self.directory) as listing:
+            for entry in listing:
+                if entry.name.endswith('.pkl'):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        continue
+        entries.sort()
+        for _, stale in entries[:max(len(entries) - self.max_disk_datasets, 0)]:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+    def _read(self, dataset_id: str) -> Optional[ResultsIndex]:
+        path = self._path(dataset_id)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                frame = pickle.load(f)
+            # Keep recently paged datasets from being the first removed
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        index = ResultsIndex(frame, dataset_id)
+        self._put(dataset_id, index)
+        return index
+
+    def add(self, frame: pd.DataFrame, dataset_id: Optional[str] = None) -> ResultsIndex:
+        index = ResultsIndex(frame, dataset_id)
+        self._put(index.dataset_id, index)
+        self._write(index)
+        return index
+
+    def defer(self, dataset_id: str, load: Callable[[], pd.DataFrame]) -> None:
+        """Register a dataset whose frame `load` builds on first use (a no-op when it is already known)"""
+        with self._lock:
+            if dataset_id in self._indexes:
+                self._indexes.move_to_end(dataset_id)
+                return
+        self._put(dataset_id, load)
+
+    def get(self, dataset_id: Optional[str] = None) -> Optional[ResultsIndex]:
+        with self._lock:
+            if dataset_id is None:
+                dataset_id = next(reversed(self._indexes), None)
+            entry = self._indexes.get(dataset_id)
+        if entry is None:
+            return self._read(dataset_id) if dataset_id is not None else None
+        if isinstance(entry, ResultsIndex):
+            return entry
+        index = ResultsIndex(entry(), dataset_id)
+        with self._lock:
+            # Replace the loader unless the dataset was evicted meanwhile
+            if self._indexes.get(dataset_id) is entry:
+                self._indexes[dataset_id] = index
+        path = self._path(dataset_id)
+        if path is not None and not os.path.exists(path):
+            # Its cursors may be followed on another process
+            self._write(index)
+        return index
@@ -0,0 +1,161 @@
+"""What-if scenarios: many service level / holding cost / lead time settings in one pass.
+
+ABC ranking, the models and the demand predictions do not depend on the
+scenario parameters, so they are computed once. Safety stock and holding
+cost are then evaluated for every scenario as one scenarios × items
+broadcast, with the same rounding as engine.apply_safety_stock, so each
+scenario row equals what process_all_calculations returns for those
+parameters (with Lead_Time scaled by the multiplier).
+"""
+import itertools
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .engine import ABC_LABELS, apply_abc, calculate_holding_cost, calculate_safety_stock, measured_std
+from .pipeline import (
+    InventoryData,
+    attach_demand_forecast,
+    attach_demand_std,
+    predict_abc,
+    predict_demand,
+    to_frame,
+    train_abc_classifier,
+    train_demand_regression,
+)
+
+if TYPE_CHECKING:
+    from .registry import ModelRegistry
+
+# Items per block when only the per-scenario totals are kept
+TOTALS_BLOCK_ITEMS = 100_000
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One combination of planning parameters"""
+    service_level: float
+    holding_cost_rate: float
+    lead_time_multiplier: float = 1.0
+
+
+def scenario_grid(
+    service_levels: Iterable[float],
+    holding_cost_rates: Iterable[float],
+    lead_time_multipliers: Iterable[float] = (1.0,),
+) -> List[Scenario]:
+    """Every combination of the given values (service level varies slowest)"""
+    return [Scenario(float(sl), float(hcr), float(ltm))
+            for sl, hcr, ltm in itertools.product(service_levels, holding_cost_rates, lead_time_multipliers)]
+
+
+@dataclass
+class ScenarioResults:
+    """Per-scenario totals, plus the scenarios × items arrays when they were kept"""
+    scenarios: List[Scenario]
+    frame: pd.DataFrame
+    total_safety_stock: np.ndarray
+    total_holding_cost: np.ndarray
+    holding_cost_by_category: np.ndarray
+    safety_stocks: Optional[np.ndarray] = None
+    holding_costs: Optional[np.ndarray] = None
+    model_id: Optional[str] = None
+
+    def totals(self) -> pd.DataFrame:
+        """One row per scenario: its parameters and totals"""
+        totals = pd.DataFrame([vars(s) for s in self.scenarios],
+                              columns=['service_level', 'holding_cost_rate', 'lead_time_multiplier'])
+        totals['total_safety_stock'] = self.total_safety_stock
+        totals['total_holding_cost'] = self.total_holding_cost
+        for i, label in enumerate(ABC_LABELS):
+            totals[f'holding_cost_{label}'] = self.holding_cost_by_category[:, i]
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API response shape; per-item arrays only when they were kept"""
+        scenarios = []
+        by_category = self.holding_cost_by_category.round(2).tolist()
+        for i, scenario in enumerate(self.scenarios):
+            scenarios.append({
+                **vars(scenario),
+                'total_safety_stock': float(self.total_safety_stock[i]),
+                'total_holding_cost': round(float(self.total_holding_cost[i]), 2),
+                'holding_cost_by_category': dict(zip(ABC_LABELS.tolist(), by_category[i])),
+            })
+        result = {'scenarios': scenarios}
+        if self.safety_stocks is not None:
+            result['items'] = self.frame['Item'].tolist()
+            result['safety_stocks'] = self.safety_stocks.tolist()
+            result['holding_costs'] = self.holding_costs.tolist()
+        return result
+
+
+def scenario_arrays(frame: pd.DataFrame, scenarios: Sequence[Scenario]):
+    """Safety stock and holding cost for every scenario (rows) and item (columns)"""
+    params = np.array([(s.service_level, s.holding_cost_rate, s.lead_time_multiplier) for s in scenarios], dtype=float)
+    std = measured_std(frame)
+    safety_stocks = calculate_safety_stock(
+        frame['Predicted_Demand'].to_numpy()[None, :],
+        frame['Lead_Time'].to_numpy(dtype=float)[None, :] * params[:, 2:3],
+        params[:, 0:1],
+        None if std is None else std[None, :]
+    ).round()
+    holding_costs = calculate_holding_cost(
+        safety_stocks,
+        frame['Unit_Cost'].to_numpy()[None, :],
+        params[:, 1:2]
+    ).round(2)
+    return safety_stocks, holding_costs
+
+
+def evaluate_scenarios(
+    data: InventoryData,
+    scenarios: Sequence[Scenario],
+    registry: Optional['ModelRegistry'] = None,
+    keep_items: bool = True,
+    demand_std: Optional[pd.Series] = None,
+    demand_forecast: Optional[pd.Series] = None,
+) -> ScenarioResults:
+    """Rank and predict once, then evaluate every scenario as one broadcast
+
+    With `keep_items=False` only the totals are kept and the items are
+    processed in blocks, so memory stays bounded for large catalogs.
+    `demand_std` and `demand_forecast` (or the Demand_Std / Demand_Forecast
+    columns of the items) are used as in process_all_calculations.
+    """
+    if not scenarios:
+        raise ValueError('No scenarios given')
+    for scenario in scenarios:
+        if not 0 < scenario.service_level < 1:
+            raise ValueError(f'Service level must be between 0 and 1: {scenario.service_level}')
+    df = apply_abc(attach_demand_std(to_frame(data), demand_std))
+    model_id = None
+    if registry is not None:
+        bundle = registry.get_or_fit(df)
+        classifier, regressor, model_id = bundle.classifier, bundle.regressor, bundle.fingerprint
+    else:
+        classifier, regressor = train_abc_classifier(df), train_demand_regression(df)
+    df['Predicted_ABC'] = predict_abc(df, classifier)
+    df['Predicted_Demand'] = predict_demand(df, regressor)
+    df = attach_demand_forecast(df, demand_forecast)
+
+    # items × categories indicator so the per-category totals are one matrix product
+    categories = (df['ABC_Category'].to_numpy()[:, None] == ABC_LABELS[None, :]).astype(float)
+    block = len(df) if keep_items else TOTALS_BLOCK_ITEMS
+    total_ss = np.zeros(len(scenarios))
+    total_hc = np.zeros(len(scenarios))
+    hc_by_category = np.zeros((len(scenarios), len(ABC_LABELS)))
+    safety_stocks = holding_costs = None
+    for start in range(0, len(df), max(block, 1)):
+        safety_stocks, holding_costs = scenario_arrays(df.iloc[start:start + block], scenarios)
+        total_ss += np.nansum(safety_stocks, axis=1)
+        total_hc += np.nansum(holding_costs, axis=1)
+        hc_by_category += np.nan_to_num(holding_costs) @ categories[start:start + block]
+    if not keep_items:
+        safety_stocks = holding_costs = None
+    elif safety_stocks is None:
+        safety_stocks = holding_costs = np.empty((len(scenarios), 0))
+    return ScenarioResults(list(scenarios), df, total_ss, total_hc, hc_by_category,
+                           safety_stocks, holding_costs, model_id)
@@ -0,0 +1,444 @@
+"""Persistent inventory store: the catalog and its results in a local SQLite file.
+
+One row per item holds the inputs and every per-item result. `load`
+replaces the whole catalog and fits (or reuses) the models. After that,
+`apply_delta` takes only the changed items:
+
+    upserted rows   scored with the stored models (Predicted_ABC,
+                    Predicted_Demand, Safety_Stock, Holding_Cost are per item)
+    deleted rows    removed, with a tombstone for `changes`
+    ABC_Category    updated in an ABCIndex (abc_index.py) kept by the process;
+                    only items whose category changed are written back
+
+The models are not refitted by a delta; load the catalog again to retrain.
+Every write bumps the store version and stamps the rows it touched, so
+clients can fetch just what changed since the version they hold.
+
+The database runs in WAL mode, so readers in other worker processes are
+never blocked by a writer. Each process opens at most `pool_size`
+connections and hands them out per call.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .abc_index import ABCIndex
+from .engine import DEMAND_STD_COLUMN, apply_safety_stock, classify_abc, cumulative_percent
+from .pipeline import INPUT_COLUMNS, InventoryData, predict_abc, predict_demand, process_all_calculations, to_frame
+from .registry import ModelRegistry
+
+RESULT_COLUMNS = ['Annual_Value', 'ABC_Category', 'Predicted_ABC', 'Predicted_Demand', 'Safety_Stock', 'Holding_Cost']
+STORE_COLUMNS = INPUT_COLUMNS + [DEMAND_STD_COLUMN] + RESULT_COLUMNS
+_COLUMN_TYPES = {'Item': 'TEXT PRIMARY KEY', 'ABC_Category': 'TEXT', 'Predicted_ABC': 'TEXT'}
+DEFAULT_POOL_SIZE = 4
+# An ABC index that fell behind by more than this share of the catalog is rebuilt instead of caught up
+CATCH_UP_SHARE = 0.05
+
+
+class ConnectionPool:
+    """Up to `size` SQLite connections per process, each used by one caller at a time
+
+    Connections opened before a fork are never reused in the child.
+    """
+
+    def __init__(self, path: str, size: int = DEFAULT_POOL_SIZE, timeout: float = 30.0):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._idle: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue()
+        self._opened = 0
+        self._pid = os.getpid()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # WAL stays consistent with NORMAL; only the last commits can be lost on power failure
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+                if self._opened < self.size:
+                    conn = self._open()
+                    self._opened += 1
+        if conn is None:
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError(f'No free database connection after {self.timeout:g}s') from None
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._reset()
+
+
+@dataclass
+class StoreDelta:
+    """Outcome of one write: the new version and which items it touched"""
+    version: int
+    upserted: int = 0
+    deleted: int = 0
+    reclassified: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'version': self.version, 'upserted': self.upserted, 'deleted': self.deleted,
+                'reclassified': self.reclassified, 'timings': self.timings}
+
+
+def _rows(frame: pd.DataFrame, columns: Sequence[str]) -> List[Tuple[Any, ...]]:
+    """Plain Python tuples for executemany (NaN becomes NULL)"""
+    values = []
+    for col in columns:
+        series = frame[col] if col in frame.columns else pd.Series(None, index=frame.index, dtype=object)
+        values.append(series.astype(object).where(series.notna(), None).tolist())
+    return list(zip(*values))
+
+
+def _input_dtypes(frame: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Cast the input columns SQLite returns as REAL back to the dtypes they were loaded with
+
+    Integer columns are only cast while every value is a whole number in
+    range; a delta that wrote fractions or NULLs leaves them float64.
+    """
+    for col, name in dtypes.items():
+        dtype = np.dtype(name)
+        if col not in frame.columns or not len(frame) or frame[col].dtype == dtype:
+            continue
+        values = frame[col].to_numpy(dtype=float)
+        if dtype.kind in 'iu':
+            bounds = np.iinfo(dtype)
+            if (np.isfinite(values).all() and (values == np.trunc(values)).all()
+                    and bounds.min <= values.min() and values.max() <= bounds.max):
+                frame[col] = values.astype(dtype)
+        elif dtype.kind == 'f':
+            frame[col] = values.astype(dtype)
+    return frame
+
+
+def rank_abc(items: np.ndarray, annual_value: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(order, Cumulative%, ABC_Category) with ties in Annual_Value broken by Item, so ranks are repeatable"""
+    order = np.lexsort((items, -annual_value))
+    cumulative = cumulative_percent(annual_value[order])
+    return order, cumulative, classify_abc(cumulative)
+
+
+class InventoryStore:
+    """Catalog and results in SQLite, updated by full loads or item deltas
+
+    Models are looked up by fingerprint in `registry`; give every worker a
+    registry on the same directory so they all find them.
+    """
+
+    def __init__(self, path: str, registry: Optional[ModelRegistry] = None, pool_size: int = DEFAULT_POOL_SIZE):
+        self.path = path
+        self.registry = registry if registry is not None else ModelRegistry()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.pool = ConnectionPool(path, pool_size)
+        # ABC index of the catalog at `_abc_version`; rebuilt when another process has written since
+        self._abc: Optional[ABCIndex] = None
+        self._abc_version: Optional[int] = None
+        columns = ', '.join(f'{col} {_COLUMN_TYPES.get(col, "REAL")}' for col in STORE_COLUMNS)
+        with self.pool.connection() as conn:
+            conn.execute(f'CREATE TABLE IF NOT EXISTS items ({columns}, version INTEGER) WITHOUT ROWID')
+            conn.execute('CREATE INDEX IF NOT EXISTS items_abc ON items (ABC_Category)')
+            conn.execute('CREATE INDEX IF NOT EXISTS items_version ON items (version)')
+            conn.execute('CREATE TABLE IF NOT EXISTS deleted (Item TEXT PRIMARY KEY, version INTEGER) WITHOUT ROWID')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID')
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection) -> Dict[str, Any]:
+        return dict(conn.execute('SELECT key, value FROM meta').fetchall())
+
+    @staticmethod
+    def _set_meta(conn: sqlite3.Connection, **values: Any) -> None:
+        conn.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', list(values.items()))
+
+    def stats(self) -> Dict[str, Any]:
+        with self.pool.connection() as conn:
+            meta = self._meta(conn)
+            categories = dict(conn.execute('SELECT ABC_Category, COUNT(*) FROM items GROUP BY ABC_Category'))
+        return {
+            'version': int(meta.get('version', 0)),
+            'items': sum(categories.values()),
+            'categories': categories,
+            'model_id': meta.get('model_id'),
+            'service_level': meta.get('service_level'),
+            'holding_cost_rate': meta.get('holding_cost_rate'),
+            'updated': meta.get('updated'),
+        }
+
+    @property
+    def version(self) -> int:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _upsert(self, conn: sqlite3.Connection, frame: pd.DataFrame, version: int, empty: bool = False) -> None:
+        """Write rows in key order (sequential B-tree inserts); `empty` skips the conflict check after a full delete"""
+        columns = STORE_COLUMNS + ['version']
+        conflict = ''
+        if not empty:
+            conflict = ' ON CONFLICT (Item) DO UPDATE SET ' + ', '.join(f'{col} = excluded.{col}' for col in columns[1:])
+        conn.executemany(
+            f"INSERT INTO items ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}){conflict}",
+            _rows(frame.sort_values('Item').assign(version=version), columns)
+        )
+        if empty:
+            conn.execute('DELETE FROM deleted WHERE Item IN (SELECT Item FROM items)')
+        else:
+            conn.executemany('DELETE FROM deleted WHERE Item = ?', [(item,) for item in frame['Item'].tolist()])
+
+    def _abc_index(self, conn: sqlite3.Connection, stored_version: int, version: int) -> Tuple[ABCIndex, List[str]]:
+        """ABC index of the stored catalog, and the items whose stored category a rebuild corrected
+
+        After writes from other processes the index replays just the rows
+        (and tombstones) stamped since its version. It is rebuilt with a full
+        pass on the first delta after a load, or when it fell too far behind;
+        corrections are stamped `version`.
+        """
+        if self._abc is not None and self._abc_version != stored_version:
+            written = conn.execute('SELECT Item, Annual_Value FROM items WHERE version > ?',
+                                   (self._abc_version,)).fetchall()
+            if len(written) <= CATCH_UP_SHARE * len(self._abc):
+                deleted = [item for item, in conn.execute('SELECT Item FROM deleted WHERE version > ?',
+                                                          (self._abc_version,))]
+                self._abc.apply([(item, np.nan if value is None else value) for item, value in written], deleted)
+                self._abc_version = stored_version
+        if self._abc is not None and self._abc_version == stored_version:
+            return self._abc, []
+        rows = conn.execute('SELECT Item, Annual_Value, ABC_Category FROM items').fetchall()
+        index = ABCIndex([row[0] for row in rows], [row[1] for row in rows])
+        corrected = []
+        for item, _, stored in rows:
+            label = index.category(item)
+            if label != stored:
+                corrected.append((label, version, item))
+        conn.executemany('UPDATE items SET ABC_Category = ?, version = ? WHERE Item = ?', corrected)
+        return index, [item for _, _, item in corrected]
+
+    def load(self, data: InventoryData, service_level: float = 0.95, holding_cost_rate: float = 0.2) -> StoreDelta:
+        """Replace the whole catalog: run the full pipeline and store every row"""
+        start = time.perf_counter()
+        result = process_all_calculations(data, service_level, holding_cost_rate, registry=self.registry)
+        scored = time.perf_counter()
+        frame = result.frame
+        frame['Item'] = frame['Item'].astype(str)
+        # Same tie-breaking as every later re-rank
+        order, _, categories = rank_abc(frame['Item'].to_numpy(dtype=object), frame['Annual_Value'].to_numpy(float))
+        frame['ABC_Category'] = categories[np.argsort(order)]
+        inputs = to_frame(data)
+        numeric = [col for col in INPUT_COLUMNS[1:] if col in inputs.columns and inputs[col].dtype.kind in 'iuf']
+        input_dtypes = json.dumps({col: inputs[col].dtype.name for col in numeric})
+        # Store the σ the caller measured, not the 10% default filled in for the others
+        if DEMAND_STD_COLUMN in inputs.columns:
+            frame[DEMAND_STD_COLUMN] = frame['Item'].map(
+                inputs.set_index(inputs['Item'].astype(str))[DEMAND_STD_COLUMN])
+        else:
+            frame = frame.drop(columns=[DEMAND_STD_COLUMN], errors='ignore')
+        with self.pool.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            version = int(self._meta(conn).get('version', 0)) + 1
+            previous = [item for item, in conn.execute('SELECT Item FROM items')]
+            conn.execute('DELETE FROM items')
+            gone = sorted(set(previous) - set(frame['Item'].tolist()))
+            conn.executemany('INSERT OR REPLACE INTO deleted (Item, version) VALUES (?, ?)',
+                             [(item, version) for item in gone])
+            self._upsert(conn, frame, version, empty=True)
+            self._set_meta(conn, version=version, model_id=result.model_id, service_level=service_level,
+                           holding_cost_rate=holding_cost_rate, input_dtypes=input_dtypes, updated=time.time())
+            conn.execute('COMMIT')
+        self._abc = None
+        end = time.perf_counter()
+        return StoreDelta(version, upserted=len(frame), deleted=len(gone),
+                          timings={'pipeline': scored - start, 'write': end - scored})
+
+    def _models(self, model_id: Optional[str]):
+        bundle = self.registry.get(model_id) if model_id else None
+        if bundle is None:
+            raise ValueError('No stored models for this catalog; load the full catalog first')
+        return bundle.classifier, bundle.regressor
+
+    def _score(self, rows: pd.DataFrame, meta: Dict[str, Any]) -> pd.DataFrame:
+        """Per-item results for upserted rows with the stored models and parameters"""
+        classifier, regressor = self._models(meta.get('model_id'))
+        missing = [col for col in INPUT_COLUMNS if col not in rows.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        rows['Item'] = rows['Item'].astype(str)
+        if rows['Item'].duplicated().any():
+            raise ValueError('Duplicate items in the delta')
+        measured = rows[DEMAND_STD_COLUMN].copy() if DEMAND_STD_COLUMN in rows.columns else None
+        rows['Annual_Value'] = rows['Annual_Usage'] * rows['Unit_Cost']
+        rows['Predicted_ABC'] = predict_abc(rows, classifier)
+        rows['Predicted_Demand'] = predict_demand(rows, regressor)
+        rows = apply_safety_stock(rows, float(meta['service_level']), float(meta['holding_cost_rate']))
+        if measured is not None:
+            rows[DEMAND_STD_COLUMN] = measured
+        return rows
+
+    def _rescore_all(self, conn: sqlite3.Connection, meta: Dict[str, Any], version: int) -> int:
+        """Safety stock and holding cost for every row, after a parameter change"""
+        frame = pd.read_sql_query(
+            f'SELECT Item, Unit_Cost, Lead_Time, Predicted_Demand, {DEMAND_STD_COLUMN} FROM items', conn)
+        if frame[DEMAND_STD_COLUMN].isna().all():
+            frame = frame.drop(columns=[DEMAND_STD_COLUMN])
+        frame = apply_safety_stock(frame, float(meta['service_level']), float(meta['holding_cost_rate']))
+        conn.executemany('UPDATE items SET Safety_Stock = ?, Holding_Cost = ?, version = ? WHERE Item = ?',
+                         _rows(frame.assign(version=version), ['Safety_Stock', 'Holding_Cost', 'version', 'Item']))
+        return len(frame)
+
+    def apply_delta(self, upserts: Optional[InventoryData] = None, deletes: Sequence[str] = (),
+                    service_level: Optional[float] = None, holding_cost_rate: Optional[float] = None) -> StoreDelta:
+        """Add or change `upserts`, remove `deletes` and update what they affect
+
+        A new service level or holding cost rate rescores safety stock and
+        holding cost for every item. `upserts` rows need the input columns
+        (and may carry Demand_Std).
+        """
+        start = time.perf_counter()
+        deletes = [str(item) for item in deletes]
+        has_rows = upserts is not None and len(upserts) > 0
+        # Score outside the write lock; redone below if the parameters or models changed meanwhile
+        with self.pool.connection() as conn:
+            meta = self._meta(conn)
+        if 'model_id' not in meta:
+            raise ValueError('The store is empty; load the full catalog first')
+        parameters = self._parameters(meta, service_level, holding_cost_rate)
+        rows = self._score(to_frame(upserts), parameters) if has_rows else None
+        scored = time.perf_counter()
+        with self.pool.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            current = self._meta(conn)
+            stored_version = int(current.get('version', 0))
+            version = stored_version + 1
+            if has_rows and self._parameters(current, service_level, holding_cost_rate) != parameters:
+                parameters = self._parameters(current, service_level, holding_cost_rate)
+                rows = self._score(rows[[col for col in rows.columns if col in INPUT_COLUMNS + [DEMAND_STD_COLUMN]]],
+                                   parameters)
+            delta = StoreDelta(version)
+            index = None
+            try:
+                if rows is not None or deletes:
+                    index, corrected = self._abc_index(conn, stored_version, version)
+                    updates = zip(rows['Item'].tolist(), rows['Annual_Value'].tolist()) if rows is not None else ()
+                    reclassified = index.apply(updates, deletes)
+                    delta.reclassified = sorted(set(corrected) | set(reclassified))
+                if deletes:
+                    cursor = conn.executemany('DELETE FROM items WHERE Item = ?', [(item,) for item in deletes])
+                    delta.deleted = cursor.rowcount
+                    conn.executemany('INSERT OR REPLACE INTO deleted (Item, version) VALUES (?, ?)',
+                                     [(item, version) for item in deletes])
+                if rows is not None:
+                    rows['ABC_Category'] = [index.category(item) for item in rows['Item'].tolist()]
+                    self._upsert(conn, rows, version)
+                    delta.upserted = len(rows)
+                    upserted = set(rows['Item'].tolist())
+                    reclassified = {item: label for item, label in reclassified.items() if item not in upserted}
+                if index is not None:
+                    conn.executemany('UPDATE items SET ABC_Category = ?, version = ? WHERE Item = ?',
+                                     [(label, version, item) for item, label in reclassified.items()])
+                if (parameters['service_level'], parameters['holding_cost_rate']) != (
+                        current.get('service_level'), current.get('holding_cost_rate')):
+                    self._rescore_all(conn, parameters, version)
+                self._set_meta(conn, version=version, service_level=parameters['service_level'],
+                               holding_cost_rate=parameters['holding_cost_rate'], updated=time.time())
+                written = time.perf_counter()
+                conn.execute('COMMIT')
+            except BaseException:
+                # The index may already hold changes that were rolled back
+                self._abc = None
+                raise
+            if index is not None:
+                self._abc, self._abc_version = index, version
+            elif self._abc_version == stored_version:
+                self._abc_version = version
+        end = time.perf_counter()
+        delta.timings = {'score': scored - start, 'write': written - scored, 'commit': end - written}
+        return delta
+
+    @staticmethod
+    def _parameters(meta: Dict[str, Any], service_level: Optional[float],
+                    holding_cost_rate: Optional[float]) -> Dict[str, Any]:
+        """Model id and parameters a delta is scored with (the stored ones unless overridden)"""
+        return {
+            'model_id': meta.get('model_id'),
+            'service_level': float(meta['service_level'] if service_level is None else service_level),
+            'holding_cost_rate': float(meta['holding_cost_rate'] if holding_cost_rate is None else holding_cost_rate),
+        }
+
+    def frame(self, where: str = '', params: Sequence[Any] = ()) -> pd.DataFrame:
+        """Stored results in pipeline form: ranked by Annual_Value, with Cumulative%"""
+        with self.pool.connection() as conn:
+            frame = pd.read_sql_query(f"SELECT {', '.join(STORE_COLUMNS)} FROM items {where}", conn, params=params)
+            dtypes = json.loads(self._meta(conn).get('input_dtypes') or '{}')
+        if frame.empty:
+            return frame.drop(columns=[DEMAND_STD_COLUMN])
+        order, cumulative, _ = rank_abc(frame['Item'].to_numpy(dtype=object), frame['Annual_Value'].to_numpy(float))
+        frame = _input_dtypes(frame.iloc[order].reset_index(drop=True), dtypes)
+        frame.insert(frame.columns.get_loc('ABC_Category'), 'Cumulative%', cumulative)
+        if frame[DEMAND_STD_COLUMN].isna().all():
+            frame = frame.drop(columns=[DEMAND_STD_COLUMN])
+        return frame
+
+    def changes(self, since: int) -> Tuple[pd.DataFrame, List[str]]:
+        """Rows written after version `since` and the items deleted since then"""
+        with self.pool.connection() as conn:
+            changed = pd.read_sql_query(f"SELECT {', '.join(STORE_COLUMNS)}, version FROM items WHERE version > ?",
+                                        conn, params=(since,))
+            deleted = [item for item, in conn.execute('SELECT Item FROM deleted WHERE version > ?', (since,))]
+            dtypes = json.loads(self._meta(conn).get('input_dtypes') or '{}')
+        return _input_dtypes(changed, dtypes), deleted
+
+    def sync(self, data: InventoryData, service_level: float = 0.95, holding_cost_rate: float = 0.2) -> StoreDelta:
+        """Bring the store in line with a full catalog by sending only the difference
+
+        An empty store is loaded in full.
+        """
+        inputs = to_frame(data)
+        stored = self.frame()
+        if stored.empty:
+            return self.load(inputs, service_level, holding_cost_rate)
+        columns = [col for col in INPUT_COLUMNS + [DEMAND_STD_COLUMN] if col in inputs.columns]
+        inputs['Item'] = inputs['Item'].astype(str)
+        merged = inputs[columns].merge(stored.reindex(columns=columns), on='Item', how='left',
+                                       suffixes=('', '_stored'), indicator=True)
+        changed = merged['_merge'] == 'left_only'
+        for col in columns[1:]:
+            changed |= ~np.isclose(merged[col].astype(float), merged[f'{col}_stored'].astype(float), equal_nan=True)
+        deletes = sorted(set(stored['Item']) - set(inputs['Item']))
+        return self.apply_delta(inputs[changed.to_numpy()], deletes, service_level, holding_cost_rate)
+
+    def close(self) -> None:
+        self.pool.close()
@@ -0,0 +1,168 @@
+"""Batch-by-batch results for streaming (NDJSON) responses.
+
+ABC categories need every item's value, so they are computed over the
+whole catalog first, and the models are fitted (or fetched) once. The
+per-item stages (predictions, safety stock, holding cost, trade-off
+curves) then run one batch of rows at a time, and each batch is written
+out as newline-delimited JSON before the next is computed. The full
+result list and the full response body are never held at once.
+
+Each stream starts with one metadata line; every following line is one
+result row. If a batch fails after streaming has begun, the stream ends
+with an {"success": false, "error": ...} line.
+"""
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .engine import apply_abc, apply_safety_stock
+from .formats import _json_default
+from .pipeline import (
+    InventoryData,
+    attach_demand_forecast,
+    predict_abc,
+    predict_demand,
+    to_frame,
+    train_abc_classifier,
+    train_demand_regression,
+)
+from .tradeoff import curves_for_rows, item_positions
+
+if TYPE_CHECKING:
+    from sklearn.linear_model import LinearRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+    from .registry import ModelRegistry
+
+DEFAULT_BATCH_ROWS = 5_000
+_ENCODER = json.JSONEncoder(separators=(',', ':'), default=_json_default)
+
+
+def json_column(values: np.ndarray) -> List[str]:
+    """JSON text of every value in a column, missing values as null
+
+    Floats are written as the json module writes them (the shortest repr
+    that round-trips), so streamed rows match the buffered JSON responses.
+    """
+    if values.dtype.kind == 'f':
+        text = list(map(repr, values.tolist()))
+        for i in np.flatnonzero(~np.isfinite(values)):
+            text[i] = 'null' if np.isnan(values[i]) else _ENCODER.encode(float(values[i]))
+        return text
+    if values.dtype.kind in 'iu':
+        return list(map(str, values.tolist()))
+    missing = pd.isna(values)
+    return ['null' if gap else _ENCODER.encode(value) for value, gap in zip(values.tolist(), missing.tolist())]
+
+
+def ndjson_lines(batch: pd.DataFrame) -> str:
+    """Rows of a batch as newline-terminated JSON objects, encoded a column at a time"""
+    if batch.empty:
+        return ''
+    columns = []
+    for i, col in enumerate(batch.columns):
+        key = ('{' if i == 0 else ',') + _ENCODER.encode(str(col)) + ':'
+        columns.append([key + text for text in json_column(batch[col].to_numpy())])
+    return ''.join(''.join(row) + '}\n' for row in zip(*columns))
+
+
+def meta_line(meta: Dict[str, Any]) -> str:
+    return json.dumps(meta, separators=(',', ':')) + '\n'
+
+
+def guarded(lines: Iterator[str]) -> Iterator[str]:
+    """Pass lines through; a failure mid-stream ends it with an error line"""
+    try:
+        yield from lines
+    except Exception as e:
+        yield meta_line({'success': False, 'error': str(e)})
+
+
+@dataclass
+class CalculationStream:
+    """ABC-ranked items plus the models, ready to be scored batch by batch"""
+    frame: pd.DataFrame
+    classifier: Optional['DecisionTreeClassifier']
+    regressor: Optional['LinearRegression']
+    service_level: float
+    holding_cost_rate: float
+    model_id: Optional[str] = None
+
+    def batches(self, batch_size: int = DEFAULT_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+        """Fully calculated rows, `batch_size` at a time, in ABC rank order"""
+        for start in range(0, len(self.frame), batch_size):
+            batch = self.frame.iloc[start:start + batch_size].copy()
+            batch['Predicted_ABC'] = predict_abc(batch, self.classifier)
+            batch['Predicted_Demand'] = predict_demand(batch, self.regressor)
+            batch = attach_demand_forecast(batch, None)
+            yield apply_safety_stock(batch, self.service_level, self.holding_cost_rate)
+
+    def ndjson(self, batch_size: int = DEFAULT_BATCH_ROWS) -> Iterator[str]:
+        """Metadata line (success, model_id, rows), then one line per item"""
+        yield meta_line({'success': True, 'model_id': self.model_id, 'rows': len(self.frame)})
+        yield from guarded(ndjson_lines(batch) for batch in self.batches(batch_size))
+
+
+def stream_calculations(
+    data: InventoryData,
+    service_level: float = 0.95,
+    holding_cost_rate: float = 0.2,
+    registry: Optional['ModelRegistry'] = None,
+) -> CalculationStream:
+    """Rank the items and fit (or fetch) the models; the rest is computed as the stream is read
+
+    Rows come out identical to process_all_calculations.
+    """
+    df = apply_abc(to_frame(data))
+    if registry is not None:
+        bundle = registry.get_or_fit(df)
+        return CalculationStream(df, bundle.classifier, bundle.regressor, service_level, holding_cost_rate,
+                                 bundle.fingerprint)
+    return CalculationStream(df, train_abc_classifier(df), train_demand_regression(df),
+                             service_level, holding_cost_rate)
+
+
+def stream_scores(
+    data: InventoryData,
+    classifier: Optional['DecisionTreeClassifier'],
+    regressor: Optional['LinearRegression'],
+    service_level: float = 0.95,
+    holding_cost_rate: float = 0.2,
+) -> CalculationStream:
+    """Streaming counterpart of pipeline.score_items (predict-only)"""
+    return CalculationStream(apply_abc(to_frame(data)), classifier, regressor, service_level, holding_cost_rate)
+
+
+def stream_tradeoff(
+    df: pd.DataFrame,
+    items: Sequence[Any],
+    service_levels: np.ndarray,
+    holding_cost_rate: float = 0.2,
+    batch_size: int = DEFAULT_BATCH_ROWS,
+) -> Iterator[str]:
+    """Trade-off curves as NDJSON: a line with the service levels, then one line per item
+
+    Unknown items raise KeyError here, before anything is streamed.
+    """
+    positions = item_positions(df, items)
+    items = list(items)
+    service_levels = np.asarray(service_levels, dtype=float)
+
+    def batches() -> Iterator[str]:
+        for start in range(0, len(items), batch_size):
+            curves = curves_for_rows(df.iloc[positions[start:start + batch_size]],
+                                     items[start:start + batch_size], service_levels, holding_cost_rate)
+            yield ndjson_lines(pd.DataFrame({
+                'Item': curves.items,
+                'safety_stocks': curves.safety_stocks.tolist(),
+                'holding_costs': curves.holding_costs.tolist(),
+            }))
+
+    def lines() -> Iterator[str]:
+        yield meta_line({'success': True, 'items': len(items), 'service_levels': (service_levels * 100).tolist()})
+        yield from guarded(batches())
+
+    return lines()
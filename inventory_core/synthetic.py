@@ -0,0 +1,75 @@
+"""Synthetic catalogs and demand histories for benchmarks and demos.
+
+Catalogs follow the usual inventory shape: Annual_Value is Pareto
+distributed (shape ≈ 1.16 puts about 80% of the value in 20% of the
+items), unit costs are log-normal, and lead times mix short domestic
+and long overseas replenishment. Everything is drawn from one seeded
+generator, so the same arguments always give the same data. This is
+the one catalog generator; the benchmarks (bench.make_catalog and the
+chunked writer of bench_outofcore) draw from it too.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Pareto shape for the 80/20 rule
+PARETO_SHAPE = 1.16
+# Lead times in periods and how common each is
+LEAD_TIMES = np.array([1, 2, 3, 4, 6, 8, 12])
+LEAD_TIME_WEIGHTS = np.array([0.15, 0.25, 0.2, 0.15, 0.1, 0.1, 0.05])
+# Day-of-week demand profile, Monday first
+WEEKLY_PROFILE = np.array([1.1, 1.05, 1.0, 1.0, 1.15, 0.9, 0.8])
+
+
+def item_names(n: int, start: int = 0, total: Optional[int] = None) -> np.ndarray:
+    """SKU0000001, SKU0000002, ... (fixed width, so they sort in order)
+
+    `start` skips that many names and `total` sets the width, for the names
+    of one chunk of a larger catalog.
+    """
+    width = max(len(str(total or start + n)), 7)
+    return np.char.add('SKU', np.char.zfill(np.arange(start + 1, start + n + 1).astype(str), width)).astype(object)
+
+
+def synthetic_catalog(n: int, seed: int = 42, pareto_shape: float = PARETO_SHAPE,
+                      start: int = 0, total: Optional[int] = None) -> pd.DataFrame:
+    """Catalog with the input columns of the pipeline (Item, Annual_Usage, Unit_Cost, Lead_Time, Past_Demand)
+
+    `start` and `total` name the rows as one chunk of a `total`-row catalog
+    (see item_names); give each chunk its own seed.
+    """
+    rng = np.random.default_rng(seed)
+    annual_value = (rng.pareto(pareto_shape, n) + 1) * 500
+    unit_cost = np.clip(rng.lognormal(np.log(20), 1.2, n), 0.1, 10_000).round(2)
+    annual_usage = np.maximum(np.round(annual_value / unit_cost), 1).astype(np.int64)
+    # Last year's demand: this year's usage with ±10% drift
+    past_demand = np.maximum(np.round(annual_usage * rng.normal(1.0, 0.1, n)), 0).astype(np.int64)
+    return pd.DataFrame({
+        'Item': item_names(n, start, total),
+        'Annual_Usage': annual_usage,
+        'Unit_Cost': unit_cost,
+        'Lead_Time': rng.choice(LEAD_TIMES, n, p=LEAD_TIME_WEIGHTS),
+        'Past_Demand': past_demand,
+    })
+
+
+def synthetic_history(catalog: pd.DataFrame, days: int = 365, end: str = '2025-12-31',
+                      seed: int = 42, items: Optional[int] = None) -> pd.DataFrame:
+    """Daily demand (Item, Date, Demand) consistent with each item's Annual_Usage
+
+    Demand is Poisson around Annual_Usage / 365 with a weekly profile, so
+    slow movers come out intermittent. Zero-demand days are included.
+    `items` limits the history to the first items of the catalog.
+    """
+    rng = np.random.default_rng(seed)
+    catalog = catalog if items is None else catalog.head(items)
+    dates = pd.date_range(end=pd.Timestamp(end), periods=days, freq='D')
+    daily = catalog['Annual_Usage'].to_numpy(dtype=float) / 365
+    profile = WEEKLY_PROFILE[dates.dayofweek.to_numpy()]
+    demand = rng.poisson(daily[:, None] * profile[None, :])
+    return pd.DataFrame({
+        'Item': np.repeat(catalog['Item'].to_numpy(), days),
+        'Date': np.tile(dates.to_numpy(), len(catalog)),
+        'Demand': demand.ravel(),
+    })
@@ -0,0 +1,127 @@
+"""Service level trade-off curves computed as one broadcast.
+
+For a set of items and a grid of service levels the safety stock is
+Z(level) × σ(item) × √Lead Time(item), so the whole items × levels table
+comes from one norm.ppf over the grid and an outer product.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .engine import calculate_holding_cost, calculate_safety_stock, measured_std
+
+# Most service levels one grid may hold (the curves are items × levels arrays)
+MAX_SERVICE_LEVELS = 1000
+
+
+@dataclass
+class TradeoffCurves:
+    """Safety stock and holding cost for each item (rows) at each service level (columns)"""
+    items: List[str]
+    service_levels: np.ndarray
+    safety_stocks: np.ndarray
+    holding_costs: np.ndarray
+
+    def to_dict(self) -> Dict[str, Dict[str, List[float]]]:
+        """Per-item curves in the /api/tradeoff response shape"""
+        levels_pct = (self.service_levels * 100).tolist()
+        safety_stocks = self.safety_stocks.tolist()
+        holding_costs = self.holding_costs.tolist()
+        return {
+            item: {
+                'service_levels': levels_pct,
+                'safety_stocks': safety_stocks[i],
+                'holding_costs': holding_costs[i],
+            }
+            for i, item in enumerate(self.items)
+        }
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Items, service levels (%) and the items × levels arrays as nested lists"""
+        return {
+            'items': list(self.items),
+            'service_levels': (self.service_levels * 100).tolist(),
+            'safety_stocks': self.safety_stocks.tolist(),
+            'holding_costs': self.holding_costs.tolist(),
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long format: one row per (item, service level)"""
+        levels = len(self.service_levels)
+        return pd.DataFrame({
+            'Item': np.repeat(np.asarray(self.items, dtype=object), levels),
+            'Service_Level': np.tile(self.service_levels * 100, len(self.items)),
+            'Safety_Stock': self.safety_stocks.ravel(),
+            'Holding_Cost': self.holding_costs.ravel(),
+        })
+
+
+def service_level_grid(service_level_min: float, service_level_max: float, step: float = 0.01) -> np.ndarray:
+    """Service levels (as fractions) from min to max inclusive
+
+    The point count is fixed up front and the stop placed half a step past
+    the last level, so float error in `max + step` cannot add an extra level
+    past the maximum. Raises ValueError unless 0 < min <= max < 1 and
+    step > 0, or when the grid would hold more than MAX_SERVICE_LEVELS.
+    """
+    if not 0 < service_level_min <= service_level_max < 1:
+        raise ValueError(f'Service levels must satisfy 0 < min <= max < 1: {service_level_min}, {service_level_max}')
+    if not (np.isfinite(step) and step > 0):
+        raise ValueError(f'Service level step must be positive: {step}')
+    if (service_level_max - service_level_min) / step + 1 > MAX_SERVICE_LEVELS:
+        raise ValueError(f'At most {MAX_SERVICE_LEVELS} service levels per grid; use a larger step')
+    count = int(np.floor((service_level_max - service_level_min) / step + 1e-9)) + 1
+    return np.arange(service_level_min, service_level_min + (count - 0.5) * step, step)
+
+
+def item_positions(df: pd.DataFrame, items: Sequence[Any]) -> np.ndarray:
+    """Row position of each requested item, using the first row when an Item repeats
+
+    Raises KeyError listing every item that is not in the frame.
+    """
+    item_col = df['Item'].to_numpy()
+    first = ~pd.Index(item_col).duplicated(keep='first')
+    lookup = pd.Series(np.flatnonzero(first), index=item_col[first])
+    positions = lookup.reindex(list(items))
+    missing = positions.index[positions.isna()]
+    if len(missing):
+        raise KeyError(f"Unknown items: {', '.join(map(str, missing))}")
+    return positions.to_numpy(dtype=np.intp)
+
+
+def tradeoff_curves(
+    df: pd.DataFrame,
+    items: Sequence[Any],
+    service_levels: np.ndarray,
+    holding_cost_rate: float = 0.2,
+) -> TradeoffCurves:
+    """Trade-off curves for `items` over the `service_levels` grid
+
+    `df` needs Item, Predicted_Demand, Lead_Time and Unit_Cost columns.
+    """
+    return curves_for_rows(df.iloc[item_positions(df, items)], items, service_levels, holding_cost_rate)
+
+
+def curves_for_rows(
+    rows: pd.DataFrame,
+    items: Sequence[Any],
+    service_levels: np.ndarray,
+    holding_cost_rate: float = 0.2,
+) -> TradeoffCurves:
+    """Trade-off curves for rows already picked out of the results, labelled `items`"""
+    service_levels = np.asarray(service_levels, dtype=float)
+    std = measured_std(rows)
+    safety_stocks = calculate_safety_stock(
+        rows['Predicted_Demand'].to_numpy()[:, None],
+        rows['Lead_Time'].to_numpy()[:, None],
+        service_levels[None, :],
+        None if std is None else std[:, None]
+    )
+    holding_costs = calculate_holding_cost(
+        safety_stocks,
+        rows['Unit_Cost'].to_numpy()[:, None],
+        holding_cost_rate
+    )
+    return TradeoffCurves(list(items), service_levels, safety_stocks, holding_costs)